@@ -0,0 +1 @@
+# Offline/local benchmarks for the MCP server; run from the mcp_server folder, e.g. python -m benchmarks.transport
@@ -0,0 +1,197 @@
+"""
+Offline benchmark of the /chat agent loop.
+
+Runs main.chat() against the scripted model server in benchmarks/fake_anthropic.py (no network, no model cost) and
+a locally seeded workflow engine, and reports per scenario: end-to-end latency, model iterations, time spent in
+tool calls per tool, and request bytes sent to the model per turn.
+
+    cd mcp_server
+    python -m benchmarks.chat --runs 20 --model-latency-ms 0
+
+The engine is reached through WORKFLOW_ENGINE_TRANSPORT (default here: inprocess, so only the engine database is
+needed). Seeding logs in with WORKFLOW_ENGINE_USERNAME/PASSWORD (registering that user if it does not exist; the
+first registered user becomes admin) and creates its own process type, definition and cases.
+"""
+import argparse
+import asyncio
+import functools
+import logging
+import os
+import statistics
+import time
+import uuid
+from collections import defaultdict
+
+import anthropic
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks.fake_anthropic import ScriptedModel, create_app
+
+# Tool helpers called by main.chat(); wrapped to attribute time per tool
+TOOL_FUNCTIONS = [
+    "get_cases", "find_cases", "get_case_overview", "get_process_data_for_user", "get_process_data_for_case",
+    "list_steps", "get_current_step_for_case_tool", "list_steps_for_case", "close_step", "list_statuses",
+    "get_status_tool", "list_task_rules", "get_task_rule_tool", "list_tasks", "get_task_tool", "list_processes",
+    "list_process_types", "get_process_type_tool", "list_process_definitions", "get_process_definition_tool",
+    "list_process_data_types", "get_process_data_type_tool",
+]
+
+
+def _instrument_tools(tool_times: dict[str, list[float]]) -> None:
+    for name in TOOL_FUNCTIONS:
+        original = getattr(main, name)
+
+        @functools.wraps(original)
+        def timed(*args, __original=original, __name=name, **kwargs):
+            start = time.perf_counter()
+            try:
+                return __original(*args, **kwargs)
+            finally:
+                tool_times[__name].append((time.perf_counter() - start) * 1000.0)
+
+        setattr(main, name, timed)
+
+
+def _engine(method: str, path: str, **kwargs):
+    client = main.get_engine_client()
+    headers = kwargs.pop("headers", {})
+    if main.authorization_token:
+        headers["Authorization"] = f"Bearer {main.authorization_token}"
+    r = client.request(method, f"{main.WORKFLOW_ENGINE_BASE_URL}{path}", headers=headers, **kwargs)
+    r.raise_for_status()
+    return r.json()
+
+
+def seed_engine(cases: int) -> dict:
+    """Create a two-task process definition and some cases; returns ids used by the scenarios."""
+    username = os.getenv("WORKFLOW_ENGINE_USERNAME") or "bench-admin"
+    password = os.getenv("WORKFLOW_ENGINE_PASSWORD") or "bench-admin"
+    os.environ.setdefault("WORKFLOW_ENGINE_USERNAME", username)
+    os.environ.setdefault("WORKFLOW_ENGINE_PASSWORD", password)
+    main.initial_login()
+    if not main.authorization_token:
+        _engine("POST", "/auth/register", json={"username": username, "password": password, "role": "admin"})
+        main.initial_login()
+    if not main.authorization_token:
+        raise SystemExit("Could not log in to the workflow engine for seeding")
+
+    statuses = {s["description"].lower(): s["statusno"] for s in _engine("GET", "/statuses")}
+    for description in ("busy", "complete"):
+        if description not in statuses:
+            statuses[description] = _engine("POST", "/statuses/", json={"description": description})["statusno"]
+
+    tag = uuid.uuid4().hex[:8]
+    ptype = _engine("POST", "/process-types/", json={"description": f"bench-{tag}"})
+    _engine("POST", "/process-data-types/", json={"description": "order"})
+    pdef = _engine("POST", "/process-definitions/", json={
+        "process_type_no": ptype["process_type_no"],
+        "version": "1",
+        "is_active": True,
+        "start_task_description": "Capture order",
+    })
+    review = _engine("POST", "/tasks/", json={
+        "process_definition_no": pdef["process_definition_no"],
+        "description": "Review order",
+        "reference": "",
+    })
+    _engine("POST", "/task-rules/", json={"taskno": pdef["start_task_no"], "rule": "procdata.order.approved == yes", "next_task_no": review["taskno"]})
+
+    case_nos = []
+    for i in range(cases):
+        case = _engine(
+            "POST", "/create-case/",
+            params={"process_type_no": ptype["process_type_no"]},
+            json={"client_id": f"bench-{tag}-{i}", "client_type": "bench"},
+        )
+        case_nos.append(case["caseno"])
+    return {"case_no": case_nos[-1], "start_task_no": pdef["start_task_no"], "busy": statuses["busy"]}
+
+
+def scenarios(seed: dict) -> dict[str, list]:
+    case_no = seed["case_no"]
+    return {
+        "case_status_composite": [
+            [("get_case_overview", {"case_no": case_no})],
+            f"Case {case_no} is at 'Capture order' (busy).",
+        ],
+        "case_status_chained": [
+            [("get_cases", {})],
+            [("get_current_step_for_case", {"case_no": case_no})],
+            [("get_task", {"taskno": seed["start_task_no"]})],
+            [("get_status", {"statusno": seed["busy"]})],
+            f"Case {case_no} is at 'Capture order' (busy).",
+        ],
+        "open_cases_search": [
+            [("find_cases", {"status": "busy", "limit": 20})],
+            "Here are the open cases.",
+        ],
+        "parallel_lookups": [
+            [("get_current_step_for_case", {"case_no": case_no}), ("list_steps_for_case", {"case_no": case_no}),
+             ("get_process_data_for_case", {"case_no": case_no})],
+            "Done.",
+        ],
+    }
+
+
+def _fmt(samples: list[float]) -> str:
+    if not samples:
+        return "-"
+    return f"{statistics.median(samples):.2f}/{max(samples):.2f}"
+
+
+def run(runs: int, model_latency_ms: float, cases: int) -> None:
+    model = ScriptedModel(latency_ms=model_latency_ms)
+    main.anthropic_client = anthropic.Anthropic(
+        api_key="offline-benchmark",
+        base_url="http://scripted-model",
+        http_client=TestClient(create_app(model), base_url="http://scripted-model"),
+        max_retries=0,
+    )
+    seed = seed_engine(cases)
+    tool_times: dict[str, list[float]] = defaultdict(list)
+    _instrument_tools(tool_times)
+
+    for name, script in scenarios(seed).items():
+        tool_times.clear()
+        latencies: list[float] = []
+        iterations: list[int] = []
+        bytes_per_turn: dict[int, list[int]] = defaultdict(list)
+        for _ in range(runs):
+            model.reset(script)
+            start = time.perf_counter()
+            result = asyncio.run(main.chat(main.ChatRequest(message=f"benchmark {name}")))
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if "error" in result:
+                raise SystemExit(f"{name}: chat failed: {result['error']}")
+            iterations.append(result["iterations"])
+            for rec in model.records:
+                bytes_per_turn[rec.turn].append(rec.bytes_in)
+
+        print(f"\n== {name} ({runs} runs, model latency {model_latency_ms:.0f} ms)")
+        print(f"  end-to-end ms  p50/max : {_fmt(latencies)}")
+        print(f"  iterations             : {statistics.mean(iterations):.1f}")
+        total_tool_ms = sum(sum(v) for v in tool_times.values()) / runs
+        print(f"  tool time per chat ms  : {total_tool_ms:.2f}")
+        for tool, samples in sorted(tool_times.items()):
+            print(f"    {tool:<32} calls/run {len(samples) / runs:>4.1f}  ms p50/max {_fmt(samples)}")
+        for turn, sizes in sorted(bytes_per_turn.items()):
+            print(f"  turn {turn} bytes sent to model : {int(statistics.mean(sizes))}")
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Simulated model response time")
+    parser.add_argument("--cases", type=int, default=25, help="Cases to seed")
+    args = parser.parse_args()
+
+    if "WORKFLOW_ENGINE_TRANSPORT" not in os.environ:
+        main.configure_engine_transport("inprocess")
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    run(args.runs, args.model_latency_ms, args.cases)
+
+
+if __name__ == "__main__":
+    main_cli()
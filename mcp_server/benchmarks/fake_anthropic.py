@@ -0,0 +1,80 @@
+"""
+Scripted stand-in for the Anthropic Messages API (POST /v1/messages).
+
+Each scenario is a list of assistant turns. A turn is either a list of (tool_name, tool_input) pairs, answered with
+tool_use blocks, or a string, answered as the final text. The turn to play is derived from the number of assistant
+messages already in the request, so responses are deterministic and the server stays stateless per conversation.
+"""
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Union
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+Turn = Union[str, list[tuple[str, dict]]]
+
+
+@dataclass
+class RequestRecord:
+    turn: int
+    bytes_in: int
+    bytes_out: int
+    messages: int
+
+
+@dataclass
+class ScriptedModel:
+    script: list[Turn] = field(default_factory=list)
+    latency_ms: float = 0.0
+    records: list[RequestRecord] = field(default_factory=list)
+
+    def reset(self, script: list[Turn], latency_ms: float | None = None) -> None:
+        self.script = script
+        if latency_ms is not None:
+            self.latency_ms = latency_ms
+        self.records = []
+
+
+def create_app(model: ScriptedModel) -> FastAPI:
+    app = FastAPI()
+    ids = itertools.count(1)
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        raw = await request.body()
+        body = json.loads(raw)
+        msgs = body.get("messages") or []
+        turn = sum(1 for m in msgs if m.get("role") == "assistant")
+        if model.latency_ms:
+            # Blocking on purpose: the real client call is synchronous too
+            time.sleep(model.latency_ms / 1000.0)
+
+        step = model.script[turn] if turn < len(model.script) else "(script exhausted)"
+        if isinstance(step, str):
+            content = [{"type": "text", "text": step}]
+            stop_reason = "end_turn"
+        else:
+            content = [
+                {"type": "tool_use", "id": f"toolu_{next(ids):06d}", "name": name, "input": tool_input}
+                for name, tool_input in step
+            ]
+            stop_reason = "tool_use"
+        payload = {
+            "id": f"msg_{next(ids):06d}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "scripted"),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            # Rough token estimate so callers that read usage still work
+            "usage": {"input_tokens": len(raw) // 4, "output_tokens": len(json.dumps(content)) // 4},
+        }
+        out = json.dumps(payload).encode("utf-8")
+        model.records.append(RequestRecord(turn=turn, bytes_in=len(raw), bytes_out=len(out), messages=len(msgs)))
+        return JSONResponse(content=payload)
+
+    return app
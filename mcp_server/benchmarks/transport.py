@@ -0,0 +1,82 @@
+"""
+Per-tool latency of the MCP helpers against the workflow engine in both transports.
+
+    cd mcp_server
+    python -m benchmarks.transport --case-no 1 --iterations 50
+
+"http" needs a running engine at WORKFLOW_ENGINE_BASE_URL; "inprocess" imports the engine app and needs its
+database settings (SQLALCHEMY_DATABASE_URL). Both log in with WORKFLOW_ENGINE_USERNAME/PASSWORD.
+"""
+import argparse
+import logging
+import statistics
+import time
+
+import main
+
+
+def _tools(case_no: int) -> dict:
+    return {
+        "get_cases": lambda: main.get_cases(),
+        "find_cases": lambda: main.find_cases(status="busy", limit=20),
+        "get_case_overview": lambda: main.get_case_overview(case_no),
+        "get_current_step_for_case": lambda: main.get_current_step_for_case_tool(case_no),
+        "list_steps_for_case": lambda: main.list_steps_for_case(case_no),
+        "get_process_data_for_case": lambda: main.get_process_data_for_case(case_no),
+        "list_statuses": lambda: main.list_statuses(),
+    }
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def run_mode(mode: str, case_no: int, iterations: int, warmup: int) -> dict[str, list[float]]:
+    main.configure_engine_transport(mode)
+    main.initial_login()
+    if not main.authorization_token:
+        raise SystemExit(f"[{mode}] login failed; check WORKFLOW_ENGINE_USERNAME/PASSWORD and engine settings")
+    timings: dict[str, list[float]] = {}
+    for name, call in _tools(case_no).items():
+        for _ in range(warmup):
+            call()
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            call()
+            samples.append((time.perf_counter() - start) * 1000.0)
+        timings[name] = samples
+    main.close_engine_client()
+    return timings
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--case-no", type=int, required=True, help="Existing case used by per-case tools")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--modes", default="http,inprocess", help="Comma separated transports to compare")
+    args = parser.parse_args()
+
+    # Keep per-request engine/httpx logging out of the measurements' output
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    results = {mode: run_mode(mode, args.case_no, args.iterations, args.warmup) for mode in modes}
+
+    header = f"{'tool':<28}" + "".join(f"{mode + ' p50':>16}{mode + ' p95':>16}" for mode in modes)
+    print(header)
+    print("-" * len(header))
+    for name in _tools(args.case_no):
+        row = f"{name:<28}"
+        for mode in modes:
+            samples = results[mode][name]
+            row += f"{statistics.median(samples):>14.2f}ms{_percentile(samples, 95):>14.2f}ms"
+        print(row)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -2,12 +2,16 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import anthropic
+import atexit
 import httpx
+import importlib.util
 import json
 import logging
 import os
+import sys
+from contextlib import contextmanager
 from dotenv import load_dotenv
-from typing import List, Optional
+from typing import Iterator, List, Optional
 
 # Load env
 dotenv_path = os.path.join(os.path.dirname(__file__), '..', 'workflow_engine', '.env')
@@ -16,6 +20,15 @@ load_dotenv(dotenv_path=dotenv_path)
 # Base URL for workflow engine (override via env WORKFLOW_ENGINE_BASE_URL)
 WORKFLOW_ENGINE_BASE_URL = os.getenv("WORKFLOW_ENGINE_BASE_URL", "http://localhost:8000")
 
+# Transport to the workflow engine (override via env WORKFLOW_ENGINE_TRANSPORT):
+#   "http"      - pooled HTTP client against WORKFLOW_ENGINE_BASE_URL (default)
+#   "inprocess" - import the engine's FastAPI app and dispatch requests through an ASGI transport (no sockets);
+#                 requires the engine's DB settings (SQLALCHEMY_DATABASE_URL) in this process
+WORKFLOW_ENGINE_TRANSPORT = os.getenv("WORKFLOW_ENGINE_TRANSPORT", "http").lower()
+WORKFLOW_ENGINE_DIR = os.getenv(
+    "WORKFLOW_ENGINE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'workflow_engine')
+)
+
 logging.basicConfig(level=logging.INFO)
 
 # FastAPI app
@@ -43,6 +56,63 @@ except Exception as e:  # pragma: no cover
     logging.error(f"Anthropic init failed: {e}")
     anthropic_client = None
 
+# Engine client (shared across tool calls)
+_engine_client: Optional[httpx.Client] = None
+
+def _load_engine_app():
+    """Import workflow_engine/main.py under a distinct module name (this file is also 'main')."""
+    engine_dir = os.path.abspath(WORKFLOW_ENGINE_DIR)
+    if engine_dir not in sys.path:
+        sys.path.insert(0, engine_dir)
+    spec = importlib.util.spec_from_file_location("workflow_engine_main", os.path.join(engine_dir, "main.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+def get_engine_client() -> httpx.Client:
+    global _engine_client
+    if _engine_client is None:
+        if WORKFLOW_ENGINE_TRANSPORT == "inprocess":
+            from fastapi.testclient import TestClient
+            # Surface engine errors as HTTP responses, exactly like the HTTP transport does
+            client = TestClient(_load_engine_app(), base_url=WORKFLOW_ENGINE_BASE_URL, raise_server_exceptions=False)
+            # Entering keeps one event-loop portal alive for all calls instead of one per request
+            client.__enter__()
+            _engine_client = client
+        elif WORKFLOW_ENGINE_TRANSPORT == "http":
+            _engine_client = httpx.Client(base_url=WORKFLOW_ENGINE_BASE_URL)
+        else:
+            raise ValueError(f"Unknown WORKFLOW_ENGINE_TRANSPORT {WORKFLOW_ENGINE_TRANSPORT!r}")
+        logging.info(f"Workflow engine transport: {WORKFLOW_ENGINE_TRANSPORT}")
+    return _engine_client
+
+def close_engine_client() -> None:
+    global _engine_client
+    client, _engine_client = _engine_client, None
+    if client is None:
+        return
+    try:
+        if hasattr(client, "__exit__") and WORKFLOW_ENGINE_TRANSPORT == "inprocess":
+            client.__exit__(None, None, None)
+        else:
+            client.close()
+    except Exception as e:
+        logging.warning(f"Closing engine client failed: {e}")
+
+def configure_engine_transport(mode: str) -> None:
+    """Switch transport at runtime (used by benchmarks); the next call re-creates the client and must log in again."""
+    global WORKFLOW_ENGINE_TRANSPORT, authorization_token
+    close_engine_client()
+    WORKFLOW_ENGINE_TRANSPORT = mode.lower()
+    authorization_token = None
+
+atexit.register(close_engine_client)
+
+@contextmanager
+def engine_client() -> Iterator[httpx.Client]:
+    # The shared client stays open; callers keep the 'with' form used throughout this module
+    yield get_engine_client()
+
 # Initial login
 def initial_login():
     global authorization_token
@@ -52,7 +122,7 @@ def initial_login():
         logging.warning("Workflow creds missing")
         return
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.post(f"{WORKFLOW_ENGINE_BASE_URL}/auth/token", data={"username": u, "password": p})
             r.raise_for_status()
             authorization_token = r.json().get("access_token")
@@ -61,50 +131,49 @@ def initial_login():
         logging.error(f"Workflow login failed: {e}")
 
 # Business helper
+def _compact(obj) -> str:
+    """Serialize tool output as compact JSON (no whitespace, no nulls) to keep model context small."""
+    def prune(v):
+        if isinstance(v, dict):
+            return {k: prune(x) for k, x in v.items() if x is not None and x != {} and x != []}
+        if isinstance(v, list):
+            return [prune(x) for x in v]
+        return v
+    return json.dumps(prune(obj), separators=(",", ":"), default=str)
+
 def get_cases() -> str:
     global authorization_token
     if not authorization_token:
         return "Not logged in to workflow engine."
+    DISPLAY_LIMIT = 50
     try:
-        with httpx.Client() as c:
-            r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/cases", headers={"Authorization": f"Bearer {authorization_token}"})
+        # Newest first, paginated on the engine side
+        with engine_client() as c:
+            r = c.get(
+                f"{WORKFLOW_ENGINE_BASE_URL}/cases",
+                params={"limit": DISPLAY_LIMIT},
+                headers={"Authorization": f"Bearer {authorization_token}"},
+            )
             r.raise_for_status()
-            cases = r.json()
-        if not cases:
+            display_cases = r.json()
+        if not display_cases:
             return "No cases found."
-        # Improve readability: sort by created_at desc if present
-        try:
-            cases_sorted = sorted(
-                cases,
-                key=lambda x: x.get('created_at') or '',
-                reverse=True
-            )
-        except Exception:
-            cases_sorted = cases
-
-        DISPLAY_LIMIT = 50
-        truncated = len(cases_sorted) > DISPLAY_LIMIT
-        display_cases = cases_sorted[:DISPLAY_LIMIT]
+        total = int(r.headers.get("X-Total-Count", len(display_cases)))
 
-        # Determine column widths (with caps)
         def strv(item, key):
             v = item.get(key)
             return '' if v is None else str(v)
-        case_w = min(max((len(strv(c, 'caseno')) for c in display_cases), default=4), 12)
-        client_w = min(max((len(strv(c, 'client_id')) for c in display_cases), default=6), 16)
-        ctype_w = min(max((len(strv(c, 'client_type')) for c in display_cases), default=5), 12)
-        user_w = min(max((len(strv(c, 'usrid')) for c in display_cases), default=4), 12)
 
-        header_summary = f"Cases Summary: {len(cases)} total (showing {len(display_cases)} newest)"
+        header_summary = f"Cases Summary: {total} total (showing {len(display_cases)} newest)"
         lines = [header_summary]
         for c in display_cases:
             lines.append(
                 f"- Case {strv(c,'caseno')}: Client {strv(c,'client_id')} ({strv(c,'client_type')}) "
-                f"User {strv(c,'usrid')} Created {strv(c,'created_at')}"
+                f"User {strv(c,'usrid')} Created {strv(c,'date_created')}"
             )
             lines.append("")  # blank line after each case
-        if truncated:
-            lines.append(f"... truncated {len(cases_sorted)-DISPLAY_LIMIT} older cases ...")
+        if total > len(display_cases):
+            lines.append(f"... truncated {total-len(display_cases)} older cases ...")
         return "\n".join(lines)
     except httpx.HTTPStatusError as e:
         return f"Workflow error {e.response.status_code}: {e.response.text}"
@@ -113,6 +182,64 @@ def get_cases() -> str:
     except Exception as e:
         return f"Error retrieving cases: {e}"
 
+def find_cases(
+    client_id: str | None = None,
+    client_type: str | None = None,
+    status: str | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> str:
+    """Search cases with filters applied by the workflow engine; returns compact JSON."""
+    global authorization_token
+    if not authorization_token:
+        return "Not logged in to workflow engine."
+    params = {"client_id": client_id, "client_type": client_type, "status": status}
+    params = {k: v for k, v in params.items() if v not in (None, "")}
+    params["limit"] = max(1, min(int(limit or 20), 100))
+    params["offset"] = max(0, int(offset or 0))
+    try:
+        with engine_client() as c:
+            r = c.get(
+                f"{WORKFLOW_ENGINE_BASE_URL}/cases",
+                params=params,
+                headers={"Authorization": f"Bearer {authorization_token}"},
+            )
+            r.raise_for_status()
+            cases = r.json()
+        total = int(r.headers.get("X-Total-Count", len(cases)))
+        return _compact({
+            "total": total,
+            "offset": params["offset"],
+            "cases": [
+                {k: c.get(k) for k in ("caseno", "client_id", "client_type", "usrid", "date_created")}
+                for c in cases
+            ],
+        })
+    except httpx.HTTPStatusError as e:
+        return f"Workflow error {e.response.status_code}: {e.response.text}"
+    except Exception as e:
+        return f"Error searching cases: {e}"
+
+def get_case_overview(case_no: int) -> str:
+    """Case, processes, current step (with task/status names) and process data in one call; compact JSON."""
+    global authorization_token
+    if not authorization_token:
+        return "Not logged in to workflow engine."
+    try:
+        with engine_client() as c:
+            r = c.get(
+                f"{WORKFLOW_ENGINE_BASE_URL}/cases/{case_no}/overview",
+                headers={"Authorization": f"Bearer {authorization_token}"},
+            )
+            if r.status_code == 404:
+                return f"Case {case_no} not found."
+            r.raise_for_status()
+            return _compact(r.json())
+    except httpx.HTTPStatusError as e:
+        return f"Workflow error {e.response.status_code}: {e.response.text}"
+    except Exception as e:
+        return f"Error retrieving case overview {case_no}: {e}"
+
 def get_process_data_for_user() -> str:
     """Fetch process data associated with the current user's cases.
 
@@ -121,22 +248,20 @@ def get_process_data_for_user() -> str:
     global authorization_token
     if not authorization_token:
         return "Not logged in to workflow engine."
+    DISPLAY_LIMIT = 250  # overall entries to display across all processes
     try:
-        with httpx.Client() as c:
-            r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/process-data", headers={"Authorization": f"Bearer {authorization_token}"})
+        # Sorted by processno/fieldname and paginated on the engine side
+        with engine_client() as c:
+            r = c.get(
+                f"{WORKFLOW_ENGINE_BASE_URL}/process-data",
+                params={"limit": DISPLAY_LIMIT},
+                headers={"Authorization": f"Bearer {authorization_token}"},
+            )
             r.raise_for_status()
-            pdata = r.json()
-        if not pdata:
+            display_items = r.json()
+        if not display_items:
             return "No process data found."
-        # Sort global list by processno then fieldname for stable grouping
-        try:
-            pdata_sorted = sorted(pdata, key=lambda x: (x.get('processno'), x.get('fieldname'), x.get('process_data_no')))
-        except Exception:
-            pdata_sorted = pdata
-
-        DISPLAY_LIMIT = 250  # overall entries to display across all processes
-        truncated = len(pdata_sorted) > DISPLAY_LIMIT
-        display_items = pdata_sorted[:DISPLAY_LIMIT]
+        total = int(r.headers.get("X-Total-Count", len(display_items)))
 
         # Group by process
         grouped: dict[int, list[dict]] = {}
@@ -149,10 +274,9 @@ def get_process_data_for_user() -> str:
             v = it.get(key)
             return '' if v is None else str(v)
 
-        total_processes = len({i.get('processno') for i in pdata})
         header = (
-            f"Process Data Summary: {len(pdata)} total entries across {total_processes} processes "
-            f"(showing {len(display_items)})"
+            f"Process Data Summary: {total} total entries "
+            f"(showing {len(display_items)} across {len(grouped)} processes)"
         )
         lines = [header]
         for pno, items in grouped.items():
@@ -164,8 +288,8 @@ def get_process_data_for_user() -> str:
                     f"{sval(it,'fieldname')} = {sval(it,'value')}"
                 )
                 lines.append("")  # blank line after each process data entry
-        if truncated:
-            lines.append(f"\n... truncated {len(pdata_sorted)-DISPLAY_LIMIT} additional entries ...")
+        if total > len(display_items):
+            lines.append(f"\n... truncated {total-len(display_items)} additional entries ...")
         return "\n".join(lines)
     except httpx.HTTPStatusError as e:
         return f"Workflow error {e.response.status_code}: {e.response.text}"
@@ -180,7 +304,7 @@ def get_process_data_for_case(case_no: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/cases/{case_no}/process-data", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 404:
                 return f"Case {case_no} not found or no data."
@@ -216,7 +340,7 @@ def list_steps() -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/steps", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 403:
                 return "Not authorized to list all steps (admin only)."
@@ -243,7 +367,7 @@ def get_current_step_for_case_tool(case_no: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/cases/{case_no}/current-step", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 404:
                 return f"No current step for case {case_no}."
@@ -261,7 +385,7 @@ def list_steps_for_case(case_no: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/cases/{case_no}/steps", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 404:
                 return f"No steps for case {case_no}."
@@ -288,7 +412,7 @@ def close_step(step_id: int, rule_data: dict | None = None) -> str:
         return "Not logged in to workflow engine."
     try:
         payload = {"rule_data": rule_data or {}}
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.post(
                 f"{WORKFLOW_ENGINE_BASE_URL}/steps/{step_id}/close",
                 headers={"Authorization": f"Bearer {authorization_token}"},
@@ -298,6 +422,8 @@ def close_step(step_id: int, rule_data: dict | None = None) -> str:
                 return f"Step {step_id} not found."
             if r.status_code == 403:
                 return f"Not authorized to close step {step_id}."
+            if r.status_code == 422:
+                return f"Step {step_id} not closed: {r.json().get('detail')}"
             r.raise_for_status()
             s = r.json()
         return (
@@ -313,7 +439,7 @@ def list_statuses() -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/statuses", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 403:
                 return "Not authorized to list statuses."
@@ -335,7 +461,7 @@ def get_status_tool(statusno: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/statuses/{statusno}", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 404:
                 return f"Status {statusno} not found."
@@ -353,7 +479,7 @@ def list_task_rules() -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/task-rules", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 403:
                 return "Not authorized to list task rules (admin only)."
@@ -377,7 +503,7 @@ def get_task_rule_tool(taskruleno: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/task-rules/{taskruleno}", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 404:
                 return f"Task rule {taskruleno} not found."
@@ -399,7 +525,7 @@ def list_tasks() -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/tasks", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 403:
                 return "Not authorized to list tasks (admin only)."
@@ -423,7 +549,7 @@ def get_task_tool(taskno: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/tasks/{taskno}", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 404:
                 return f"Task {taskno} not found."
@@ -445,7 +571,7 @@ def list_processes() -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/processes", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 403:
                 return "Not authorized to list processes (admin only)."
@@ -471,7 +597,7 @@ def list_process_types() -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/process-types", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 403:
                 return "Not authorized to list process types."
@@ -493,7 +619,7 @@ def get_process_type_tool(process_type_no: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(
                 f"{WORKFLOW_ENGINE_BASE_URL}/process-types/{process_type_no}",
                 headers={"Authorization": f"Bearer {authorization_token}"},
@@ -515,7 +641,7 @@ def list_process_definitions() -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/process-definitions", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 403:
                 return "Not authorized to list process definitions (admin only)."
@@ -539,7 +665,7 @@ def get_process_definition_tool(process_definition_no: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(
                 f"{WORKFLOW_ENGINE_BASE_URL}/process-definitions/{process_definition_no}",
                 headers={"Authorization": f"Bearer {authorization_token}"},
@@ -564,7 +690,7 @@ def list_process_data_types() -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(f"{WORKFLOW_ENGINE_BASE_URL}/process-data-types", headers={"Authorization": f"Bearer {authorization_token}"})
             if r.status_code == 403:
                 return "Not authorized to list process data types."
@@ -586,7 +712,7 @@ def get_process_data_type_tool(process_data_type_no: int) -> str:
     if not authorization_token:
         return "Not logged in to workflow engine."
     try:
-        with httpx.Client() as c:
+        with engine_client() as c:
             r = c.get(
                 f"{WORKFLOW_ENGINE_BASE_URL}/process-data-types/{process_data_type_no}",
                 headers={"Authorization": f"Bearer {authorization_token}"},
@@ -605,6 +731,35 @@ def get_process_data_type_tool(process_data_type_no: int) -> str:
 
 # Tool spec (manual)
 ANTHROPIC_TOOLS = [
+    {
+        "name": "get_case_overview",
+        "description": (
+            "One-call summary of a case: client, each process with its status and type, the current busy step "
+            "(step number, task name, status) and all process data. Prefer this over chaining case/step/task/status tools."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {"case_no": {"type": "integer"}},
+            "required": ["case_no"],
+        },
+    },
+    {
+        "name": "find_cases",
+        "description": (
+            "Search cases (newest first) filtered on the server. status matches any process status, e.g. 'busy' for open cases. "
+            "Returns JSON with total and a page of cases."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "client_id": {"type": "string"},
+                "client_type": {"type": "string"},
+                "status": {"type": "string", "description": "Process status description, e.g. busy or complete"},
+                "limit": {"type": "integer", "description": "Page size (max 100, default 20)"},
+                "offset": {"type": "integer", "description": "Number of matching cases to skip"},
+            },
+        },
+    },
     {
         "name": "get_cases",
         "description": "Return a formatted list of workflow cases (no input params).",
@@ -662,12 +817,25 @@ ANTHROPIC_TOOLS = [
     },
     {
         "name": "close_step",
-        "description": "Close a step by step_id providing optional rule_data (dict).",
+        "description": (
+            "Close a step by step_id. Optional rule_data is saved as process data of the step's process before the "
+            "task rules run. Every key names an existing process data type and a field: either "
+            "{\"<type>.<field>\": value} or {\"<type>\": {\"<field>\": value}}. Plain keys such as "
+            "{\"approved\": true} and unknown types are rejected and the step stays open."
+        ),
         "input_schema": {
             "type": "object",
             "properties": {
                 "step_id": {"type": "integer"},
-                "rule_data": {"type": "object", "description": "Rule data map (key/value)"}
+                "rule_data": {
+                    "type": "object",
+                    "description": (
+                        "Process data to record, keyed '<process data type>.<field>' (e.g. "
+                        "{\"approval.decision\": \"approve\"}) or nested by type ({\"approval\": {\"decision\": "
+                        "\"approve\"}}). The type must be an existing process data type; non-string values are "
+                        "stored as JSON."
+                    ),
+                },
             },
             "required": ["step_id"],
         },
@@ -766,6 +934,7 @@ ANTHROPIC_TOOLS = [
 SYSTEM_PROMPT = (
     "You are the Workflow Agent. You have access to tools that retrieve workflow data. "
     "Reason step-by-step about what information is missing. If the user request requires data, "
+    "prefer get_case_overview for questions about a single case and find_cases for searching, "
     "call the minimal set of tools needed (you may call tools in multiple rounds). After each tool result, "
     "decide if another tool call is necessary. When you have enough information, provide a concise answer. "
     "Never guess values that can be fetched. If parameters are missing, ask the user for them instead of fabricating."
@@ -816,7 +985,27 @@ async def chat(req: ChatRequest):
             # Execute tools
             tool_result_blocks = []
             for tu in tool_uses:
-                if tu.name == "get_cases":
+                if tu.name == "get_case_overview":
+                    inp = getattr(tu, "input", {}) or {}
+                    try:
+                        case_no = int(inp.get("case_no")) if isinstance(inp, dict) and inp.get("case_no") is not None else None
+                    except (TypeError, ValueError):
+                        case_no = None
+                    result = "Missing required parameter case_no." if case_no is None else get_case_overview(case_no)
+                elif tu.name == "find_cases":
+                    inp = getattr(tu, "input", {}) or {}
+                    inp = inp if isinstance(inp, dict) else {}
+                    try:
+                        result = find_cases(
+                            client_id=inp.get("client_id"),
+                            client_type=inp.get("client_type"),
+                            status=inp.get("status"),
+                            limit=inp.get("limit") or 20,
+                            offset=inp.get("offset") or 0,
+                        )
+                    except (TypeError, ValueError):
+                        result = "Invalid limit/offset for find_cases."
+                elif tu.name == "get_cases":
                     result = get_cases()
                 elif tu.name == "get_process_data_for_user":
                     result = get_process_data_for_user()
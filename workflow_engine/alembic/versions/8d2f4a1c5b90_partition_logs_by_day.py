@@ -0,0 +1,130 @@
+"""Partition logs by day and add minute rollups
+
+Revision ID: 8d2f4a1c5b90
+Revises: 6e59f2b68414, 7a1c9d0b1add
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a1c5b90'
+down_revision: Union[str, Sequence[str], None] = ('6e59f2b68414', '7a1c9d0b1add')
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOG_COLUMNS = (
+    "id, level, logger_name, message, pathname, lineno, func, created_at, "
+    "http_method, http_path, status_code, duration_ms, user_agent, client_ip, user_id"
+)
+
+# Partitions created ahead of today; `python -m workflow.maintenance logs` keeps this window rolling
+DAYS_AHEAD = 7
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    # logs used to be created by the app at startup, so it may or may not exist yet
+    legacy = conn.execute(sa.text("SELECT to_regclass('logs') IS NOT NULL")).scalar()
+    if legacy:
+        op.execute("ALTER TABLE logs RENAME TO logs_unpartitioned")
+        op.execute("DROP INDEX IF EXISTS ix_logs_level")
+        op.execute("DROP INDEX IF EXISTS ix_logs_http_path")
+
+    op.execute(
+        """
+        CREATE TABLE logs (
+            id BIGSERIAL NOT NULL,
+            level VARCHAR NOT NULL,
+            logger_name VARCHAR NOT NULL,
+            message VARCHAR NOT NULL,
+            pathname VARCHAR,
+            lineno INTEGER,
+            func VARCHAR,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT (now() AT TIME ZONE 'utc'),
+            http_method VARCHAR,
+            http_path VARCHAR,
+            status_code INTEGER,
+            duration_ms INTEGER,
+            user_agent VARCHAR,
+            client_ip VARCHAR,
+            user_id VARCHAR,
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("CREATE INDEX ix_logs_level ON logs (level)")
+    op.execute("CREATE INDEX ix_logs_http_path ON logs (http_path)")
+    # Catches rows outside the created partitions so inserts never fail
+    op.execute("CREATE TABLE logs_default PARTITION OF logs DEFAULT")
+
+    today = datetime.datetime.utcnow().date()
+    first = today
+    if legacy:
+        oldest = conn.execute(sa.text("SELECT min(created_at) FROM logs_unpartitioned")).scalar()
+        if oldest is not None:
+            first = min(first, oldest.date())
+    day = first
+    while day <= today + datetime.timedelta(days=DAYS_AHEAD):
+        nxt = day + datetime.timedelta(days=1)
+        op.execute(
+            f"CREATE TABLE logs_p{day:%Y%m%d} PARTITION OF logs "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{nxt.isoformat()}')"
+        )
+        day = nxt
+
+    if legacy:
+        op.execute(f"INSERT INTO logs ({LOG_COLUMNS}) SELECT {LOG_COLUMNS} FROM logs_unpartitioned")
+        op.execute("DROP TABLE logs_unpartitioned")
+    op.execute("SELECT setval(pg_get_serial_sequence('logs', 'id'), COALESCE((SELECT max(id) FROM logs), 0) + 1, false)")
+
+    op.create_table(
+        'log_rollups_minute',
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('http_path', sa.String(), nullable=False),
+        sa.Column('request_count', sa.Integer(), nullable=False),
+        sa.Column('error_count', sa.Integer(), nullable=False),
+        sa.Column('p50_ms', sa.Float(), nullable=True),
+        sa.Column('p95_ms', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('bucket', 'http_path'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('log_rollups_minute')
+    op.execute("ALTER TABLE logs RENAME TO logs_partitioned")
+    op.execute("ALTER INDEX ix_logs_level RENAME TO ix_logs_partitioned_level")
+    op.execute("ALTER INDEX ix_logs_http_path RENAME TO ix_logs_partitioned_http_path")
+    op.execute(
+        """
+        CREATE TABLE logs (
+            id SERIAL PRIMARY KEY,
+            level VARCHAR NOT NULL,
+            logger_name VARCHAR NOT NULL,
+            message VARCHAR NOT NULL,
+            pathname VARCHAR,
+            lineno INTEGER,
+            func VARCHAR,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            http_method VARCHAR,
+            http_path VARCHAR,
+            status_code INTEGER,
+            duration_ms INTEGER,
+            user_agent VARCHAR,
+            client_ip VARCHAR,
+            user_id VARCHAR
+        )
+        """
+    )
+    op.execute(f"INSERT INTO logs ({LOG_COLUMNS}) SELECT {LOG_COLUMNS} FROM logs_partitioned")
+    op.execute("SELECT setval(pg_get_serial_sequence('logs', 'id'), COALESCE((SELECT max(id) FROM logs), 0) + 1, false)")
+    op.execute("DROP TABLE logs_partitioned")
+    op.create_index('ix_logs_level', 'logs', ['level'])
+    op.create_index('ix_logs_http_path', 'logs', ['http_path'])
@@ -0,0 +1,32 @@
+"""Add log search indexes
+
+Revision ID: 9b3e5d7f2a61
+Revises: 8d2f4a1c5b90
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5d7f2a61'
+down_revision: Union[str, Sequence[str], None] = '8d2f4a1c5b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Indexes on the partitioned parent cascade to every existing and future partition
+    op.create_index('ix_logs_created_at_level', 'logs', ['created_at', 'level'])
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX ix_logs_message_trgm ON logs USING gin (message gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_logs_message_trgm', table_name='logs')
+    op.drop_index('ix_logs_created_at_level', table_name='logs')
@@ -0,0 +1,33 @@
+"""Add work-queue claims to steps
+
+Revision ID: a4c6e8f0b2d1
+Revises: 9b3e5d7f2a61
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c6e8f0b2d1'
+down_revision: Union[str, Sequence[str], None] = '9b3e5d7f2a61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('steps', sa.Column('claimed_by', sa.String(), nullable=True))
+    op.add_column('steps', sa.Column('claim_expires_at', sa.DateTime(), nullable=True))
+    # Serves the claim query: busy steps of one task in stepno order
+    op.create_index('ix_steps_taskno_status_no_stepno', 'steps', ['taskno', 'status_no', 'stepno'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_steps_taskno_status_no_stepno', table_name='steps')
+    op.drop_column('steps', 'claim_expires_at')
+    op.drop_column('steps', 'claimed_by')
@@ -0,0 +1,80 @@
+"""Add archive tables for completed processes, their steps and process data
+
+Revision ID: a8c0e2f4b6d9
+Revises: f6b8d0e2a4c7
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c0e2f4b6d9'
+down_revision: Union[str, Sequence[str], None] = 'f6b8d0e2a4c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'processes_archive',
+        sa.Column('processno', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('case_no', sa.Integer(), nullable=True),
+        sa.Column('status_no', sa.Integer(), nullable=True),
+        sa.Column('process_type_no', sa.Integer(), nullable=True),
+        sa.Column('date_started', sa.DateTime(), nullable=True),
+        sa.Column('date_ended', sa.DateTime(), nullable=True),
+        sa.Column('tmstamp', sa.DateTime(), nullable=True),
+        sa.Column('usrid', sa.String(), nullable=True),
+        sa.Column('current_stepno', sa.Integer(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('processno'),
+    )
+    op.create_index('ix_processes_archive_case_no', 'processes_archive', ['case_no'])
+    op.create_table(
+        'steps_archive',
+        sa.Column('stepno', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('processno', sa.Integer(), nullable=True),
+        sa.Column('taskno', sa.Integer(), nullable=True),
+        sa.Column('status_no', sa.Integer(), nullable=True),
+        sa.Column('date_started', sa.DateTime(), nullable=True),
+        sa.Column('date_ended', sa.DateTime(), nullable=True),
+        sa.Column('tmstamp', sa.DateTime(), nullable=True),
+        sa.Column('usrid', sa.String(), nullable=True),
+        sa.Column('claimed_by', sa.String(), nullable=True),
+        sa.Column('claim_expires_at', sa.DateTime(), nullable=True),
+        sa.Column('due_at', sa.DateTime(), nullable=True),
+        sa.Column('escalated_at', sa.DateTime(), nullable=True),
+        sa.Column('exec_attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('exec_error', sa.String(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('stepno'),
+    )
+    op.create_index('ix_steps_archive_processno', 'steps_archive', ['processno'])
+    op.create_table(
+        'process_data_archive',
+        sa.Column('process_data_no', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('processno', sa.Integer(), nullable=True),
+        sa.Column('process_data_type_no', sa.Integer(), nullable=True),
+        sa.Column('fieldname', sa.String(), nullable=True),
+        sa.Column('value', sa.String(), nullable=True),
+        sa.Column('tmstamp', sa.DateTime(), nullable=True),
+        sa.Column('usrid', sa.String(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('process_data_no'),
+    )
+    op.create_index('ix_process_data_archive_processno', 'process_data_archive', ['processno'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_process_data_archive_processno', table_name='process_data_archive')
+    op.drop_table('process_data_archive')
+    op.drop_index('ix_steps_archive_processno', table_name='steps_archive')
+    op.drop_table('steps_archive')
+    op.drop_index('ix_processes_archive_case_no', table_name='processes_archive')
+    op.drop_table('processes_archive')
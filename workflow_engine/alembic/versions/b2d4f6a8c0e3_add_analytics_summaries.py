@@ -0,0 +1,71 @@
+"""Add analytics summary tables and the date indexes their refresh reads
+
+Revision ID: b2d4f6a8c0e3
+Revises: a8c0e2f4b6d9
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2d4f6a8c0e3'
+down_revision: Union[str, Sequence[str], None] = 'a8c0e2f4b6d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_steps_date_ended', 'steps', ['date_ended'])
+    op.create_index('ix_processes_date_started', 'processes', ['date_started'])
+    op.create_index('ix_processes_date_ended', 'processes', ['date_ended'])
+
+    op.create_table(
+        'analytics_step_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('taskno', sa.Integer(), nullable=False),
+        sa.Column('completed', sa.Integer(), nullable=False),
+        sa.Column('total_seconds', sa.Float(), nullable=False),
+        sa.Column('p50_seconds', sa.Float(), nullable=True),
+        sa.Column('p90_seconds', sa.Float(), nullable=True),
+        sa.Column('p95_seconds', sa.Float(), nullable=True),
+        sa.PrimaryKeyConstraint('day', 'taskno'),
+    )
+    op.create_table(
+        'analytics_process_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('process_type_no', sa.Integer(), nullable=False),
+        sa.Column('started', sa.Integer(), nullable=False),
+        sa.Column('completed', sa.Integer(), nullable=False),
+        sa.Column('total_cycle_seconds', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'process_type_no'),
+    )
+    op.create_table(
+        'analytics_task_status_counts',
+        sa.Column('taskno', sa.Integer(), nullable=False),
+        sa.Column('status_no', sa.Integer(), nullable=False),
+        sa.Column('steps', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('taskno', 'status_no'),
+    )
+    op.create_table(
+        'analytics_process_type_status_counts',
+        sa.Column('process_type_no', sa.Integer(), nullable=False),
+        sa.Column('status_no', sa.Integer(), nullable=False),
+        sa.Column('processes', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('process_type_no', 'status_no'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('analytics_process_type_status_counts')
+    op.drop_table('analytics_task_status_counts')
+    op.drop_table('analytics_process_daily')
+    op.drop_table('analytics_step_daily')
+    op.drop_index('ix_processes_date_ended', table_name='processes')
+    op.drop_index('ix_processes_date_started', table_name='processes')
+    op.drop_index('ix_steps_date_ended', table_name='steps')
@@ -0,0 +1,79 @@
+"""Replace the refreshed open-work count tables with live sharded counters
+
+Revision ID: c4e6a8b0d2f5
+Revises: b2d4f6a8c0e3
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e6a8b0d2f5'
+down_revision: Union[str, Sequence[str], None] = 'b2d4f6a8c0e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_table('analytics_process_type_status_counts')
+    op.drop_table('analytics_task_status_counts')
+
+    op.create_table(
+        'task_status_counters',
+        sa.Column('taskno', sa.Integer(), nullable=False),
+        sa.Column('status_no', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('steps', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('taskno', 'status_no', 'shard'),
+    )
+    op.create_table(
+        'process_type_status_counters',
+        sa.Column('process_type_no', sa.Integer(), nullable=False),
+        sa.Column('status_no', sa.Integer(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.Column('processes', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('process_type_no', 'status_no', 'shard'),
+    )
+    # Seed from the open rows; run `python -m workflow.maintenance counters-reconcile` after deploying to pick up
+    # transitions made by application servers that were still running the old code
+    op.execute(
+        """
+        INSERT INTO task_status_counters (taskno, status_no, shard, steps)
+        SELECT taskno, status_no, 0, count(*) FROM steps
+        WHERE date_ended IS NULL AND taskno IS NOT NULL AND status_no IS NOT NULL
+        GROUP BY taskno, status_no
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO process_type_status_counters (process_type_no, status_no, shard, processes)
+        SELECT process_type_no, status_no, 0, count(*) FROM processes
+        WHERE date_ended IS NULL AND process_type_no IS NOT NULL AND status_no IS NOT NULL
+        GROUP BY process_type_no, status_no
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('process_type_status_counters')
+    op.drop_table('task_status_counters')
+    op.create_table(
+        'analytics_task_status_counts',
+        sa.Column('taskno', sa.Integer(), nullable=False),
+        sa.Column('status_no', sa.Integer(), nullable=False),
+        sa.Column('steps', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('taskno', 'status_no'),
+    )
+    op.create_table(
+        'analytics_process_type_status_counts',
+        sa.Column('process_type_no', sa.Integer(), nullable=False),
+        sa.Column('status_no', sa.Integer(), nullable=False),
+        sa.Column('processes', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('process_type_no', 'status_no'),
+    )
@@ -0,0 +1,40 @@
+"""Add SLA timers to tasks and steps
+
+Revision ID: c9e1a3b5d7f4
+Revises: b7d9f1a3c5e2
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9e1a3b5d7f4'
+down_revision: Union[str, Sequence[str], None] = 'b7d9f1a3c5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('sla_seconds', sa.Integer(), nullable=True))
+    op.add_column('tasks', sa.Column('sla_action', sa.String(), nullable=True))
+    op.add_column('steps', sa.Column('due_at', sa.DateTime(), nullable=True))
+    op.add_column('steps', sa.Column('escalated_at', sa.DateTime(), nullable=True))
+    # Only pending timers (open, not yet escalated) are indexed, so the poller's scan does not grow with history
+    op.create_index(
+        'ix_steps_due_at_pending', 'steps', ['due_at'],
+        postgresql_where=sa.text('due_at IS NOT NULL AND escalated_at IS NULL AND date_ended IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_steps_due_at_pending', table_name='steps')
+    op.drop_column('steps', 'escalated_at')
+    op.drop_column('steps', 'due_at')
+    op.drop_column('tasks', 'sla_action')
+    op.drop_column('tasks', 'sla_seconds')
@@ -0,0 +1,30 @@
+"""Add automated execution attempts to steps
+
+Revision ID: d2f4b6c8e0a3
+Revises: c9e1a3b5d7f4
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f4b6c8e0a3'
+down_revision: Union[str, Sequence[str], None] = 'c9e1a3b5d7f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('steps', sa.Column('exec_attempts', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('steps', sa.Column('exec_error', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('steps', 'exec_error')
+    op.drop_column('steps', 'exec_attempts')
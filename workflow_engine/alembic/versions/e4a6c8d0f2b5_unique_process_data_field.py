@@ -0,0 +1,41 @@
+"""Make process data unique per process, type and field
+
+Revision ID: e4a6c8d0f2b5
+Revises: d2f4b6c8e0a3
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a6c8d0f2b5'
+down_revision: Union[str, Sequence[str], None] = 'd2f4b6c8e0a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Rules read the newest row of a field, so keep that one and drop older duplicates
+    op.execute(
+        """
+        DELETE FROM process_data pd
+        USING process_data newer
+        WHERE newer.processno = pd.processno
+          AND newer.process_data_type_no = pd.process_data_type_no
+          AND newer.fieldname = pd.fieldname
+          AND newer.process_data_no > pd.process_data_no
+        """
+    )
+    op.create_unique_constraint(
+        'uq_process_data_process_type_field', 'process_data', ['processno', 'process_data_type_no', 'fieldname']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_process_data_process_type_field', 'process_data', type_='unique')
@@ -0,0 +1,71 @@
+"""Add current-step pointer to processes and open-process summary to cases
+
+Revision ID: f6b8d0e2a4c7
+Revises: e4a6c8d0f2b5
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6b8d0e2a4c7'
+down_revision: Union[str, Sequence[str], None] = 'e4a6c8d0f2b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('processes', sa.Column('current_stepno', sa.Integer(), nullable=True))
+    op.add_column('cases', sa.Column('current_processno', sa.Integer(), nullable=True))
+    op.add_column('cases', sa.Column('open_process_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill: the newest open step of each open process, then per case the newest open process and the count
+    op.execute(
+        """
+        UPDATE processes p
+        SET current_stepno = s.stepno
+        FROM (
+            SELECT processno, max(stepno) AS stepno
+            FROM steps
+            WHERE date_ended IS NULL
+            GROUP BY processno
+        ) s
+        WHERE s.processno = p.processno AND p.date_ended IS NULL
+        """
+    )
+    op.execute(
+        """
+        UPDATE cases c
+        SET current_processno = o.processno, open_process_count = o.n
+        FROM (
+            SELECT case_no, max(processno) AS processno, count(*) AS n
+            FROM processes
+            WHERE date_ended IS NULL
+            GROUP BY case_no
+        ) o
+        WHERE o.case_no = c.caseno
+        """
+    )
+
+    op.create_index(
+        'ix_processes_case_no_open', 'processes', ['case_no'],
+        postgresql_where=sa.text('current_stepno IS NOT NULL'),
+    )
+    op.create_index(
+        'ix_cases_usrid_open', 'cases', ['usrid'],
+        postgresql_where=sa.text('open_process_count > 0'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_cases_usrid_open', table_name='cases')
+    op.drop_index('ix_processes_case_no_open', table_name='processes')
+    op.drop_column('cases', 'open_process_count')
+    op.drop_column('cases', 'current_processno')
+    op.drop_column('processes', 'current_stepno')
@@ -0,0 +1 @@
+# Local benchmarks for the workflow engine; run from the workflow_engine folder, e.g. python -m benchmarks.list_responses
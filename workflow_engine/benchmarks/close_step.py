@@ -0,0 +1,143 @@
+"""
+Throughput and latency of close_step when many workers close steps at the same time.
+
+    cd workflow_engine
+    python -m benchmarks.close_step --cases 1000 --threads 1 4 16 --attempts 2
+
+Needs SQLALCHEMY_DATABASE_URL. Each close commits on its own connection, so the synthetic data cannot be rolled
+back: use a scratch database. For every --threads value, --cases cases of a bench-<tag> process type are created,
+each with a busy first step and process data that routes it to a second task. Every step is then closed --attempts
+times from a thread pool (attempts on the same step run side by side), so --attempts 2 also measures the cost of
+the per-process lock. Latency is per attempt; closes/s counts successful closes.
+"""
+import argparse
+import logging
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from workflow import schemas
+from workflow.db import models
+from workflow.db.database import SessionLocal
+from workflow.doa import cases as cases_dao
+from workflow.doa import steps as steps_dao
+
+
+def _seed_definition(db: Session) -> dict:
+    """A user and a two-task process type whose first task routes to the second on process data."""
+    tag = uuid.uuid4().hex[:8]
+    owner = models.User(username=f"bench-{tag}", hashed_password="-", role="admin", usrid="bench")
+    db.add(owner)
+    for description in ("busy", "complete"):
+        if not db.query(models.Status).filter(models.Status.description.ilike(description)).first():
+            db.add(models.Status(description=description, usrid="bench"))
+    ptype = models.ProcessType(description=f"bench-{tag}", usrid="bench")
+    dtype = models.ProcessDataType(description=f"bench{tag}", usrid="bench")
+    db.add_all([ptype, dtype])
+    db.flush()
+    pdef = models.ProcessDefinition(process_type_no=ptype.process_type_no, version="1", is_active=True, usrid="bench")
+    db.add(pdef)
+    db.flush()
+    first, second = (
+        models.Task(process_definition_no=pdef.process_definition_no, description=f"bench {i}", reference="", usrid="bench")
+        for i in range(2)
+    )
+    db.add_all([first, second])
+    db.flush()
+    db.add_all([
+        models.TaskRule(taskno=first.taskno, rule=f"procdata.{dtype.description}.next == 'yes'",
+                        next_task_no=second.taskno, usrid="bench"),
+        models.TaskRule(taskno=first.taskno, rule="default", next_task_no=None, usrid="bench"),
+        models.TaskRule(taskno=second.taskno, rule="default", next_task_no=None, usrid="bench"),
+    ])
+    pdef.start_task_no = first.taskno
+    db.commit()
+    return {"owner": owner.username, "process_type_no": ptype.process_type_no,
+            "process_data_type_no": dtype.process_data_type_no}
+
+
+def _seed_cases(db: Session, definition: dict, cases: int) -> list[int]:
+    """Open cases through create_case, as the API does; returns the stepno of each case's busy step."""
+    stepnos = []
+    for i in range(cases):
+        case = cases_dao.create_case(db, schemas.CaseCreate(client_id=f"bench-{i}", client_type="bench"),
+                                     definition["process_type_no"], definition["owner"])
+        process = case.processes[0]
+        db.add(models.ProcessData(processno=process.processno, process_data_type_no=definition["process_data_type_no"],
+                                  fieldname="next", value="yes", usrid="bench"))
+        stepnos.append(process.current_stepno)
+    db.commit()
+    return stepnos
+
+
+def _run(stepnos: list[int], owner: str, threads: int, attempts: int) -> tuple[float, list[float], int]:
+    """Close every step attempts times on a pool of threads; returns wall seconds, per-attempt ms and wins."""
+    samples: list[float] = []
+    wins = 0
+    lock = threading.Lock()
+
+    def close(stepno: int) -> None:
+        nonlocal wins
+        db = SessionLocal()
+        start = time.perf_counter()
+        try:
+            steps_dao.close_step(db, stepno, schemas.CloseStepRequest(rule_data={}), owner)
+            db.commit()
+            won = 1
+        except HTTPException:
+            db.rollback()
+            won = 0
+        finally:
+            db.close()
+        with lock:
+            samples.append((time.perf_counter() - start) * 1000.0)
+            wins += won
+
+    # Attempts on the same step are adjacent, so they run at the same time on different threads
+    work = [stepno for stepno in stepnos for _ in range(attempts)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(close, work))
+    return time.perf_counter() - started, samples, wins
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=1000, help="cases (busy steps) per --threads value")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--attempts", type=int, default=2, help="concurrent close attempts per step")
+    args = parser.parse_args()
+
+    # Keep per-request logging (and its inserts) out of the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+
+    db = SessionLocal()
+    try:
+        definition = _seed_definition(db)
+    finally:
+        db.close()
+
+    header = f"{'threads':>8}{'closes':>9}{'attempts':>10}{'seconds':>10}{'closes/s':>11}{'p50':>10}{'p95':>10}"
+    print(header)
+    print("-" * len(header))
+    for threads in args.threads:
+        db = SessionLocal()
+        try:
+            stepnos = _seed_cases(db, definition, args.cases)
+        finally:
+            db.close()
+        elapsed, samples, wins = _run(stepnos, definition["owner"], threads, args.attempts)
+        assert wins == len(stepnos), f"{wins} successful closes for {len(stepnos)} steps"
+        p50 = statistics.median(samples)
+        p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else p50
+        print(f"{threads:>8}{wins:>9}{len(samples):>10}{elapsed:>10.2f}{wins / elapsed:>11.0f}"
+              f"{p50:>8.1f}ms{p95:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main_cli()
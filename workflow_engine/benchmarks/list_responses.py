@@ -0,0 +1,149 @@
+"""
+Response time of the list endpoints on the orjson/Core-row path against the previous ORM + response_model path.
+
+    cd workflow_engine
+    python -m benchmarks.list_responses --rows 10000 --iterations 10
+
+Needs SQLALCHEMY_DATABASE_URL. Seeds --rows synthetic cases, each with a process, a step and a process data row,
+inside one transaction that is rolled back at the end, so nothing is left behind. The previous path is
+re-registered under /_orm so both run through the same app and middleware. /cases and /process-data are read as
+the synthetic (non-admin) owner and return exactly --rows rows; /steps is admin-only and lists every step.
+"""
+import argparse
+import datetime
+import logging
+import statistics
+import time
+import uuid
+
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import main
+from workflow import schemas
+from workflow.auth.security import create_access_token
+from workflow.db import models
+from workflow.db.database import engine
+from workflow.dependencies import get_db
+
+
+def _seed(db: Session, rows: int) -> dict:
+    tag = uuid.uuid4().hex[:8]
+    now = datetime.datetime.utcnow()
+    owner, admin = f"bench-{tag}", f"bench-admin-{tag}"
+    db.add_all([models.User(username=owner, hashed_password="-", role="user", usrid="bench"),
+                models.User(username=admin, hashed_password="-", role="admin", usrid="bench")])
+    status = models.Status(description=f"bench-{tag}", usrid="bench")
+    ptype = models.ProcessType(description=f"bench-{tag}", usrid="bench")
+    dtype = models.ProcessDataType(description=f"bench-{tag}", usrid="bench")
+    db.add_all([status, ptype, dtype])
+    db.flush()
+    pdef = models.ProcessDefinition(process_type_no=ptype.process_type_no, version="1", is_active=True, usrid="bench")
+    db.add(pdef)
+    db.flush()
+    task = models.Task(process_definition_no=pdef.process_definition_no, description="bench", reference="", usrid="bench")
+    db.add(task)
+    db.flush()
+
+    casenos = db.execute(insert(models.Case).returning(models.Case.caseno), [
+        dict(client_id=f"client-{i}", client_type="bench", usrid=owner, open_process_count=1, date_created=now, tmstamp=now)
+        for i in range(rows)
+    ]).scalars().all()
+    processnos = db.execute(insert(models.Process).returning(models.Process.processno), [
+        dict(case_no=caseno, status_no=status.statusno, process_type_no=ptype.process_type_no, usrid=owner,
+             date_started=now, tmstamp=now)
+        for caseno in casenos
+    ]).scalars().all()
+    db.execute(insert(models.Step), [
+        dict(processno=processno, taskno=task.taskno, status_no=status.statusno, usrid=owner, date_started=now, tmstamp=now)
+        for processno in processnos
+    ])
+    db.execute(insert(models.ProcessData), [
+        dict(processno=processno, process_data_type_no=dtype.process_data_type_no, fieldname="amount", value=str(i),
+             usrid=owner, tmstamp=now)
+        for i, processno in enumerate(processnos)
+    ])
+    return {"owner": owner, "admin": admin}
+
+
+def _register_orm_routes() -> None:
+    """The list routes as they were: ORM entities serialized through response_model."""
+    from workflow.auth import get_current_user
+
+    def cases(db: Session = Depends(get_db), user=Depends(get_current_user)):
+        return db.query(models.Case).filter(models.Case.usrid == user.username).all()
+
+    def steps(db: Session = Depends(get_db)):
+        return db.query(models.Step).all()
+
+    def process_data(db: Session = Depends(get_db), user=Depends(get_current_user)):
+        return (
+            db.query(models.ProcessData)
+            .join(models.Process, models.ProcessData.processno == models.Process.processno)
+            .join(models.Case, models.Process.case_no == models.Case.caseno)
+            .filter(models.Case.usrid == user.username)
+            .all()
+        )
+
+    main.app.add_api_route("/_orm/cases", cases, response_model=list[schemas.Case])
+    main.app.add_api_route("/_orm/steps", steps, response_model=list[schemas.Step])
+    main.app.add_api_route("/_orm/process-data", process_data, response_model=list[schemas.ProcessData])
+
+
+def _time(client: TestClient, path: str, headers: dict, iterations: int, warmup: int) -> tuple[list[float], int, int]:
+    for _ in range(warmup):
+        client.get(path, headers=headers)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    response.raise_for_status()
+    return samples, len(response.json()), len(response.content)
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000, help="synthetic cases (and processes, steps, data rows)")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=2)
+    args = parser.parse_args()
+
+    # Keep per-request logging (and its inserts) out of the measurements
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        db = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            users = _seed(db, args.rows)
+            db.flush()
+
+            def bench_db():
+                yield db
+
+            main.app.dependency_overrides[get_db] = bench_db
+            _register_orm_routes()
+            client = TestClient(main.app)
+            owner = {"Authorization": f"Bearer {create_access_token({'sub': users['owner']})}"}
+            admin = {"Authorization": f"Bearer {create_access_token({'sub': users['admin']})}"}
+
+            header = f"{'endpoint':<16}{'rows':>8}{'bytes':>12}{'orm p50':>14}{'fast p50':>14}{'speedup':>10}"
+            print(header)
+            print("-" * len(header))
+            for path, headers in (("/cases", owner), ("/steps", admin), ("/process-data", owner)):
+                orm, rows, size = _time(client, "/_orm" + path, headers, args.iterations, args.warmup)
+                fast, fast_rows, _ = _time(client, path, headers, args.iterations, args.warmup)
+                assert rows == fast_rows, f"{path}: {rows} rows on the ORM path, {fast_rows} on the fast path"
+                orm_ms, fast_ms = statistics.median(orm), statistics.median(fast)
+                print(f"{path:<16}{rows:>8}{size:>12}{orm_ms:>12.1f}ms{fast_ms:>12.1f}ms{orm_ms / fast_ms:>9.1f}x")
+        finally:
+            main.app.dependency_overrides.pop(get_db, None)
+            db.close()
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,4 +1,6 @@
 import logging
+import math
+import os
 import time
 import re
 from fastapi import FastAPI, Request
@@ -6,8 +8,15 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from jose import jwt
 from workflow.auth.security import SECRET_KEY, ALGORITHM
+from workflow import metrics as app_metrics
+from workflow.events import BROKER as event_broker
+from workflow import sla
+from workflow import executor
 from workflow.logging_db import setup_db_logging
-from workflow.db.database import SessionLocal, engine
+from workflow.db.database import REPLICAS, SessionLocal, engine
+from workflow.dependencies import READ_YOUR_WRITES_COOKIE, READ_YOUR_WRITES_SECONDS
+from workflow.db import schema_check
+from workflow.db.instrumentation import track_queries, server_timing
 from workflow.routers import (
     auth,
     cases,
@@ -20,25 +29,73 @@ from workflow.routers import (
     steps,
     statuses,
     process_data,
+    metrics,
+    logs,
+    events,
+    exports,
+    analytics,
 )
 
 # Initialize DB logging early
-setup_db_logging(SessionLocal, engine)
+setup_db_logging(SessionLocal)
+app_metrics.track_pool(engine)
 
 app = FastAPI()
 
-# Serve static frontend
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Serve static frontend (resolved relative to this file so the app can be imported from other processes)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 @app.get("/", include_in_schema=False)
 def root():
-    return FileResponse("static/index.html")
+    return FileResponse(os.path.join(STATIC_DIR, "index.html"))
+
+# Read-your-writes: after a successful write, send this client's reads to the primary for a few seconds
+@app.middleware("http")
+async def mark_recent_writes(request: Request, call_next):
+    response = await call_next(request)
+    if REPLICAS.engines and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE, f"{time.time():.3f}", max_age=math.ceil(READ_YOUR_WRITES_SECONDS),
+            httponly=True, samesite="lax",
+        )
+    return response
+
+# Request metrics middleware (registered first so it runs inside the logging middleware and
+# attributes only the handler's own SQL to the request)
+@app.middleware("http")
+async def record_metrics(request: Request, call_next):
+    if request.url.path == "/metrics":
+        return await call_next(request)
+    app_metrics.HTTP_REQUESTS_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    status_code = 500
+    with track_queries(request.method, request.url.path) as query_stats:
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            response.headers["Server-Timing"] = server_timing(query_stats, time.perf_counter() - start)
+            return response
+        finally:
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            app_metrics.HTTP_REQUESTS_IN_FLIGHT.dec()
+            app_metrics.HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start, method=request.method, route=route_path, status=status_code
+            )
+            app_metrics.DB_QUERIES_PER_REQUEST.observe(query_stats.count, route=route_path)
+            app_metrics.DB_TIME_PER_REQUEST.observe(query_stats.seconds, route=route_path)
+            app_metrics.REGISTRY.flush()
 
 # HTTP logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     logger = logging.getLogger("app")
 
+    # Prometheus scrapes are frequent and carry no audit value
+    if request.url.path == "/metrics":
+        return await call_next(request)
+
     def _sanitize_body(body_text: str, content_type: str, path: str) -> str:
         # Mask common sensitive fields
         try:
@@ -54,8 +111,10 @@ async def log_requests(request: Request, call_next):
 
     def _user_from_auth_header() -> str:
         auth = request.headers.get("authorization") or request.headers.get("Authorization") or ""
+        token = request.query_params.get("access_token") or ""
         if auth.lower().startswith("bearer "):
             token = auth.split(" ", 1)[1].strip()
+        if token:
             try:
                 payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
                 sub = payload.get("sub")
@@ -68,7 +127,8 @@ async def log_requests(request: Request, call_next):
     start = time.time()
     ua = request.headers.get("user-agent", "")
     ip = request.client.host if request.client else "-"
-    qs = request.url.query or ""
+    # Tokens passed in the query string (EventSource clients) must not reach the logs
+    qs = re.sub(r'(access_token=)[^&]+', r'\1***', request.url.query or "")
     ct = request.headers.get("content-type", "") or ""
     user_id = _user_from_auth_header()
     # Read body once; Starlette caches it so handlers can still access it
@@ -141,10 +201,23 @@ async def log_requests(request: Request, call_next):
 @app.on_event("startup")
 async def on_startup():
     logging.getLogger("app").info("Application startup")
+    # Schema checks (and any DDL) happen here, once, never on the request path
+    if schema_check.SCHEMA_CHECK_ON_STARTUP:
+        try:
+            schema_check.ensure_schema(engine, repair_problems=schema_check.SCHEMA_REPAIR_ON_STARTUP)
+        except Exception:
+            logging.getLogger("app").exception("Schema check failed")
+    if sla.SLA_SCHEDULER_ENABLED:
+        sla.SCHEDULER.start()
+    if executor.EXECUTOR_ENABLED:
+        executor.EXECUTOR.start()
 
 @app.on_event("shutdown")
 async def on_shutdown():
     logging.getLogger("app").info("Application shutdown")
+    event_broker.stop()
+    sla.SCHEDULER.stop()
+    executor.EXECUTOR.stop()
 
 # Register routers
 app.include_router(auth.router)
@@ -158,5 +231,10 @@ app.include_router(task_rules.router)
 app.include_router(steps.router)
 app.include_router(statuses.router)
 app.include_router(process_data.router)
+app.include_router(metrics.router)
+app.include_router(logs.router)
+app.include_router(events.router)
+app.include_router(exports.router)
+app.include_router(analytics.router)
 
 
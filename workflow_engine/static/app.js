@@ -148,6 +148,7 @@ async function register(username, password) {
 }
 
 function logout() {
+  unsubscribeCaseEvents();
   state.token = null;
   state.user = null;
   setAuthStatus();
@@ -690,6 +691,44 @@ async function selectCase(c) {
   await refreshUserCurrent();
   await loadCaseProcessData(c.caseno);
   await loadCaseSteps(c.caseno);
+  subscribeCaseEvents(c.caseno);
+}
+
+// Live updates for the selected case via server-sent events (replaces re-fetching after every action)
+let caseEvents = null;
+
+function unsubscribeCaseEvents() {
+  if (caseEvents) {
+    caseEvents.close();
+    caseEvents = null;
+  }
+}
+
+function subscribeCaseEvents(caseNo) {
+  unsubscribeCaseEvents();
+  if (!state.token || !caseNo || typeof EventSource === "undefined") return;
+  const source = new EventSource(`${api.baseUrl}/events?case_no=${caseNo}&access_token=${encodeURIComponent(state.token)}`);
+  let pending = null;
+  const refresh = () => {
+    // Coalesce bursts (e.g. step_closed followed by process_completed) into one refresh
+    if (pending) return;
+    pending = setTimeout(async () => {
+      pending = null;
+      if (state.userPortal.currentCase?.caseno !== caseNo) return;
+      await refreshUserCurrent();
+      await loadCaseProcessData(caseNo);
+      await loadCaseSteps(caseNo);
+    }, 100);
+  };
+  ["case_created", "step_closed", "process_completed", "process_data_changed"].forEach(type => {
+    source.addEventListener(type, refresh);
+  });
+  caseEvents = source;
+}
+
+// True when the event stream will deliver the refresh for our own changes
+function liveUpdates() {
+  return !!caseEvents && caseEvents.readyState === EventSource.OPEN;
 }
 
 function updateProcessDataFormEnabled() {
@@ -801,6 +840,7 @@ function bindUserPortal() {
         await refreshUserCurrent();
         await loadCaseProcessData(created.caseno);
         await loadCaseSteps(created.caseno);
+        subscribeCaseEvents(created.caseno);
       } catch (err) {
         notify(`Create case failed: ${err.message}`, "error");
       }
@@ -841,7 +881,7 @@ function bindUserPortal() {
         notify("Process data added", "success");
         document.getElementById("user-pd-field").value = "";
         document.getElementById("user-pd-value").value = "";
-        await loadCaseProcessData(c.caseno);
+        if (!liveUpdates()) await loadCaseProcessData(c.caseno);
       } catch (err) {
         notify(`Add process data failed: ${err.message}`, "error");
       }
@@ -887,7 +927,7 @@ function bindUserPortal() {
         const idEl = document.getElementById("user-pd-edit-id"); if (idEl) idEl.value = "";
         const fieldEl = document.getElementById("user-pd-edit-field"); if (fieldEl) fieldEl.value = "";
         const valueEl = document.getElementById("user-pd-edit-value"); if (valueEl) valueEl.value = "";
-        await loadCaseProcessData(c.caseno);
+        if (!liveUpdates()) await loadCaseProcessData(c.caseno);
       } catch (err) {
         notify(`Update process data failed: ${err.message}`, "error");
       }
@@ -910,6 +950,7 @@ function bindUserPortal() {
       try {
         await api.post(`/steps/${step.stepno}/close`, { rule_data: {} });
         notify("Step closed", "success");
+        if (liveUpdates()) return;
         await refreshUserCurrent();
         if (c?.caseno) {
           await loadCaseProcessData(c.caseno);
@@ -956,6 +997,7 @@ function clearFieldsAndLists() {
   containersToClear.forEach(id => { const el = document.getElementById(id); if (el) el.innerHTML = ""; });
 
   // Reset user portal state and disable add-data when no busy step
+  unsubscribeCaseEvents();
   state.userPortal.currentCase = null;
   state.userPortal.currentStep = null;
   updateProcessDataFormEnabled?.();
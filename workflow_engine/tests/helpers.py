@@ -0,0 +1,120 @@
+import os
+import re
+import unittest
+import uuid
+from contextlib import contextmanager
+
+from workflow.db.instrumentation import track_queries
+
+# Endpoint tests need a real (PostgreSQL) database; they are skipped when none is configured
+DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "")
+
+requires_database = unittest.skipUnless(DATABASE_URL, "SQLALCHEMY_DATABASE_URL not set")
+
+_SERVER_TIMING_QUERIES = re.compile(r'db;dur=[0-9.]+;desc="(\d+) queries"')
+
+
+def query_count(response) -> int:
+    """Number of SQL statements the endpoint issued, read from its Server-Timing header."""
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get("Server-Timing", ""))
+    if not match:
+        raise AssertionError("Response has no Server-Timing db entry")
+    return int(match.group(1))
+
+
+def assert_max_queries(testcase: unittest.TestCase, response, max_count: int):
+    """Fail if the request that produced response issued more than max_count SQL statements."""
+    count = query_count(response)
+    testcase.assertLessEqual(
+        count, max_count,
+        f"{response.request.method} {response.request.url.path} issued {count} SQL statements (max {max_count})",
+    )
+    return response
+
+
+@contextmanager
+def max_queries(testcase: unittest.TestCase, max_count: int, label: str = "block"):
+    """Same check for code called directly (DAO functions) rather than through the app."""
+    with track_queries() as stats:
+        yield stats
+    testcase.assertLessEqual(stats.count, max_count, f"{label} issued {stats.count} SQL statements (max {max_count})")
+
+
+def auth_headers(username: str) -> dict:
+    """Bearer token header for username."""
+    from workflow.auth.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}"}
+
+
+class WorkflowTestCase(unittest.TestCase):
+    """
+    Endpoint tests against one workflow seeded per class: cls.client (a TestClient on the app), cls.seed (see
+    seed_workflow) and cls.headers for its admin. Subclasses set steps and may override extend_seed to add rows in
+    the same session before it is closed.
+    """
+
+    steps = 2
+
+    @classmethod
+    def setUpClass(cls):
+        from fastapi.testclient import TestClient
+        from workflow.db.database import SessionLocal
+        import main
+
+        cls.client = TestClient(main.app)
+        db = SessionLocal()
+        try:
+            cls.seed = seed_workflow(db, steps=cls.steps)
+            cls.extend_seed(db)
+        finally:
+            db.close()
+        cls.headers = auth_headers(cls.seed["username"])
+
+    @classmethod
+    def extend_seed(cls, db) -> None:
+        pass
+
+
+def seed_workflow(db, steps: int = 2) -> dict:
+    """
+    Create an admin user, the 'busy'/'complete' statuses (if missing), a process type whose definition chains
+    `steps` tasks with default rules, and one case. Returns the created ids plus an admin bearer token.
+    """
+    from workflow.db import models
+    from workflow.auth.security import create_access_token
+    from workflow.doa import users as users_dao
+    from workflow import schemas
+    from workflow.doa import cases as cases_dao
+
+    tag = uuid.uuid4().hex[:8]
+    admin = users_dao.create_user(db, f"admin-{tag}", "secret", "admin", "tests")
+    for description in ("busy", "complete"):
+        if not db.query(models.Status).filter(models.Status.description.ilike(description)).first():
+            db.add(models.Status(description=description, usrid="tests"))
+    ptype = models.ProcessType(description=f"type-{tag}", usrid="tests")
+    db.add(ptype)
+    db.flush()
+    pdef = models.ProcessDefinition(process_type_no=ptype.process_type_no, version="1", is_active=True, usrid="tests")
+    db.add(pdef)
+    db.flush()
+    tasks = []
+    for i in range(steps):
+        task = models.Task(process_definition_no=pdef.process_definition_no, description=f"task {i}", reference="", usrid="tests")
+        db.add(task)
+        db.flush()
+        tasks.append(task)
+    for current, nxt in zip(tasks, tasks[1:] + [None]):
+        db.add(models.TaskRule(taskno=current.taskno, rule="default", next_task_no=nxt.taskno if nxt else None, usrid="tests"))
+    pdef.start_task_no = tasks[0].taskno
+    db.commit()
+
+    case = cases_dao.create_case(db, schemas.CaseCreate(client_id=f"client-{tag}", client_type="tests"), ptype.process_type_no, admin.username)
+    db.commit()
+    return {
+        "username": admin.username,
+        "token": create_access_token({"sub": admin.username}),
+        "process_type_no": ptype.process_type_no,
+        "tasknos": [t.taskno for t in tasks],
+        "caseno": case.caseno,
+    }
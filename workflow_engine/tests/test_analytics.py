@@ -0,0 +1,55 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase
+
+
+@requires_database
+class TestAnalytics(WorkflowTestCase):
+    steps = 1
+
+    def test_refresh_feeds_the_endpoints(self):
+        from workflow.db.database import engine
+        from workflow.maintenance import refresh_analytics
+
+        client, headers, seed = self.client, self.headers, self.seed
+        taskno, process_type_no = seed["tasknos"][0], seed["process_type_no"]
+
+        def counts():
+            body = client.get("/analytics/counts", headers=headers).json()
+            return (
+                {row["taskno"]: row["steps"] for row in body["tasks"]},
+                {row["process_type_no"]: row["processes"] for row in body["process_types"]},
+            )
+
+        open_steps, open_processes = counts()
+        self.assertEqual(open_steps.get(taskno), 1)
+        self.assertEqual(open_processes.get(process_type_no), 1)
+
+        step = client.get(f"/cases/{seed['caseno']}/current-step", headers=headers).json()
+        response = client.post(f"/steps/{step['stepno']}/close", json={"rule_data": {}}, headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        open_steps, open_processes = counts()
+        self.assertNotIn(taskno, open_steps)
+        self.assertNotIn(process_type_no, open_processes)
+
+        # A second run recomputes the newest day in place, so the closed step and process are counted once
+        for _ in range(2):
+            with engine.begin() as conn:
+                refresh_analytics(conn)
+
+        durations = client.get("/analytics/step-durations", params={"taskno": taskno}, headers=headers).json()
+        self.assertEqual([row["completed"] for row in durations], [1])
+        self.assertGreaterEqual(durations[0]["p95_seconds"], durations[0]["p50_seconds"])
+
+        throughput = client.get("/analytics/throughput", params={"process_type_no": process_type_no}, headers=headers).json()
+        self.assertEqual([(row["started"], row["completed"]) for row in throughput], [(1, 1)])
+
+    def test_empty_range_is_rejected(self):
+        response = self.client.get(
+            "/analytics/throughput", params={"start": "2024-02-01", "end": "2024-01-01"}, headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 400, response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import datetime
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase
+
+
+@requires_database
+class TestArchive(WorkflowTestCase):
+    steps = 1
+
+    def test_archived_process_is_read_through(self):
+        from sqlalchemy import text
+        from workflow.db import models
+        from workflow.db.database import SessionLocal, engine
+        from workflow.maintenance import archive_completed_processes
+
+        client, headers, caseno = self.client, self.headers, self.seed["caseno"]
+        step = client.get(f"/cases/{caseno}/current-step", headers=headers).json()
+        response = client.post(f"/steps/{step['stepno']}/close", json={"rule_data": {}}, headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        processno = step["processno"]
+
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE processes SET date_ended = '2000-01-01' WHERE processno = :p"), {"p": processno})
+            moved = archive_completed_processes(conn, older_than_days=30, batch_size=1000, now=datetime.datetime(2000, 3, 1))
+        self.assertGreaterEqual(moved["processes"], 1)
+
+        db = SessionLocal()
+        try:
+            self.assertIsNone(db.get(models.Process, processno))
+            self.assertIsNotNone(db.get(models.ArchivedProcess, processno))
+        finally:
+            db.close()
+        steps = client.get(f"/cases/{caseno}/steps", headers=headers).json()
+        self.assertEqual([s["stepno"] for s in steps], [step["stepno"]])
+        overview = client.get(f"/cases/{caseno}/overview", headers=headers).json()
+        self.assertEqual([p["processno"] for p in overview["processes"]], [processno])
+
+
+if __name__ == "__main__":
+    unittest.main()
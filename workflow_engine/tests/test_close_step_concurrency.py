@@ -0,0 +1,105 @@
+import os
+import threading
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from tests.helpers import requires_database, seed_workflow
+
+# Scale with CLOSE_STEP_STRESS_CASES / CLOSE_STEP_STRESS_THREADS; throughput is measured by benchmarks.close_step
+CASES = int(os.getenv("CLOSE_STEP_STRESS_CASES", "1000"))
+THREADS = int(os.getenv("CLOSE_STEP_STRESS_THREADS", "16"))
+# Concurrent close attempts per step; exactly one may win
+ATTEMPTS = 2
+
+
+@requires_database
+class TestCloseStepConcurrency(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from workflow import schemas
+        from workflow.db import models
+        from workflow.db.database import SessionLocal
+        from workflow.doa import cases as cases_dao
+
+        db = SessionLocal()
+        try:
+            seed = seed_workflow(db, steps=2)
+            first, second = seed["tasknos"]
+            # Route task 1 -> task 2 on process data, since the default rule ends the process
+            dtype = models.ProcessDataType(description=f"route{seed['process_type_no']}", usrid="tests")
+            db.add(dtype)
+            db.flush()
+            db.add(models.TaskRule(taskno=first, rule=f"procdata.{dtype.description}.next == 'yes'", next_task_no=second, usrid="tests"))
+            db.commit()
+
+            stepnos = []
+            for i in range(CASES):
+                case = cases_dao.create_case(
+                    db, schemas.CaseCreate(client_id=f"stress-{i}", client_type="tests"), seed["process_type_no"], seed["username"])
+                process = case.processes[0]
+                db.add(models.ProcessData(processno=process.processno, process_data_type_no=dtype.process_data_type_no,
+                                          fieldname="next", value="yes", usrid="tests"))
+                stepnos.append(db.query(models.Step.stepno).filter(models.Step.processno == process.processno).scalar())
+            db.commit()
+            cls.seed = seed
+            cls.stepnos = stepnos
+        finally:
+            db.close()
+
+    def test_concurrent_closes_create_exactly_one_successor(self):
+        from fastapi import HTTPException
+        from workflow import schemas
+        from workflow.db import models
+        from workflow.db.database import SessionLocal
+        from workflow.doa import steps as steps_dao
+
+        results: list[tuple[int, object]] = []
+        lock = threading.Lock()
+
+        def close(stepno: int) -> None:
+            db = SessionLocal()
+            try:
+                steps_dao.close_step(db, stepno, schemas.CloseStepRequest(rule_data={}), self.seed["username"])
+                db.commit()
+                outcome = 200
+            except HTTPException as exc:
+                outcome = exc.status_code
+            except Exception as exc:  # deadlocks, serialization failures etc. are bugs here
+                outcome = repr(exc)
+            finally:
+                db.close()
+            with lock:
+                results.append((stepno, outcome))
+
+        # Attempts on the same step are adjacent, so they run at the same time on different threads
+        attempts = [stepno for stepno in self.stepnos for _ in range(ATTEMPTS)]
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            list(pool.map(close, attempts))
+
+        wins = Counter(stepno for stepno, outcome in results if outcome == 200)
+        self.assertEqual(set(wins), set(self.stepnos))
+        self.assertTrue(all(n == 1 for n in wins.values()), "a step was closed more than once")
+        losers = Counter(outcome for _, outcome in results if outcome != 200)
+        self.assertTrue(set(losers) <= {400, 409}, f"unexpected outcomes: {losers}")
+
+        db = SessionLocal()
+        try:
+            busy = db.query(models.Status.statusno).filter(models.Status.description.ilike("busy")).scalar()
+            processnos = [p for (p,) in db.query(models.Step.processno).filter(models.Step.stepno.in_(self.stepnos))]
+            per_process = Counter(p for (p,) in db.query(models.Step.processno).filter(models.Step.processno.in_(processnos)))
+            busy_per_process = Counter(
+                p for (p,) in db.query(models.Step.processno).filter(models.Step.processno.in_(processnos), models.Step.status_no == busy))
+            busy_steps = dict(db.query(models.Step.processno, models.Step.stepno).filter(
+                models.Step.processno.in_(processnos), models.Step.status_no == busy))
+            current_steps = dict(db.query(models.Process.processno, models.Process.current_stepno).filter(
+                models.Process.processno.in_(processnos)))
+        finally:
+            db.close()
+        self.assertTrue(all(n == 2 for n in per_process.values()), "expected exactly one successor per closed step")
+        self.assertTrue(all(busy_per_process[p] == 1 for p in processnos), "expected exactly one busy step per process")
+        self.assertEqual(current_steps, busy_steps, "processes.current_stepno does not point at the busy step")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase, assert_max_queries
+
+
+@requires_database
+class TestCloseStepRuleData(WorkflowTestCase):
+    @classmethod
+    def extend_seed(cls, db):
+        from workflow.db import models
+
+        first, second = cls.seed["tasknos"]
+        dtype = models.ProcessDataType(description=f"form{cls.seed['process_type_no']}", usrid="tests")
+        db.add(dtype)
+        db.flush()
+        db.add(models.TaskRule(taskno=first, rule=f"procdata.{dtype.description}.decision == 'approve'", next_task_no=second, usrid="tests"))
+        db.commit()
+        cls.dtype = dtype.description
+
+    def test_rule_data_is_recorded_and_drives_the_rules(self):
+        caseno = self.seed["caseno"]
+        step = self.client.get(f"/cases/{caseno}/current-step", headers=self.headers).json()
+        rule_data = {f"{self.dtype}.decision": "approve", self.dtype: {"comment": "looks fine"}}
+        response = self.client.post(f"/steps/{step['stepno']}/close", json={"rule_data": rule_data}, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        assert_max_queries(self, response, 16)
+        self.assertEqual(response.json()["taskno"], self.seed["tasknos"][1])
+
+        data = self.client.get(f"/cases/{caseno}/process-data", headers=self.headers).json()
+        fields = {pd["fieldname"]: pd["value"] for pd in data}
+        self.assertEqual(fields, {"decision": "approve", "comment": "looks fine"})
+
+    def test_unknown_type_is_rejected(self):
+        caseno = self.seed["caseno"]
+        step = self.client.get(f"/cases/{caseno}/current-step", headers=self.headers).json()
+        response = self.client.post(f"/steps/{step['stepno']}/close", json={"rule_data": {"nosuchtype.x": "1"}}, headers=self.headers)
+        self.assertEqual(response.status_code, 422, response.text)
+
+    def test_plain_keys_are_rejected_and_the_step_stays_open(self):
+        caseno = self.seed["caseno"]
+        step = self.client.get(f"/cases/{caseno}/current-step", headers=self.headers).json()
+        response = self.client.post(f"/steps/{step['stepno']}/close", json={"rule_data": {"approved": True}}, headers=self.headers)
+        self.assertEqual(response.status_code, 422, response.text)
+        self.assertIn("'approved' must be '<process data type>.<field>'", response.json()["detail"])
+        current = self.client.get(f"/cases/{caseno}/current-step", headers=self.headers).json()
+        self.assertEqual(current["stepno"], step["stepno"])
+
+
+if __name__ == "__main__":
+    unittest.main()
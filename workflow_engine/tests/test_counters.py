@@ -0,0 +1,46 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase
+
+
+@requires_database
+class TestOpenWorkCounters(WorkflowTestCase):
+    steps = 1
+
+    def test_transitions_keep_counters_in_step_with_a_recount(self):
+        from workflow.db.database import SessionLocal, engine
+        from workflow.doa import counters
+        from workflow.maintenance import reconcile_counters
+
+        client, headers, seed = self.client, self.headers, self.seed
+        taskno, process_type_no = seed["tasknos"][0], seed["process_type_no"]
+
+        def counts():
+            db = SessionLocal()
+            try:
+                return (
+                    {row["taskno"]: row["steps"] for row in counters.step_counts(db) if row["taskno"] == taskno},
+                    {row["process_type_no"]: row["processes"] for row in counters.process_counts(db)
+                     if row["process_type_no"] == process_type_no},
+                )
+            finally:
+                db.close()
+
+        # A second case of the same type adds to the same keys
+        response = client.post(f"/create-case/?process_type_no={process_type_no}",
+                               json={"client_id": "counters", "client_type": "tests"}, headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(counts(), ({taskno: 2}, {process_type_no: 2}))
+
+        step = client.get(f"/cases/{seed['caseno']}/current-step", headers=headers).json()
+        response = client.post(f"/steps/{step['stepno']}/close", json={"rule_data": {}}, headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertEqual(counts(), ({taskno: 1}, {process_type_no: 1}))
+
+        with engine.begin() as conn:
+            reconcile_counters(conn)
+        self.assertEqual(counts(), ({taskno: 1}, {process_type_no: 1}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase, assert_max_queries
+
+
+@requires_database
+class TestCurrentStep(WorkflowTestCase):
+    steps = 1
+
+    def test_a_new_process_without_a_step_does_not_hide_the_busy_step(self):
+        from workflow.db import models
+        from workflow.db.database import SessionLocal
+
+        client, headers, seed, caseno = self.client, self.headers, self.seed, self.seed["caseno"]
+        db = SessionLocal()
+        try:
+            busy = db.query(models.Status.statusno).filter(models.Status.description.ilike("busy")).scalar()
+        finally:
+            db.close()
+
+        first = client.get(f"/cases/{caseno}/current-step", headers=headers)
+        self.assertEqual(first.status_code, 200, first.text)
+        assert_max_queries(self, first, 4)
+
+        response = client.post("/processes/", json={
+            "case_no": caseno, "status_no": busy, "process_type_no": seed["process_type_no"],
+        }, headers=headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        self.assertIsNone(response.json()["current_stepno"])
+        case = client.get(f"/cases/{caseno}", headers=headers).json()
+        self.assertEqual(case["current_processno"], response.json()["processno"])
+        self.assertEqual(case["open_process_count"], 2)
+
+        current = client.get(f"/cases/{caseno}/current-step", headers=headers)
+        self.assertEqual(current.status_code, 200, current.text)
+        self.assertEqual(current.json()["stepno"], first.json()["stepno"])
+        assert_max_queries(self, current, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import datetime
+import unittest
+
+from workflow.idempotency import ResponseCache, StoredResponse, fingerprint
+
+
+def _stored(expires_at: datetime.datetime) -> StoredResponse:
+    return StoredResponse("POST", "/create-case/", "fp", 200, "{}", expires_at)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.datetime(2026, 1, 1)
+        self.later = self.now + datetime.timedelta(hours=1)
+
+    def test_keys_are_scoped_per_user(self):
+        cache = ResponseCache(10)
+        cache.put("alice", "k", _stored(self.later))
+        self.assertIsNotNone(cache.get("alice", "k", self.now))
+        self.assertIsNone(cache.get("bob", "k", self.now))
+
+    def test_expired_entries_are_dropped(self):
+        cache = ResponseCache(10)
+        cache.put("alice", "k", _stored(self.now))
+        self.assertIsNone(cache.get("alice", "k", self.now))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(2)
+        cache.put("u", "a", _stored(self.later))
+        cache.put("u", "b", _stored(self.later))
+        cache.get("u", "a", self.now)
+        cache.put("u", "c", _stored(self.later))
+        self.assertIsNotNone(cache.get("u", "a", self.now))
+        self.assertIsNone(cache.get("u", "b", self.now))
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_depends_on_content_not_key_order(self):
+        self.assertEqual(fingerprint({"a": 1, "b": 2}, 3), fingerprint({"b": 2, "a": 1}, 3))
+        self.assertNotEqual(fingerprint({"a": 1}, 3), fingerprint({"a": 1}, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
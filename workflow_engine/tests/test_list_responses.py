@@ -0,0 +1,44 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase, assert_max_queries
+
+
+@requires_database
+class TestListResponses(WorkflowTestCase):
+    steps = 1
+
+    def test_rows_match_the_orm_serialization(self):
+        from pydantic import TypeAdapter
+        from workflow import schemas
+        from workflow.db import models
+        from workflow.db.database import SessionLocal
+
+        caseno = self.seed["caseno"]
+        db = SessionLocal()
+        try:
+            processnos = [p for (p,) in db.query(models.Process.processno).filter(models.Process.case_no == caseno)]
+            expected = {
+                "/cases": (schemas.Case, db.query(models.Case).filter(models.Case.caseno == caseno).all(), "caseno", [caseno]),
+                "/steps": (schemas.Step, db.query(models.Step).filter(models.Step.processno.in_(processnos)).all(),
+                           "processno", processnos),
+            }
+        finally:
+            db.close()
+        for path, (schema, objects, key, values) in expected.items():
+            response = self.client.get(path, headers=self.headers)
+            self.assertEqual(response.status_code, 200, response.text)
+            assert_max_queries(self, response, 2)
+            rows = [row for row in response.json() if row[key] in values]
+            self.assertEqual(rows, TypeAdapter(list[schema]).dump_python(
+                TypeAdapter(list[schema]).validate_python(objects, from_attributes=True), mode="json"))
+
+    def test_pages_keep_the_total_header(self):
+        for path in ("/cases", "/process-data"):
+            response = self.client.get(path, params={"limit": 1}, headers=self.headers)
+            self.assertEqual(response.status_code, 200, response.text)
+            self.assertLessEqual(len(response.json()), 1)
+            self.assertGreaterEqual(int(response.headers["X-Total-Count"]), len(response.json()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase, auth_headers
+
+
+@requires_database
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        # Imported here: importing workflow.auth needs a configured database URL
+        from workflow.auth.ownership import TTLCache
+
+        self.now = 0.0
+        self.cache = TTLCache(maxsize=2, ttl=10, clock=lambda: self.now)
+
+    def test_entries_expire(self):
+        self.cache.put(1, "alice")
+        self.now = 9
+        self.assertEqual(self.cache.get(1), "alice")
+        self.now = 10
+        self.assertIsNone(self.cache.get(1))
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.put(1, "alice")
+        self.cache.put(2, "bob")
+        self.cache.get(1)
+        self.cache.put(3, "carol")
+        self.assertIsNone(self.cache.get(2))
+        self.assertEqual(self.cache.get(1), "alice")
+        self.assertEqual(self.cache.get(3), "carol")
+
+
+
+@requires_database
+class TestOwnershipChecks(WorkflowTestCase):
+    """Case and process routes answer 404 to users who do not own the case, and 200 to its owner and admins."""
+
+    steps = 1
+
+    @classmethod
+    def extend_seed(cls, db):
+        from workflow import schemas
+        from workflow.db import models
+        from workflow.doa import cases as cases_dao, users as users_dao
+
+        tag = cls.seed["process_type_no"]
+        owner = users_dao.create_user(db, f"owner-{tag}", "secret", "user", "tests")
+        other = users_dao.create_user(db, f"other-{tag}", "secret", "user", "tests")
+        dtype = models.ProcessDataType(description=f"own{tag}", usrid="tests")
+        db.add(dtype)
+        db.flush()
+        case = cases_dao.create_case(db, schemas.CaseCreate(client_id=f"own-{tag}", client_type="tests"), tag, owner.username)
+        process = case.processes[0]
+        data = models.ProcessData(processno=process.processno, process_data_type_no=dtype.process_data_type_no,
+                                  fieldname="note", value="0", usrid="tests")
+        db.add(data)
+        db.commit()
+        cls.caseno, cls.processno = case.caseno, process.processno
+        cls.dtype, cls.process_data_no = dtype.process_data_type_no, data.process_data_no
+        cls.callers = {"owner": auth_headers(owner.username), "other": auth_headers(other.username)}
+
+    def assert_access(self, method: str, path: str, json=None):
+        for caller, headers, expected in (
+            ("other", self.callers["other"], 404),
+            ("owner", self.callers["owner"], 200),
+            ("admin", self.headers, 200),
+        ):
+            response = self.client.request(method, path, json=json, headers=headers)
+            self.assertEqual(response.status_code, expected, f"{caller}: {method} {path}: {response.text}")
+
+    def test_case_reads(self):
+        for path in ("steps", "process-data", "current-step"):
+            self.assert_access("GET", f"/cases/{self.caseno}/{path}")
+
+    def test_process_data_update(self):
+        self.assert_access("PUT", f"/process-data/{self.process_data_no}", json={"value": "1"})
+
+    def test_process_data_create(self):
+        self.assert_access("POST", f"/processes/{self.processno}/data/",
+                           json={"process_data_type_no": self.dtype, "fieldname": "added", "value": "1"})
+
+    def test_process_data_bulk_upsert(self):
+        self.assert_access("PUT", f"/processes/{self.processno}/data",
+                           json=[{"process_data_type_no": self.dtype, "fieldname": "bulk", "value": "1"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase
+
+
+@requires_database
+class TestProcessDataTransactions(WorkflowTestCase):
+    """Process data DAOs report constraint failures without ending the caller's transaction."""
+
+    steps = 1
+
+    @classmethod
+    def extend_seed(cls, db):
+        from workflow.db import models
+
+        dtype = models.ProcessDataType(description=f"txn{cls.seed['process_type_no']}", usrid="tests")
+        db.add(dtype)
+        db.commit()
+        cls.dtype = dtype.process_data_type_no
+        cls.processno = db.query(models.Process.processno).filter(models.Process.case_no == cls.seed["caseno"]).scalar()
+
+    def locked_session(self):
+        from workflow.db import models
+        from workflow.db.database import SessionLocal
+
+        db = SessionLocal()
+        process = db.query(models.Process).filter(models.Process.processno == self.processno).with_for_update().one()
+        return db, process
+
+    def test_unknown_type_leaves_the_callers_transaction_open(self):
+        from fastapi import HTTPException
+        from workflow.doa import process_data as process_data_dao
+
+        db, process = self.locked_session()
+        try:
+            with self.assertRaises(HTTPException) as raised:
+                process_data_dao.upsert_process_data(db, self.processno, [(-1, "amount", "1")], "tests")
+            self.assertEqual(raised.exception.status_code, 422)
+            self.assertTrue(db.in_transaction())
+            self.assertIn(process, db)
+        finally:
+            db.close()
+
+    def test_duplicate_field_leaves_the_callers_transaction_open(self):
+        from fastapi import HTTPException
+        from workflow import schemas
+        from workflow.doa import process_data as process_data_dao
+
+        db, process = self.locked_session()
+        try:
+            first, _ = process_data_dao.upsert_process_data(
+                db, self.processno, [(self.dtype, "a", "1"), (self.dtype, "b", "2")], "tests")
+            with self.assertRaises(HTTPException) as raised:
+                process_data_dao.update_process_data(
+                    db, first.process_data_no, schemas.ProcessDataUpdate(fieldname="b"), "tests")
+            self.assertEqual(raised.exception.status_code, 409)
+            self.assertTrue(db.in_transaction())
+            self.assertIn(process, db)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase, assert_max_queries
+
+
+@requires_database
+class TestQueryCounts(WorkflowTestCase):
+    """Upper bounds on SQL statements per endpoint; raise a bound only together with the change that needs it."""
+
+    def get(self, path: str, max_count: int):
+        response = self.client.get(path, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        return assert_max_queries(self, response, max_count)
+
+    def test_case_endpoints(self):
+        caseno = self.seed["caseno"]
+        self.get(f"/cases/{caseno}", 3)
+        self.get(f"/cases/{caseno}/overview", 6)
+        self.get(f"/cases/{caseno}/current-step", 4)
+        self.get(f"/cases/{caseno}/steps", 3)
+        self.get(f"/cases/{caseno}/process-data", 3)
+
+    def test_close_step(self):
+        caseno = self.seed["caseno"]
+        step = self.get(f"/cases/{caseno}/current-step", 4).json()
+        response = self.client.post(f"/steps/{step['stepno']}/close", json={"rule_data": {}}, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.text)
+        assert_max_queries(self, response, 13)
+
+    def send(self, method: str, path: str, body: dict, max_count: int):
+        response = self.client.request(method, path, json=body, headers=self.headers)
+        self.assertIn(response.status_code, (200, 201), response.text)
+        return assert_max_queries(self, response, max_count)
+
+    def test_write_endpoints(self):
+        # DAOs only flush and the router commits once, so a write is its statements plus the auth lookup
+        tag = self.seed["process_type_no"]
+        ptype = self.send("POST", "/process-types/", {"description": f"uow-{tag}"}, 2).json()
+        pdef = self.send("POST", "/process-definitions/", {
+            "process_type_no": ptype["process_type_no"], "version": "1", "is_active": True, "start_task_description": "start",
+        }, 6).json()
+        self.send("PUT", f"/tasks/{pdef['start_task_no']}", {"description": "renamed"}, 4)
+        self.send("POST", "/process-data-types/", {"description": f"uow-{tag}"}, 2)
+
+    def test_bulk_process_data_upsert(self):
+        from workflow.db import models
+        from workflow.db.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            dtype = models.ProcessDataType(description=f"bulk{self.seed['process_type_no']}", usrid="tests")
+            db.add(dtype)
+            db.commit()
+            type_no = dtype.process_data_type_no
+        finally:
+            db.close()
+        processno = self.get(f"/cases/{self.seed['caseno']}/current-step", 4).json()["processno"]
+        items = [{"process_data_type_no": type_no, "fieldname": f"field{i}", "value": str(i)} for i in range(30)]
+        for value in ("first", "second"):
+            items[0]["value"] = value
+            response = self.client.put(f"/processes/{processno}/data", json=items, headers=self.headers)
+            self.assertEqual(response.status_code, 200, response.text)
+            assert_max_queries(self, response, 5)
+        rows = response.json()
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(rows[0]["value"], "second")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+from tests.helpers import requires_database
+
+
+@requires_database
+class TestReplicaRouter(unittest.TestCase):
+    def setUp(self):
+        from workflow.db.database import ReplicaRouter
+
+        self.now = 0.0
+        self.up = {"a": True, "b": True}
+        self.router = ReplicaRouter(["a", "b"], check_interval=5, max_lag_seconds=10, clock=lambda: self.now)
+        self.router._check = lambda index: self.up[self.router.engines[index]]
+
+    def test_round_robin_skips_unhealthy_replicas(self):
+        self.assertEqual([self.router.pick() for _ in range(4)], ["a", "b", "a", "b"])
+        self.up["a"] = False
+        self.now = 5
+        self.assertEqual({self.router.pick() for _ in range(4)}, {"b"})
+        self.up["b"] = False
+        self.now = 10
+        self.assertIsNone(self.router.pick())
+
+    def test_marked_down_until_next_check(self):
+        self.router.pick()
+        self.router.mark_down("a")
+        self.assertEqual({self.router.pick() for _ in range(4)}, {"b"})
+        self.now = 5
+        self.assertEqual({self.router.pick() for _ in range(4)}, {"a", "b"})
+
+    def test_recent_writers_read_from_primary(self):
+        from workflow.dependencies import READ_YOUR_WRITES_COOKIE, wrote_recently
+
+        self.assertTrue(wrote_recently(SimpleNamespace(cookies={READ_YOUR_WRITES_COOKIE: str(time.time())})))
+        self.assertFalse(wrote_recently(SimpleNamespace(cookies={READ_YOUR_WRITES_COOKIE: str(time.time() - 3600)})))
+        self.assertFalse(wrote_recently(SimpleNamespace(cookies={READ_YOUR_WRITES_COOKIE: "junk"})))
+        self.assertFalse(wrote_recently(SimpleNamespace(cookies={})))
+
+
+if __name__ == "__main__":
+    unittest.main()
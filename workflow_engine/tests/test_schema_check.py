@@ -0,0 +1,85 @@
+import unittest
+
+from tests.helpers import requires_database, WorkflowTestCase
+
+_MISSING_DEFAULT = "task_rules.taskruleno has no default"
+
+
+@requires_database
+class TestSchemaCheck(WorkflowTestCase):
+    """verify() reports a task_rules key without its default, repair() restores it; the schema is fixed afterwards."""
+
+    steps = 1
+
+    def drop_default(self):
+        from sqlalchemy import text
+        from workflow.db.database import engine
+
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE task_rules ALTER COLUMN taskruleno DROP DEFAULT"))
+
+    def tearDown(self):
+        from workflow.db import schema_check
+        from workflow.db.database import engine
+
+        with engine.begin() as conn:
+            schema_check.repair(conn)
+        schema_check._cache.clear()
+
+    def test_verify_reports_and_repair_restores_the_default(self):
+        from workflow import schemas
+        from workflow.db import schema_check
+        from workflow.db.database import SessionLocal, engine
+        from workflow.doa import task_rules as task_rules_dao
+        from workflow.maintenance import main
+
+        self.drop_default()
+        with engine.connect() as conn:
+            self.assertIn(_MISSING_DEFAULT, schema_check.verify(conn))
+        self.assertEqual(main(["verify-schema"]), 1)
+
+        with engine.begin() as conn:
+            self.assertEqual(schema_check.repair(conn), [])
+        with engine.connect() as conn:
+            self.assertEqual(schema_check.verify(conn), [])
+        self.assertEqual(main(["verify-schema"]), 0)
+
+        db = SessionLocal()
+        try:
+            rule = task_rules_dao.create_task_rule(
+                db, schemas.TaskRuleCreate(taskno=self.seed["tasknos"][0], rule="default"), "tests")
+            db.commit()
+            self.assertIsNotNone(rule.taskruleno)
+        finally:
+            db.close()
+
+    def test_verify_schema_repair_exits_zero(self):
+        from sqlalchemy import text
+        from workflow.db.database import engine
+        from workflow.maintenance import main
+
+        self.drop_default()
+        self.assertEqual(main(["verify-schema", "--repair"]), 0)
+        with engine.connect() as conn:
+            default = conn.execute(text(
+                "SELECT column_default FROM information_schema.columns "
+                "WHERE table_name = 'task_rules' AND column_name = 'taskruleno' AND table_schema = current_schema()"
+            )).scalar()
+        self.assertIsNotNone(default)
+
+    def test_ensure_schema_checks_once_per_revision(self):
+        from workflow.db import schema_check
+        from workflow.db.database import engine
+
+        schema_check._cache.clear()
+        self.drop_default()
+        self.assertEqual(schema_check.ensure_schema(engine, repair_problems=True), [])
+        # Cached for this revision: a later drift is not seen until the next deploy (or process)
+        self.drop_default()
+        self.assertEqual(schema_check.ensure_schema(engine), [])
+        schema_check._cache.clear()
+        self.assertEqual(schema_check.ensure_schema(engine), [_MISSING_DEFAULT])
+
+
+if __name__ == "__main__":
+    unittest.main()
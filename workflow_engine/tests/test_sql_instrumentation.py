@@ -0,0 +1,55 @@
+import logging
+import unittest
+
+from sqlalchemy import create_engine, text
+
+from workflow.db import instrumentation
+from workflow.db.instrumentation import instrument_engine, track_queries, untracked, server_timing
+from tests.helpers import max_queries
+
+
+class TestSqlInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+        instrument_engine(self.engine)
+        instrument_engine(self.engine)  # idempotent
+
+    def test_counts_statements_in_tracked_scope(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))  # outside any scope: ignored
+            with track_queries() as stats:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+                with untracked():
+                    conn.execute(text("SELECT 3"))
+        self.assertEqual(stats.count, 2)
+        self.assertGreaterEqual(stats.seconds, 0.0)
+        self.assertIn('desc="2 queries"', server_timing(stats, 0.01))
+
+    def test_max_queries_helper(self):
+        with self.engine.connect() as conn:
+            with max_queries(self, 1, "single select"):
+                conn.execute(text("SELECT 1"))
+            with self.assertRaises(AssertionError):
+                with max_queries(self, 1, "two selects"):
+                    conn.execute(text("SELECT 1"))
+                    conn.execute(text("SELECT 2"))
+
+    def test_slow_queries_are_logged_with_parameter_shape(self):
+        previous = instrumentation.SLOW_QUERY_MS
+        instrumentation.SLOW_QUERY_MS = 1e-9
+        try:
+            with self.assertLogs("app.sql", level=logging.WARNING) as logs:
+                with self.engine.connect() as conn, track_queries("GET", "/cases"):
+                    conn.execute(text("SELECT :a, :b"), {"a": 1, "b": "secret"})
+        finally:
+            instrumentation.SLOW_QUERY_MS = previous
+        record = logs.records[0]
+        # sqlite binds positionally; named drivers (psycopg2) report "{a: int, b: str}"
+        self.assertRegex(record.getMessage(), r"params=[({](a: )?int, (b: )?str[)}]")
+        self.assertNotIn("secret", record.getMessage())
+        self.assertEqual(record.http_path, "/cases")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1 +1,2 @@
-from .security import get_current_user, get_optional_user, roles_required, User  # noqa: F401
+from .security import get_current_user, get_optional_user, get_stream_user, roles_required, User  # noqa: F401
+from .ownership import require_case_access, require_process_access  # noqa: F401
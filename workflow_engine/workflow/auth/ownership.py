@@ -0,0 +1,126 @@
+"""
+Case ownership lookups for non-admin authorization.
+
+Owner checks used to join the data being read to processes and cases on every request. Ownership never changes
+once a case exists (Case.usrid and Process.case_no are not updatable), so it is resolved once, by primary key,
+and kept in a bounded LRU: caseno -> usrid and processno -> caseno. A warm check costs no SQL. Entries expire
+after OWNERSHIP_CACHE_TTL_SECONDS; call invalidate_case / invalidate_process when rows are deleted or moved.
+Misses are not cached, so a case created after a failed lookup is visible at once.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from fastapi import Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from workflow.db import models
+from workflow.dependencies import get_db, get_read_db
+from workflow.auth.security import get_current_user, User
+
+OWNERSHIP_CACHE_SIZE = int(os.getenv("OWNERSHIP_CACHE_SIZE", "100000"))
+OWNERSHIP_CACHE_TTL_SECONDS = float(os.getenv("OWNERSHIP_CACHE_TTL_SECONDS", "3600"))
+
+
+class TTLCache:
+    """Bounded LRU with a per-entry time to live."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._items: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= self._clock():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = (self._clock() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+CASE_OWNERS = TTLCache(OWNERSHIP_CACHE_SIZE, OWNERSHIP_CACHE_TTL_SECONDS)
+PROCESS_CASES = TTLCache(OWNERSHIP_CACHE_SIZE, OWNERSHIP_CACHE_TTL_SECONDS)
+
+
+def case_owner(db: Session, case_no: int) -> Optional[str]:
+    """usrid owning the case, or None if there is no such case."""
+    owner = CASE_OWNERS.get(case_no)
+    if owner is None:
+        owner = db.query(models.Case.usrid).filter(models.Case.caseno == case_no).scalar()
+        if owner is not None:
+            CASE_OWNERS.put(case_no, owner)
+    return owner
+
+
+def process_case(db: Session, processno: int) -> Optional[int]:
+    """caseno of the process, or None if there is no such process."""
+    case_no = PROCESS_CASES.get(processno)
+    if case_no is None:
+        case_no = db.query(models.Process.case_no).filter(models.Process.processno == processno).scalar()
+        if case_no is not None:
+            PROCESS_CASES.put(processno, case_no)
+    return case_no
+
+
+def invalidate_case(case_no: int) -> None:
+    CASE_OWNERS.pop(case_no)
+
+
+def invalidate_process(processno: int) -> None:
+    PROCESS_CASES.pop(processno)
+
+
+def can_access_case(db: Session, user: User, case_no: int) -> bool:
+    if "admin" in user.roles:
+        return True
+    return case_owner(db, case_no) == user.username
+
+
+def can_access_process(db: Session, user: User, processno: int) -> bool:
+    if "admin" in user.roles:
+        return True
+    case_no = process_case(db, processno)
+    return case_no is not None and case_owner(db, case_no) == user.username
+
+
+def require_case_access(case_no: int, db: Session = Depends(get_read_db), user: User = Depends(get_current_user)) -> int:
+    """Dependency for routes with a {case_no} path parameter: 404 unless the caller is an admin or the owner."""
+    if not can_access_case(db, user, case_no):
+        raise HTTPException(status_code=404, detail="Case not found")
+    return case_no
+
+
+def require_process_access(process_no: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)) -> int:
+    """
+    Dependency for write routes with a {process_no} path parameter: 404 unless the caller is an admin or owns the
+    process's case. Looked up on the primary (the route's own session), so a process created just before is found.
+    """
+    if not can_access_process(db, user, process_no):
+        raise HTTPException(status_code=404, detail="Process not found")
+    return process_no
@@ -2,7 +2,7 @@ import os
 from datetime import datetime, timedelta
 from typing import List, Optional, Callable
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -77,6 +77,13 @@ def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme), db
     except JWTError:
         return None
 
+def get_stream_user(
+    token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(None, description="Bearer token for clients that cannot set headers (EventSource)"),
+    db: Session = Depends(get_db),
+) -> User:
+    return get_current_user(token or access_token or "", db)
+
 def roles_required(*required_roles: str) -> Callable[[User], None]:
     def dependency(user: User = Depends(get_current_user)) -> None:
         if not any(r in user.roles for r in required_roles):
@@ -1,19 +1,120 @@
+import itertools
+import logging
 import os
+import threading
+import time
+from typing import Callable, Optional
+
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from workflow.db.models import Base
+from workflow.db.instrumentation import instrument_engine
 
 # Load environment variables from .env if present
 load_dotenv()
 
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "")
+# Optional streaming replicas for read-only routes, comma separated; empty sends every read to the primary
+SQLALCHEMY_REPLICA_URLS = [u.strip() for u in os.getenv("SQLALCHEMY_REPLICA_URLS", "").split(",") if u.strip()]
+# How often a replica's health (reachable, replay lag) is re-checked, and the lag at which it stops taking reads
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "5"))
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_CONNECT_TIMEOUT_SECONDS = int(os.getenv("REPLICA_CONNECT_TIMEOUT_SECONDS", "2"))
+
+logger = logging.getLogger("app.db")
+
+
+def _create_engine(url: str, **connect_args) -> Engine:
+    eng = create_engine(
+        url,
+        connect_args={"options": "-csearch_path=workflow_db", **connect_args},
+        pool_pre_ping=True,
+    )
+    instrument_engine(eng)
+    return eng
+
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL)
+# One transaction per request: DAOs only flush, the router (or job) commits. Objects stay loaded after the commit,
+# so returning them does not issue a refresh SELECT per instance.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+# Bound per session to whichever engine ReplicaRouter picks
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+
+# Seconds of replay lag; 0 when the replica has replayed everything it received (an idle primary would otherwise
+# look ever more lagged) and when pointed at a primary by mistake
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class ReplicaRouter:
+    """
+    Round-robin over replica engines, skipping unhealthy ones. A replica is healthy if it answered the lag query
+    within the last check interval and its lag was at most max_lag_seconds. Checks run inline on the first pick
+    after the interval elapses, by one caller at a time; other callers use the last known state meanwhile.
+    """
+
+    def __init__(self, engines: list[Engine], check_interval: float = REPLICA_HEALTH_CHECK_SECONDS,
+                 max_lag_seconds: float = REPLICA_MAX_LAG_SECONDS, clock: Callable[[], float] = time.monotonic):
+        self.engines = engines
+        self.check_interval = check_interval
+        self.max_lag_seconds = max_lag_seconds
+        self._clock = clock
+        self._healthy = [True] * len(engines)
+        self._checked_at = [float("-inf")] * len(engines)
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def _check(self, index: int) -> bool:
+        try:
+            with self.engines[index].connect() as conn:
+                lag = float(conn.execute(_REPLICA_LAG_SQL).scalar() or 0)
+        except Exception as exc:
+            logger.warning("Replica %s unreachable: %s", self.engines[index].url.host, exc)
+            return False
+        if lag > self.max_lag_seconds:
+            logger.warning("Replica %s lags %.1fs, reading from others", self.engines[index].url.host, lag)
+            return False
+        return True
+
+    def _is_healthy(self, index: int) -> bool:
+        with self._lock:
+            due = self._clock() - self._checked_at[index] >= self.check_interval
+            if due:
+                self._checked_at[index] = self._clock()
+        if due:
+            self._healthy[index] = self._check(index)
+        return self._healthy[index]
+
+    def mark_down(self, eng: Engine) -> None:
+        """Take a replica out of rotation until its next check, e.g. after a query on it failed."""
+        for index, candidate in enumerate(self.engines):
+            if candidate is eng:
+                with self._lock:
+                    self._healthy[index] = False
+                    self._checked_at[index] = self._clock()
+
+    def pick(self) -> Optional[Engine]:
+        """Next healthy replica, or None if there are none (read from the primary then)."""
+        if not self.engines:
+            return None
+        start = next(self._next)
+        for offset in range(len(self.engines)):
+            index = (start + offset) % len(self.engines)
+            if self._is_healthy(index):
+                return self.engines[index]
+        return None
+
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"options": "-csearch_path=workflow_db"},
-    pool_pre_ping=True,
+REPLICAS = ReplicaRouter(
+    [_create_engine(url, connect_timeout=REPLICA_CONNECT_TIMEOUT_SECONDS) for url in SQLALCHEMY_REPLICA_URLS]
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def read_session() -> Session:
+    """Session on a healthy replica, or on the primary if none is available. Never commit through it."""
+    return ReadSessionLocal(bind=REPLICAS.pick() or engine)
@@ -0,0 +1,111 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+
+# Statements slower than this are written to the log (and so to the logs table); 0 disables
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+_slow_logger = logging.getLogger("app.sql")
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    # Request context copied onto slow-query log records
+    http_method: Optional[str] = None
+    http_path: Optional[str] = None
+
+
+# Stats of the request (or other unit of work) currently executing; None outside tracked scopes
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Set while the DB log handler writes, so log inserts are neither counted nor reported as slow
+_suppressed: ContextVar[bool] = ContextVar("query_tracking_suppressed", default=False)
+
+
+def _param_shape(parameters) -> str:
+    """Describe bound parameters by name/position and type only; values may contain personal data."""
+    def one(params) -> str:
+        if isinstance(params, dict):
+            return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in params.items()) + "}"
+        if isinstance(params, (list, tuple)):
+            return "(" + ", ".join(type(v).__name__ for v in params) + ")"
+        return type(params).__name__
+    if isinstance(parameters, list) and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        return f"{len(parameters)} x {one(parameters[0])}"
+    return one(parameters)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if _suppressed.get():
+        return
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+    elapsed_ms = elapsed * 1000.0
+    if SLOW_QUERY_MS and elapsed_ms >= SLOW_QUERY_MS:
+        _slow_logger.warning(
+            "Slow query %.1f ms: %s params=%s",
+            elapsed_ms,
+            " ".join(statement.split())[:2000],
+            _param_shape(parameters),
+            extra={
+                "duration_ms": int(elapsed_ms),
+                "http_method": stats.http_method if stats else None,
+                "http_path": stats.http_path if stats else None,
+            },
+        )
+
+
+def instrument_engine(engine) -> None:
+    """Attach query counting/timing hooks to an engine (idempotent)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries(http_method: Optional[str] = None, http_path: Optional[str] = None) -> Iterator[QueryStats]:
+    """
+    Attribute every statement executed in this context (including threads/tasks that inherit it) to one QueryStats.
+    """
+    stats = QueryStats(http_method=http_method, http_path=http_path)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def untracked() -> Iterator[None]:
+    """Exclude statements executed in this context from tracking and slow-query logging."""
+    token = _suppressed.set(True)
+    try:
+        yield
+    finally:
+        _suppressed.reset(token)
+
+
+def server_timing(stats: QueryStats, total_seconds: float) -> str:
+    """Server-Timing header value: DB time with the statement count, and total handler time."""
+    return (
+        f'db;dur={stats.seconds * 1000.0:.1f};desc="{stats.count} queries", '
+        f"app;dur={total_seconds * 1000.0:.1f}"
+    )
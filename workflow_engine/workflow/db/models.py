@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import create_engine, Column, Integer, BigInteger, Float, String, Text, Date, DateTime, ForeignKey, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import datetime
@@ -13,8 +13,15 @@ class Case(Base):
     date_created = Column(DateTime, default=datetime.datetime.utcnow)
     tmstamp = Column(DateTime, default=datetime.datetime.utcnow)
     usrid = Column(String)
+    # Maintained by create_case / close_step / complete_process: newest open process and how many are open
+    current_processno = Column(Integer)
+    open_process_count = Column(Integer, nullable=False, default=0, server_default="0")
     processes = relationship("Process", back_populates="case")
 
+    __table_args__ = (
+        Index("ix_cases_usrid_open", "usrid", postgresql_where=text("open_process_count > 0")),
+    )
+
 class Process(Base):
     __tablename__ = 'processes'
     processno = Column(Integer, primary_key=True)
@@ -25,12 +32,22 @@ class Process(Base):
     date_ended = Column(DateTime)
     tmstamp = Column(DateTime, default=datetime.datetime.utcnow)
     usrid = Column(String)
+    # The open step of this process (NULL once it completes); kept in step with steps by close_step. No FK, so
+    # the Process.steps relationship stays unambiguous.
+    current_stepno = Column(Integer)
     case = relationship("Case", back_populates="processes")
     status = relationship("Status")
     process_type = relationship("ProcessType")
     steps = relationship("Step", back_populates="process")
     process_data = relationship("ProcessData", back_populates="process")
 
+    __table_args__ = (
+        Index("ix_processes_case_no_open", "case_no", postgresql_where=text("current_stepno IS NOT NULL")),
+        # Day ranges for the analytics refresh (workflow.maintenance refresh_analytics)
+        Index("ix_processes_date_started", "date_started"),
+        Index("ix_processes_date_ended", "date_ended"),
+    )
+
 class Step(Base):
     __tablename__ = 'steps'
     stepno = Column(Integer, primary_key=True)
@@ -41,16 +58,37 @@ class Step(Base):
     date_ended = Column(DateTime)
     tmstamp = Column(DateTime, default=datetime.datetime.utcnow)
     usrid = Column(String)
+    # Work-queue lease (POST /tasks/{taskno}/claim); a claim is live while claim_expires_at is in the future
+    claimed_by = Column(String)
+    claim_expires_at = Column(DateTime)
+    # SLA deadline from the task's sla_seconds (see workflow.sla); escalated_at is set once the SLA action ran
+    due_at = Column(DateTime)
+    escalated_at = Column(DateTime)
+    # Failed runs of the task's automated handler (see workflow.executor) and the last error
+    exec_attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    exec_error = Column(String)
     process = relationship("Process", back_populates="steps")
     task = relationship("Task")
     status = relationship("Status")
 
+    # due_at is computed in SQL on insert; fetch it with RETURNING rather than a SELECT on first access
+    __mapper_args__ = {"eager_defaults": True}
+
+    __table_args__ = (
+        Index("ix_steps_taskno_status_no_stepno", "taskno", "status_no", "stepno"),
+        Index("ix_steps_due_at_pending", "due_at", postgresql_where=text("due_at IS NOT NULL AND escalated_at IS NULL AND date_ended IS NULL")),
+        Index("ix_steps_date_ended", "date_ended"),
+    )
+
 class Task(Base):
     __tablename__ = 'tasks'
     taskno = Column(Integer, primary_key=True)
     process_definition_no = Column(Integer, ForeignKey('process_definitions.process_definition_no'))
     description = Column(String)
     reference = Column(String)
+    # Steps of this task are escalated sla_seconds after they start: 'event', 'close' or 'status:<description>'
+    sla_seconds = Column(Integer)
+    sla_action = Column(String)
     tmstamp = Column(DateTime, default=datetime.datetime.utcnow)
     usrid = Column(String)
     process_definition = relationship("ProcessDefinition", back_populates="tasks")
@@ -94,6 +132,11 @@ class ProcessData(Base):
     process = relationship("Process", back_populates="process_data")
     process_data_type = relationship("ProcessDataType")
 
+    # One value per field; bulk writes upsert on this key
+    __table_args__ = (
+        UniqueConstraint("processno", "process_data_type_no", "fieldname", name="uq_process_data_process_type_field"),
+    )
+
 class ProcessDataType(Base):
     __tablename__ = 'process_data_types'
     process_data_type_no = Column(Integer, primary_key=True)
@@ -121,15 +164,16 @@ class User(Base):
     usrid = Column(String, default="system")
 
 class LogEntry(Base):
+    # Range-partitioned by day on created_at (see workflow.maintenance); the partition key must be part of the PK
     __tablename__ = 'logs'
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
     level = Column(String, index=True, nullable=False)  # INFO/WARNING/ERROR
     logger_name = Column(String, nullable=False)
     message = Column(String, nullable=False)
     pathname = Column(String)
     lineno = Column(Integer)
     func = Column(String)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, primary_key=True, nullable=False)
 
     # HTTP request context (optional)
     http_method = Column(String)
@@ -139,3 +183,113 @@ class LogEntry(Base):
     user_agent = Column(String)
     client_ip = Column(String)
     user_id = Column(String)
+
+    # Time-range search; the trigram index on message (pg_trgm) is created by migration only
+    __table_args__ = (Index("ix_logs_created_at_level", "created_at", "level"),)
+
+class LogRollup(Base):
+    """Per-minute request statistics per http_path, refreshed incrementally from logs."""
+    __tablename__ = 'log_rollups_minute'
+    bucket = Column(DateTime, primary_key=True)
+    http_path = Column(String, primary_key=True)
+    request_count = Column(Integer, nullable=False)
+    error_count = Column(Integer, nullable=False)
+    p50_ms = Column(Float)
+    p95_ms = Column(Float)
+
+class IdempotencyKey(Base):
+    """Stored outcome of a mutating request sent with an Idempotency-Key header; status_code is NULL while in flight."""
+    __tablename__ = 'idempotency_keys'
+    key = Column(String, primary_key=True)
+    usrid = Column(String, primary_key=True)
+    method = Column(String, nullable=False)
+    path = Column(String, nullable=False)
+    fingerprint = Column(String, nullable=False)
+    status_code = Column(Integer)
+    response_body = Column(Text)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+# Cold storage for completed processes, filled by `python -m workflow.maintenance archive`. Same columns as the hot
+# tables (plus archived_at) but no foreign keys, so rows can be moved in bulk and the hot tables stay small.
+class ArchivedProcess(Base):
+    __tablename__ = 'processes_archive'
+    processno = Column(Integer, primary_key=True, autoincrement=False)
+    case_no = Column(Integer, index=True)
+    status_no = Column(Integer)
+    process_type_no = Column(Integer)
+    date_started = Column(DateTime)
+    date_ended = Column(DateTime)
+    tmstamp = Column(DateTime)
+    usrid = Column(String)
+    current_stepno = Column(Integer)
+    archived_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+class ArchivedStep(Base):
+    __tablename__ = 'steps_archive'
+    stepno = Column(Integer, primary_key=True, autoincrement=False)
+    processno = Column(Integer, index=True)
+    taskno = Column(Integer)
+    status_no = Column(Integer)
+    date_started = Column(DateTime)
+    date_ended = Column(DateTime)
+    tmstamp = Column(DateTime)
+    usrid = Column(String)
+    claimed_by = Column(String)
+    claim_expires_at = Column(DateTime)
+    due_at = Column(DateTime)
+    escalated_at = Column(DateTime)
+    exec_attempts = Column(Integer, nullable=False, server_default="0")
+    exec_error = Column(String)
+    archived_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+class ArchivedProcessData(Base):
+    __tablename__ = 'process_data_archive'
+    process_data_no = Column(Integer, primary_key=True, autoincrement=False)
+    processno = Column(Integer, index=True)
+    process_data_type_no = Column(Integer)
+    fieldname = Column(String)
+    value = Column(String)
+    tmstamp = Column(DateTime)
+    usrid = Column(String)
+    archived_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+# Analytics summaries, refreshed incrementally by `python -m workflow.maintenance analytics-refresh` and read by
+# the /analytics endpoints. Days are UTC.
+class AnalyticsStepDaily(Base):
+    """Steps closed per day and task, with duration (date_ended - date_started) statistics in seconds."""
+    __tablename__ = 'analytics_step_daily'
+    day = Column(Date, primary_key=True)
+    taskno = Column(Integer, primary_key=True)
+    completed = Column(Integer, nullable=False)
+    total_seconds = Column(Float, nullable=False)
+    p50_seconds = Column(Float)
+    p90_seconds = Column(Float)
+    p95_seconds = Column(Float)
+
+class AnalyticsProcessDaily(Base):
+    """Processes started and ended per day and process type; cycle time summed over the ended ones."""
+    __tablename__ = 'analytics_process_daily'
+    day = Column(Date, primary_key=True)
+    process_type_no = Column(Integer, primary_key=True)
+    started = Column(Integer, nullable=False)
+    completed = Column(Integer, nullable=False)
+    total_cycle_seconds = Column(Float, nullable=False)
+
+# Live open-work counters, adjusted in the same transaction as each transition (see workflow.doa.counters). A key's
+# count is the sum of its shards.
+class TaskStatusCounter(Base):
+    """Open steps per task and status."""
+    __tablename__ = 'task_status_counters'
+    taskno = Column(Integer, primary_key=True)
+    status_no = Column(Integer, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    steps = Column(Integer, nullable=False)
+
+class ProcessTypeStatusCounter(Base):
+    """Open processes per process type and status."""
+    __tablename__ = 'process_type_status_counters'
+    process_type_no = Column(Integer, primary_key=True)
+    status_no = Column(Integer, primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    processes = Column(Integer, nullable=False)
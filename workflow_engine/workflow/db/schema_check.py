@@ -0,0 +1,89 @@
+"""
+Schema verification and repair, run once per deployment instead of on the request path.
+
+verify() only reads the catalog. repair() issues DDL (CREATE TABLE, ALTER TABLE ... SET DEFAULT) and so takes
+strong locks; run it from the deploy step, before traffic arrives:
+
+    python -m workflow.maintenance verify-schema --repair
+
+At startup the app verifies (or repairs, with SCHEMA_REPAIR_ON_STARTUP=1) once per process. Results are cached
+per alembic revision, so later calls in the same process cost one query.
+"""
+import logging
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from workflow.db.models import Base
+
+SCHEMA_CHECK_ON_STARTUP = os.getenv("SCHEMA_CHECK_ON_STARTUP", "1").lower() in ("1", "true", "yes")
+SCHEMA_REPAIR_ON_STARTUP = os.getenv("SCHEMA_REPAIR_ON_STARTUP", "0").lower() in ("1", "true", "yes")
+
+logger = logging.getLogger("app.schema")
+
+_cache: dict[Optional[str], list[str]] = {}
+_lock = threading.Lock()
+
+
+def _revision(conn: Connection) -> Optional[str]:
+    if not inspect(conn).has_table("alembic_version"):
+        return None
+    return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def _missing_tables(conn: Connection) -> list[str]:
+    existing = set(inspect(conn).get_table_names())
+    return sorted(name for name in Base.metadata.tables if name not in existing)
+
+
+def _task_rule_pk_has_default(conn: Connection) -> bool:
+    default = conn.execute(text(
+        "SELECT column_default FROM information_schema.columns "
+        "WHERE table_name = 'task_rules' AND column_name = 'taskruleno' AND table_schema = current_schema()"
+    )).scalar()
+    return default is not None
+
+
+def verify(conn: Connection) -> list[str]:
+    """Return the problems found; an empty list means the schema is usable. Read-only."""
+    problems = [f"missing table {name}" for name in _missing_tables(conn)]
+    if "missing table task_rules" not in problems and not _task_rule_pk_has_default(conn):
+        problems.append("task_rules.taskruleno has no default")
+    return problems
+
+
+def repair(conn: Connection) -> list[str]:
+    """Fix what verify() reports; returns the problems left afterwards. Issues DDL."""
+    missing = _missing_tables(conn)
+    if missing:
+        # logs should come from migration 8d2f4a1c5b90 (partitioned); this is the unpartitioned fallback
+        Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables[name] for name in missing])
+    if not _task_rule_pk_has_default(conn):
+        # A skipped migration can leave task_rules without its identity default, which makes inserts fail
+        conn.execute(text("CREATE SEQUENCE IF NOT EXISTS task_rules_taskruleno_seq OWNED BY task_rules.taskruleno"))
+        conn.execute(text(
+            "SELECT setval('task_rules_taskruleno_seq', GREATEST((SELECT max(taskruleno) FROM task_rules), 0) + 1, false)"
+        ))
+        conn.execute(text("ALTER TABLE task_rules ALTER COLUMN taskruleno SET DEFAULT nextval('task_rules_taskruleno_seq')"))
+    return verify(conn)
+
+
+def ensure_schema(engine: Engine, repair_problems: bool = False) -> list[str]:
+    """Verify (and optionally repair) once per alembic revision per process; returns the remaining problems."""
+    with _lock:
+        with engine.connect() as conn:
+            revision = _revision(conn)
+            if revision in _cache:
+                return _cache[revision]
+        with engine.begin() as conn:
+            problems = verify(conn)
+            if problems and repair_problems:
+                logger.warning("Repairing schema: %s", "; ".join(problems))
+                problems = repair(conn)
+        for problem in problems:
+            logger.warning("Schema problem (run `python -m workflow.maintenance verify-schema --repair`): %s", problem)
+        _cache[revision] = problems
+        return problems
@@ -1,5 +1,18 @@
+import os
+import time
 from typing import Generator
-from workflow.db.database import SessionLocal
+
+from fastapi import Depends, Request
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from workflow.db.database import REPLICAS, SessionLocal, read_session
+
+# After a successful write the client gets this cookie, and its reads go to the primary until it expires, so a
+# lagging replica never hides the client's own change (e.g. the next step right after close_step)
+READ_YOUR_WRITES_COOKIE = "wf_wrote_at"
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+
 
 def get_db() -> Generator:
     db = SessionLocal()
@@ -7,3 +20,29 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        wrote_at = float(request.cookies.get(READ_YOUR_WRITES_COOKIE, ""))
+    except ValueError:
+        return False
+    return time.time() - wrote_at < READ_YOUR_WRITES_SECONDS
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)) -> Generator:
+    """
+    Session for read-only routes: a healthy replica when SQLALCHEMY_REPLICA_URLS is set, otherwise (or for clients
+    that wrote within READ_YOUR_WRITES_SECONDS) the request's primary session.
+    """
+    if not REPLICAS.engines or wrote_recently(request):
+        yield db
+        return
+    replica = read_session()
+    try:
+        yield replica
+    except OperationalError:
+        REPLICAS.mark_down(replica.get_bind())
+        raise
+    finally:
+        replica.close()
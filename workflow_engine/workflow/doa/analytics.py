@@ -0,0 +1,64 @@
+import datetime
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from workflow.db import models
+from workflow.doa import counters
+
+
+def get_counts(db: Session) -> dict:
+    """Open steps per task/status and open processes per process type/status, from the live counters."""
+    return {"tasks": counters.step_counts(db), "process_types": counters.process_counts(db)}
+
+
+def list_step_durations(db: Session, start: datetime.date, end: datetime.date, taskno: int | None = None) -> list:
+    """Daily step duration statistics per task for days in [start, end)."""
+    daily = models.AnalyticsStepDaily
+    q = (
+        select(
+            daily.day,
+            daily.taskno,
+            models.Task.description.label("task"),
+            daily.completed,
+            (daily.total_seconds / daily.completed).label("avg_seconds"),
+            daily.p50_seconds,
+            daily.p90_seconds,
+            daily.p95_seconds,
+        )
+        .outerjoin(models.Task, models.Task.taskno == daily.taskno)
+        .where(daily.day >= start, daily.day < end)
+        .order_by(daily.day, daily.taskno)
+    )
+    if taskno is not None:
+        q = q.where(daily.taskno == taskno)
+    return db.execute(q).mappings().all()
+
+
+def list_throughput(db: Session, start: datetime.date, end: datetime.date, process_type_no: int | None = None) -> list:
+    """
+    Daily processes started/completed per process type for days in [start, end), with a trailing 7-day average
+    of completions. The window reads the six days before start too, so the first days of the range are complete.
+    """
+    return db.execute(
+        text(
+            """
+            SELECT t.day, t.process_type_no, pt.description AS process_type, t.started, t.completed,
+                   t.avg_cycle_seconds, t.completed_7d_avg
+            FROM (
+                SELECT day, process_type_no, started, completed,
+                       total_cycle_seconds / NULLIF(completed, 0) AS avg_cycle_seconds,
+                       sum(completed) OVER (
+                           PARTITION BY process_type_no ORDER BY day
+                           RANGE BETWEEN INTERVAL '6 days' PRECEDING AND CURRENT ROW
+                       ) / 7.0 AS completed_7d_avg
+                FROM analytics_process_daily
+                WHERE day >= CAST(:start AS DATE) - 6 AND day < :end
+                  AND (CAST(:process_type_no AS INTEGER) IS NULL OR process_type_no = :process_type_no)
+            ) t
+            LEFT JOIN process_types pt ON pt.process_type_no = t.process_type_no
+            WHERE t.day >= :start
+            ORDER BY t.day, t.process_type_no
+            """
+        ),
+        {"start": start, "end": end, "process_type_no": process_type_no},
+    ).mappings().all()
@@ -1,23 +1,145 @@
+import datetime
+from collections import Counter
+from sqlalchemy import RowMapping, func, select, union_all
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from workflow.db import models
-from workflow import schemas
-from workflow.doa.utils import save
-from workflow.doa import processes as processes_dao, steps as steps_dao
+from workflow import schemas, metrics, events
+from workflow.doa.utils import save, with_archive_columns
+from workflow.doa import counters, processes as processes_dao, steps as steps_dao
 
 
 def get_case(db: Session, case_id: int) -> models.Case | None:
     return db.query(models.Case).filter(models.Case.caseno == case_id).first()
 
-def list_cases_by_user(db: Session, usrid: str) -> list[models.Case]:
-    return db.query(models.Case).filter(models.Case.usrid == usrid).all()
+# Lists return Core row mappings rather than entities: they are only serialized (see workflow.responses)
+def list_cases_by_user(db: Session, usrid: str) -> list[RowMapping]:
+    return db.execute(select(models.Case.__table__).where(models.Case.usrid == usrid)).mappings().all()
 
-def list_all_cases(db: Session) -> list[models.Case]:
-    return db.query(models.Case).all()
+def list_all_cases(db: Session) -> list[RowMapping]:
+    return db.execute(select(models.Case.__table__)).mappings().all()
+
+def search_cases(
+    db: Session,
+    usrid: str | None = None,
+    client_id: str | None = None,
+    client_type: str | None = None,
+    status: str | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> tuple[list[RowMapping], int]:
+    """
+    Filtered, newest-first case listing. Returns (page, total) where total counts all matching cases
+    so callers can page without downloading the whole table.
+    """
+    q = select(models.Case.__table__)
+    if usrid is not None:
+        q = q.where(models.Case.usrid == usrid)
+    if client_id is not None:
+        q = q.where(models.Case.client_id == client_id)
+    if client_type is not None:
+        q = q.where(models.Case.client_type == client_type)
+    if status is not None:
+        # Cases having at least one process in the given status (e.g. 'busy' = open cases)
+        status_cases = (
+            select(models.Process.case_no)
+            .join(models.Status, models.Process.status_no == models.Status.statusno)
+            .where(models.Status.description.ilike(status))
+        )
+        q = q.where(models.Case.caseno.in_(status_cases))
+    total = db.execute(select(func.count()).select_from(q.subquery())).scalar_one()
+    q = q.order_by(models.Case.caseno.desc()).offset(offset)
+    if limit is not None:
+        q = q.limit(limit)
+    return db.execute(q).mappings().all(), total
+
+def get_case_overview(db: Session, case_no: int, usrid: str | None = None) -> dict:
+    """
+    Case, its processes with resolved status/type descriptions, the current (busy) step of each
+    process and its process data, assembled with a fixed number of queries.
+    Archived processes and their data are read through (UNION ALL) in the same statements.
+    When usrid is given the case must belong to that user.
+    """
+    db_case = get_case(db, case_no)
+    if db_case is None or (usrid is not None and db_case.usrid != usrid):
+        raise HTTPException(status_code=404, detail="Case not found")
+
+    hot, cold = with_archive_columns(models.Process, models.ArchivedProcess)
+    processes = union_all(
+        select(*hot).where(models.Process.case_no == case_no),
+        select(*cold).where(models.ArchivedProcess.case_no == case_no),
+    ).subquery()
+    process_rows = db.execute(
+        select(processes, models.Status.description.label("status"), models.ProcessType.description.label("process_type"))
+        .outerjoin(models.Status, processes.c.status_no == models.Status.statusno)
+        .outerjoin(models.ProcessType, processes.c.process_type_no == models.ProcessType.process_type_no)
+        .order_by(processes.c.processno)
+    ).all()
+    processnos = [row.processno for row in process_rows]
+
+    current_steps: dict[int, dict] = {}
+    data: dict[int, dict[str, str]] = {pno: {} for pno in processnos}
+    if processnos:
+        # Each process points at its open step, so this reads one step per process by primary key
+        step_rows = (
+            db.query(models.Step, models.Task.description, models.Status.description)
+            .join(models.Process, models.Process.current_stepno == models.Step.stepno)
+            .outerjoin(models.Task, models.Step.taskno == models.Task.taskno)
+            .outerjoin(models.Status, models.Step.status_no == models.Status.statusno)
+            .filter(models.Process.case_no == case_no)
+            .all()
+        )
+        for step, task_desc, status_desc in step_rows:
+            current_steps[step.processno] = {
+                "stepno": step.stepno,
+                "taskno": step.taskno,
+                "task": task_desc,
+                "status": status_desc,
+                "date_started": step.date_started,
+            }
+
+        hot, cold = with_archive_columns(models.ProcessData, models.ArchivedProcessData)
+        process_data = union_all(
+            select(*hot).where(models.ProcessData.processno.in_(processnos)),
+            select(*cold).where(models.ArchivedProcessData.processno.in_(processnos)),
+        ).subquery()
+        data_rows = db.execute(
+            select(process_data, models.ProcessDataType.description.label("data_type"))
+            .outerjoin(
+                models.ProcessDataType,
+                process_data.c.process_data_type_no == models.ProcessDataType.process_data_type_no,
+            )
+            .order_by(process_data.c.process_data_no)
+        ).all()
+        for pd in data_rows:
+            # Keyed like rule expressions ('<datatype>.<field>'); later rows overwrite earlier ones
+            data[pd.processno][f"{pd.data_type}.{pd.fieldname}"] = pd.value
+
+    return {
+        "caseno": db_case.caseno,
+        "client_id": db_case.client_id,
+        "client_type": db_case.client_type,
+        "usrid": db_case.usrid,
+        "date_created": db_case.date_created,
+        "processes": [
+            {
+                "processno": p.processno,
+                "process_type_no": p.process_type_no,
+                "process_type": p.process_type,
+                "status_no": p.status_no,
+                "status": p.status,
+                "date_started": p.date_started,
+                "date_ended": p.date_ended,
+                "current_step": current_steps.get(p.processno),
+                "data": data[p.processno],
+            }
+            for p in process_rows
+        ],
+    }
 
 def create_case(db: Session, case: schemas.CaseCreate, process_type_no: int, usrid: str) -> models.Case:
     # Create Case
-    db_case = models.Case(client_id=case.client_id, client_type=case.client_type, usrid=usrid)
+    db_case = models.Case(client_id=case.client_id, client_type=case.client_type, usrid=usrid, open_process_count=1)
     db.add(db_case)
     db.flush()  # assign caseno
 
@@ -53,12 +175,22 @@ def create_case(db: Session, case: schemas.CaseCreate, process_type_no: int, usr
         taskno=process_definition.start_task_no,
         status_no=busy_status_no,
         usrid=usrid,
+        due_at=steps_dao.sla_due_at(process_definition.start_task_no, datetime.datetime.utcnow()),
     )
     db.add(initial_step)
+    db.flush()  # assign stepno for the event and the pointers
+    db_process.current_stepno = initial_step.stepno
+    db_case.current_processno = db_process.processno
+    counters.record(
+        db,
+        steps=Counter({(initial_step.taskno, busy_status_no): 1}),
+        processes=Counter({(process_type_no, busy_status_no): 1}),
+    )
+    events.publish(
+        db, db_case.caseno, "case_created",
+        processno=db_process.processno, stepno=initial_step.stepno, taskno=initial_step.taskno,
+    )
 
-    # Commit once to keep the whole operation atomic
-    db.commit()
-
-    # Refresh and return created case after commit
-    db.refresh(db_case)
+    # The caller commits once, keeping the whole operation atomic
+    metrics.CASES_CREATED.inc(process_type_no=process_type_no)
     return db_case
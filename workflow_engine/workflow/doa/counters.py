@@ -0,0 +1,98 @@
+"""
+Live counts of open steps per task and status and open processes per process type and status.
+
+Every transition adjusts the counters in the caller's transaction, so a count is a read of a few rows rather than a
+GROUP BY over steps or processes. Each key is spread over COUNTER_SHARDS rows and a transaction adds its delta to
+the row of its connection's shard (backend pid modulo COUNTER_SHARDS). A connection runs one transaction at a time,
+so concurrent transitions of the same task and status only wait on each other's row lock until commit when their
+pids collide. Reads sum the shards. `python -m workflow.maintenance counters-reconcile` recounts from the source
+tables, corrects any drift and folds the shards back into one row per key.
+"""
+import os
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from workflow.db import models
+
+COUNTER_SHARDS = int(os.getenv("COUNTER_SHARDS", "32"))
+
+
+def _add(db: Session, model, column: str, deltas: Counter) -> None:
+    """Add deltas ({key tuple: n}) to this connection's shard of each key; one statement, keys in a fixed order."""
+    keys = [c.name for c in model.__table__.primary_key.columns if c.name != "shard"]
+    shard = func.pg_backend_pid() % COUNTER_SHARDS
+    rows = [
+        dict(zip(keys, key), shard=shard, **{column: n})
+        for key, n in sorted(deltas.items())
+        if n and None not in key
+    ]
+    if not rows:
+        return
+    stmt = insert(model).values(rows)
+    # Sorted rows lock their keys in the same order in every transaction, so transitions do not deadlock on them
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=keys + ["shard"],
+        set_={column: getattr(model, column) + getattr(stmt.excluded, column)},
+    ))
+
+
+def record(db: Session, steps: Optional[Counter] = None, processes: Optional[Counter] = None) -> None:
+    """
+    Apply counter changes in the caller's transaction (no commit). steps maps (taskno, status_no) and processes
+    maps (process_type_no, status_no) to the change in open rows, e.g. -1 for a step that was closed. A transaction
+    that changes both records its steps first, like this function does, so lock order is the same everywhere.
+    """
+    if steps:
+        _add(db, models.TaskStatusCounter, "steps", steps)
+    if processes:
+        _add(db, models.ProcessTypeStatusCounter, "processes", processes)
+
+
+def step_counts(db: Session) -> list:
+    """Open steps per (taskno, status_no), with descriptions; keys that have dropped to zero are left out."""
+    counter = models.TaskStatusCounter
+    totals = (
+        select(counter.taskno, counter.status_no, func.sum(counter.steps).label("steps"))
+        .group_by(counter.taskno, counter.status_no)
+        .having(func.sum(counter.steps) != 0)
+        .subquery()
+    )
+    return db.execute(
+        select(
+            totals.c.taskno,
+            models.Task.description.label("task"),
+            totals.c.status_no,
+            models.Status.description.label("status"),
+            totals.c.steps,
+        )
+        .outerjoin(models.Task, models.Task.taskno == totals.c.taskno)
+        .outerjoin(models.Status, models.Status.statusno == totals.c.status_no)
+        .order_by(totals.c.taskno, totals.c.status_no)
+    ).mappings().all()
+
+
+def process_counts(db: Session) -> list:
+    """Open processes per (process_type_no, status_no), with descriptions; zero keys are left out."""
+    counter = models.ProcessTypeStatusCounter
+    totals = (
+        select(counter.process_type_no, counter.status_no, func.sum(counter.processes).label("processes"))
+        .group_by(counter.process_type_no, counter.status_no)
+        .having(func.sum(counter.processes) != 0)
+        .subquery()
+    )
+    return db.execute(
+        select(
+            totals.c.process_type_no,
+            models.ProcessType.description.label("process_type"),
+            totals.c.status_no,
+            models.Status.description.label("status"),
+            totals.c.processes,
+        )
+        .outerjoin(models.ProcessType, models.ProcessType.process_type_no == totals.c.process_type_no)
+        .outerjoin(models.Status, models.Status.statusno == totals.c.status_no)
+        .order_by(totals.c.process_type_no, totals.c.status_no)
+    ).mappings().all()
@@ -0,0 +1,73 @@
+import datetime
+from typing import Iterator
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from workflow.db import models
+
+# Rows fetched from the server-side cursor at a time while streaming
+STREAM_BATCH = 500
+
+
+def encode_cursor(entry: models.LogEntry) -> str:
+    return f"{entry.created_at.isoformat()}~{entry.id}"
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    try:
+        created_at, _, id_ = cursor.rpartition("~")
+        return datetime.datetime.fromisoformat(created_at), int(id_)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_logs(
+    db: Session,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    level: list[str] | None = None,
+    http_path: str | None = None,
+    status_code: int | None = None,
+    user_id: str | None = None,
+    q: str | None = None,
+    cursor: str | None = None,
+    limit: int = 1000,
+) -> Iterator[models.LogEntry]:
+    """
+    Newest-first log entries in [start, end), keyset paginated on (created_at, id).
+
+    The created_at range prunes to the matching daily partitions and is served by (created_at, level);
+    q is a case-insensitive substring match served by the trigram index on message. Yields up to limit + 1
+    rows so the caller can tell whether there is a next page.
+    """
+    query = db.query(models.LogEntry).filter(
+        models.LogEntry.created_at >= start,
+        models.LogEntry.created_at < end,
+    )
+    if level:
+        query = query.filter(models.LogEntry.level.in_([lv.upper() for lv in level]))
+    if http_path is not None:
+        query = query.filter(models.LogEntry.http_path == http_path)
+    if status_code is not None:
+        query = query.filter(models.LogEntry.status_code == status_code)
+    if user_id is not None:
+        query = query.filter(models.LogEntry.user_id == user_id)
+    if q:
+        query = query.filter(models.LogEntry.message.ilike(f"%{_escape_like(q)}%", escape="\\"))
+    if cursor:
+        after_created_at, after_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            models.LogEntry.created_at < after_created_at,
+            and_(models.LogEntry.created_at == after_created_at, models.LogEntry.id < after_id),
+        ))
+    query = (
+        query.order_by(models.LogEntry.created_at.desc(), models.LogEntry.id.desc())
+        .limit(limit + 1)
+        .yield_per(STREAM_BATCH)
+    )
+    return iter(query)
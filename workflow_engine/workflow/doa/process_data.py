@@ -1,47 +1,129 @@
+import datetime
+import json
+from typing import Any, Iterable
+from fastapi import HTTPException
+from sqlalchemy import RowMapping, func, select, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from workflow.db import models
-from workflow import schemas
-from workflow.doa.utils import save
+from workflow import schemas, events
+from workflow.doa.utils import save, with_archive_columns
 
 def create_process_data(db: Session, processno: int, process_data: schemas.ProcessDataCreate, usrid: str) -> models.ProcessData:
-    return save(db, models.ProcessData(**process_data.dict(), processno=processno, usrid=usrid))
+    # A field that is already set is updated rather than duplicated
+    (pd,) = upsert_process_data(db, processno, [(process_data.process_data_type_no, process_data.fieldname, process_data.value)], usrid)
+    return pd
 
-def list_all_process_data(db: Session) -> list[models.ProcessData]:
-    return db.query(models.ProcessData).all()
+def upsert_process_data(db: Session, processno: int, items: Iterable[tuple[int, str, str | None]], usrid: str) -> list[models.ProcessData]:
+    """
+    Set (process_data_type_no, fieldname, value) items on one process with a single multi-row
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING, in the caller's transaction (no commit). If a field appears
+    more than once, the last value wins. Returns the resulting rows ordered by type and field name.
+    """
+    rows: dict[tuple[int, str], str | None] = {}
+    for process_data_type_no, fieldname, value in items:
+        rows[(process_data_type_no, fieldname)] = value
+    if not rows:
+        return []
+    now = datetime.datetime.utcnow()
+    stmt = insert(models.ProcessData).values([
+        dict(processno=processno, process_data_type_no=type_no, fieldname=fieldname, value=value, usrid=usrid, tmstamp=now)
+        for (type_no, fieldname), value in rows.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["processno", "process_data_type_no", "fieldname"],
+        set_={"value": stmt.excluded.value, "usrid": stmt.excluded.usrid, "tmstamp": stmt.excluded.tmstamp},
+    ).returning(models.ProcessData)
+    try:
+        result = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+    except IntegrityError:
+        # No rollback here: the caller owns the transaction and its locks, and get_db discards it
+        raise HTTPException(status_code=422, detail="Unknown process or process data type")
+    return sorted(result, key=lambda pd: (pd.process_data_type_no, pd.fieldname))
 
-def list_process_data_for_user_cases(db: Session, usrid: str) -> list[models.ProcessData]:
-    # Join ProcessData -> Process -> Case and filter by case.usrid
-    return (
-        db.query(models.ProcessData)
-        .join(models.Process, models.ProcessData.processno == models.Process.processno)
-        .join(models.Case, models.Process.case_no == models.Case.caseno)
-        .filter(models.Case.usrid == usrid)
-        .all()
-    )
+def flatten_named_values(values: dict[str, Any]) -> dict[tuple[str, str], str | None]:
+    """
+    Accept {"dtype.field": value} and/or {"dtype": {"field": value}}; return {(dtype, field): value as stored}.
+    Non-string values are stored as JSON.
+    """
+    out: dict[tuple[str, str], str | None] = {}
+    for key, value in values.items():
+        if isinstance(value, dict):
+            for fieldname, inner in value.items():
+                out[(str(key), str(fieldname))] = inner
+            continue
+        dtype, sep, fieldname = str(key).partition(".")
+        if not sep or not dtype or not fieldname:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Process data key {key!r} must be '<process data type>.<field>' or a {{type: {{field: value}}}} object",
+            )
+        out[(dtype, fieldname)] = value
+    return {k: v if v is None or isinstance(v, str) else json.dumps(v) for k, v in out.items()}
 
-def list_process_data_for_case(db: Session, case_no: int) -> list[models.ProcessData]:
-    # All process data for a given case (admin scope)
-    return (
-        db.query(models.ProcessData)
-        .join(models.Process, models.ProcessData.processno == models.Process.processno)
-        .filter(models.Process.case_no == case_no)
+def write_named_process_data(db: Session, processno: int, values: dict[str, Any], usrid: str) -> list[tuple[str, str]]:
+    """
+    Upsert process data addressed by type description and field name (see flatten_named_values) for one
+    process, in the caller's transaction, so rule evaluation sees the new values; does not commit.
+    Returns the (dtype, field) pairs written.
+    """
+    flat = flatten_named_values(values)
+    if not flat:
+        return []
+    dtypes = dict(
+        db.query(models.ProcessDataType.description, models.ProcessDataType.process_data_type_no)
+        .filter(models.ProcessDataType.description.in_({dtype for dtype, _ in flat}))
         .all()
     )
+    unknown = sorted({dtype for dtype, _ in flat} - dtypes.keys())
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown process data type(s): {', '.join(unknown)}")
+    upsert_process_data(db, processno, [(dtypes[dtype], fieldname, value) for (dtype, fieldname), value in flat.items()], usrid)
+    return list(flat)
+
+# Lists return Core row mappings rather than entities: they are only serialized (see workflow.responses)
+def _page(db: Session, q, limit: int | None, offset: int) -> tuple[list[RowMapping], int]:
+    total = db.execute(select(func.count()).select_from(q.subquery())).scalar_one()
+    q = q.order_by(models.ProcessData.processno, models.ProcessData.fieldname, models.ProcessData.process_data_no).offset(offset)
+    if limit is not None:
+        q = q.limit(limit)
+    return db.execute(q).mappings().all(), total
 
-def list_process_data_for_case_and_user(db: Session, case_no: int, usrid: str) -> list[models.ProcessData]:
-    # Process data for a given case limited to the requesting user (non-admin scope)
+def list_all_process_data(db: Session) -> list[RowMapping]:
+    return db.execute(select(models.ProcessData.__table__)).mappings().all()
+
+def page_all_process_data(db: Session, limit: int | None = None, offset: int = 0) -> tuple[list[RowMapping], int]:
+    return _page(db, select(models.ProcessData.__table__), limit, offset)
+
+def _user_cases_query(usrid: str):
+    # Join ProcessData -> Process -> Case and filter by case.usrid
     return (
-        db.query(models.ProcessData)
+        select(models.ProcessData.__table__)
         .join(models.Process, models.ProcessData.processno == models.Process.processno)
         .join(models.Case, models.Process.case_no == models.Case.caseno)
-        .filter(models.Process.case_no == case_no, models.Case.usrid == usrid)
-        .all()
+        .where(models.Case.usrid == usrid)
     )
 
+def list_process_data_for_user_cases(db: Session, usrid: str) -> list[RowMapping]:
+    return db.execute(_user_cases_query(usrid)).mappings().all()
+
+def page_process_data_for_user_cases(db: Session, usrid: str, limit: int | None = None, offset: int = 0) -> tuple[list[RowMapping], int]:
+    return _page(db, _user_cases_query(usrid), limit, offset)
+
+def list_process_data_for_case(db: Session, case_no: int) -> list[RowMapping]:
+    # All process data for a given case, including archived processes' data (one UNION ALL statement)
+    hot, cold = with_archive_columns(models.ProcessData, models.ArchivedProcessData)
+    return db.execute(union_all(
+        select(*hot).join(models.Process, models.ProcessData.processno == models.Process.processno)
+        .where(models.Process.case_no == case_no),
+        select(*cold).join(models.ArchivedProcess, models.ArchivedProcessData.processno == models.ArchivedProcess.processno)
+        .where(models.ArchivedProcess.case_no == case_no),
+    )).mappings().all()
+
 def update_process_data(db: Session, process_data_no: int, payload: schemas.ProcessDataUpdate, usrid: str) -> models.ProcessData:
     pd = db.query(models.ProcessData).filter(models.ProcessData.process_data_no == process_data_no).first()
     if not pd:
-        from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Process data not found")
     if payload.process_data_type_no is not None:
         pd.process_data_type_no = payload.process_data_type_no
@@ -51,4 +133,14 @@ def update_process_data(db: Session, process_data_no: int, payload: schemas.Proc
         pd.value = payload.value
     # update audit user
     pd.usrid = usrid
+    try:
+        db.flush()
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Field is already set for this process; update that entry instead")
+    case_no = db.query(models.Process.case_no).filter(models.Process.processno == pd.processno).scalar()
+    events.publish(
+        db, case_no, "process_data_changed",
+        processno=pd.processno, process_data_no=pd.process_data_no,
+        process_data_type_no=pd.process_data_type_no, fieldname=pd.fieldname,
+    )
     return save(db, pd)
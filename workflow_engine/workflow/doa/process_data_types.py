@@ -16,6 +16,5 @@ def update_process_data_type(db: Session, process_data_type_no: int, payload: sc
     for k, v in data.items():
         setattr(obj, k, v)
     obj.usrid = usrid
-    db.commit()
-    db.refresh(obj)
+    db.flush()
     return obj
@@ -24,9 +24,6 @@ def create_process_definition(db: Session, process_definition: schemas.ProcessDe
 
     # Update the process definition with the created task number
     db_process_definition.start_task_no = new_task.taskno
-    db.add(db_process_definition)
-    db.commit()
-    db.refresh(db_process_definition)
 
     start_task_no = new_task.taskno
 
@@ -42,6 +39,5 @@ def update_process_definition(db: Session, pd_no: int, payload: schemas.ProcessD
     for k, v in data.items():
         setattr(obj, k, v)
     obj.usrid = usrid
-    db.commit()
-    db.refresh(obj)
+    db.flush()
     return obj
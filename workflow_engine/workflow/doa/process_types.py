@@ -13,6 +13,5 @@ def update_process_type(db: Session, process_type_no: int, payload: schemas.Proc
     for k, v in data.items():
         setattr(obj, k, v)
     obj.usrid = usrid
-    db.commit()
-    db.refresh(obj)
+    db.flush()
     return obj
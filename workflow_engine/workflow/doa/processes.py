@@ -1,11 +1,54 @@
+from collections import Counter
+from sqlalchemy import case, func, select, update
 from sqlalchemy.orm import Session
 from workflow.db import models
-from workflow import schemas
+from workflow import schemas, events
 from workflow.doa.utils import save, require_found
-from workflow.doa import process_data as process_data_dao
+from workflow.doa import counters, process_data as process_data_dao
 
 def create_process(db: Session, process: schemas.ProcessCreate, usrid: str) -> models.Process:
-    return save(db, models.Process(**process.dict(), usrid=usrid))
+    db_process = save(db, models.Process(**process.dict(), usrid=usrid))
+    # A new process is open and becomes its case's current process
+    db.execute(
+        update(models.Case)
+        .where(models.Case.caseno == db_process.case_no)
+        .values(open_process_count=models.Case.open_process_count + 1, current_processno=db_process.processno)
+        .execution_options(synchronize_session=False)
+    )
+    counters.record(db, processes=Counter({(db_process.process_type_no, db_process.status_no): 1}))
+    return db_process
+
+def mark_process_closed(db: Session, db_process: models.Process) -> None:
+    """
+    Clear an open process's current-step pointer and take it off its case's open processes and the open-process
+    counters, in the caller's transaction. If it was the case's current process, the newest other open process
+    takes its place. Call it before changing the process's status.
+    """
+    if db_process.date_ended is not None:
+        return
+    db_process.current_stepno = None
+    other_open = (
+        select(func.max(models.Process.processno))
+        .where(
+            models.Process.case_no == db_process.case_no,
+            models.Process.date_ended.is_(None),
+            models.Process.processno != db_process.processno,
+        )
+        .scalar_subquery()
+    )
+    db.execute(
+        update(models.Case)
+        .where(models.Case.caseno == db_process.case_no)
+        .values(
+            open_process_count=func.greatest(models.Case.open_process_count - 1, 0),
+            current_processno=case(
+                (models.Case.current_processno == db_process.processno, other_open),
+                else_=models.Case.current_processno,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    counters.record(db, processes=Counter({(db_process.process_type_no, db_process.status_no): -1}))
 
 def create_process_data_for_process(
     db: Session,
@@ -15,23 +58,47 @@ def create_process_data_for_process(
 ) -> models.ProcessData:
     db_process = db.query(models.Process).filter(models.Process.processno == process_no).first()
     require_found(db_process, "Process not found", 404)
+    events.publish(
+        db, db_process.case_no, "process_data_changed",
+        processno=process_no, process_data_type_no=process_data.process_data_type_no, fieldname=process_data.fieldname,
+    )
     return process_data_dao.create_process_data(db, processno=process_no, process_data=process_data, usrid=usrid)
 
+def upsert_process_data_for_process(
+    db: Session,
+    process_no: int,
+    items: list[schemas.ProcessDataCreate],
+    usrid: str,
+) -> list[models.ProcessData]:
+    """Set many fields of a process in one statement; existing fields are updated."""
+    case_no = db.query(models.Process.case_no).filter(models.Process.processno == process_no).first()
+    require_found(case_no, "Process not found", 404)
+    rows = process_data_dao.upsert_process_data(
+        db, process_no, [(item.process_data_type_no, item.fieldname, item.value) for item in items], usrid)
+    if rows:
+        events.publish(
+            db, case_no[0], "process_data_changed",
+            processno=process_no, fields=[[pd.process_data_type_no, pd.fieldname] for pd in rows],
+        )
+    return rows
+
 def complete_process(db: Session, process_no: int, usrid: str) -> models.Process:
     import datetime
     from fastapi import HTTPException
 
-    db_process = db.query(models.Process).filter(models.Process.processno == process_no).first()
+    # Same per-process lock as close_step, so completion cannot interleave with a step close
+    db_process = db.query(models.Process).filter(models.Process.processno == process_no).with_for_update().first()
     require_found(db_process, "Process not found", 404)
 
     completed_status = db.query(models.Status).filter(models.Status.description.ilike("complete")).first()
     if not completed_status:
         raise HTTPException(status_code=500, detail="Required status 'complete' not configured")
 
+    mark_process_closed(db, db_process)
     db_process.status_no = completed_status.statusno
     db_process.date_ended = datetime.datetime.utcnow()
-    db.commit()
-    db.refresh(db_process)
+    events.publish(db, db_process.case_no, "process_completed", processno=db_process.processno)
+    db.flush()
     return db_process
 
 def list_all_processes(db: Session) -> list[models.Process]:
@@ -1,21 +1,36 @@
 import datetime
 import re
+import time
+from collections import Counter
+from sqlalchemy import DateTime, RowMapping, func, literal, or_, select, union_all, update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from workflow.db import models
-from workflow import schemas
-from workflow.doa.utils import save, require_found
+from workflow import schemas, metrics, events
+from workflow.doa.utils import save, require_found, with_archive_columns
+from workflow.doa import counters, process_data as process_data_dao, processes as processes_dao
+
+def sla_due_at(taskno: int, started: datetime.datetime):
+    """SQL expression for a new step's due_at: started + the task's sla_seconds (NULL when the task has no SLA)."""
+    return (
+        select(literal(started, DateTime) + func.make_interval(0, 0, 0, 0, 0, 0, models.Task.sla_seconds))
+        .where(models.Task.taskno == taskno)
+        .scalar_subquery()
+    )
 
 def create_step(db: Session, processno: int, taskno: int, status_no: int, usrid: str) -> models.Step:
+    counters.record(db, steps=Counter({(taskno, status_no): 1}))
     return save(db, models.Step(
         processno=processno,
         taskno=taskno,
         status_no=status_no,
-        usrid=usrid
+        usrid=usrid,
+        due_at=sla_due_at(taskno, datetime.datetime.utcnow()),
     ))
 
-def list_all_steps(db: Session) -> list[models.Step]:
-    return db.query(models.Step).all()
+def list_all_steps(db: Session) -> list[RowMapping]:
+    # Core rows rather than entities: the list is only serialized (see workflow.responses)
+    return db.execute(select(models.Step.__table__)).mappings().all()
 
 def _get_status_no(db: Session, description: str) -> int:
     status = db.query(models.Status).filter(models.Status.description.ilike(description)).first()
@@ -215,15 +230,164 @@ def evaluate_rule_expression(db: Session, processno: int, rule_text: str) -> boo
 
     return _eval(text)
 
+def get_current_step_for_case(db: Session, case_no: int) -> models.Step | None:
+    """
+    The open step of the case's current process: primary-key hops through the maintained pointers. A process
+    created without a step still becomes the current process, so if it has no open step the newest open process
+    that has one is used instead.
+    """
+    step = (
+        db.query(models.Step)
+        .join(models.Process, models.Process.current_stepno == models.Step.stepno)
+        .join(models.Case, models.Case.current_processno == models.Process.processno)
+        .filter(models.Case.caseno == case_no)
+        .first()
+    )
+    if step is not None:
+        return step
+    # Reads the partial index on processes(case_no) WHERE current_stepno IS NOT NULL
+    return (
+        db.query(models.Step)
+        .join(models.Process, models.Process.current_stepno == models.Step.stepno)
+        .filter(models.Process.case_no == case_no, models.Process.current_stepno.isnot(None))
+        .order_by(models.Process.processno.desc())
+        .first()
+    )
+
+def list_steps_for_case(db: Session, case_no: int) -> list[RowMapping]:
+    """All steps of a case, oldest first, including those of archived processes (one UNION ALL statement)."""
+    hot, cold = with_archive_columns(models.Step, models.ArchivedStep)
+    steps = union_all(
+        select(*hot).join(models.Process, models.Step.processno == models.Process.processno)
+        .where(models.Process.case_no == case_no),
+        select(*cold).join(models.ArchivedProcess, models.ArchivedStep.processno == models.ArchivedProcess.processno)
+        .where(models.ArchivedProcess.case_no == case_no),
+    ).subquery()
+    return db.execute(select(steps).order_by(steps.c.date_started.asc())).mappings().all()
+
+def list_work_queue(db: Session, usrid: str, limit: int | None = None, offset: int = 0) -> list[models.Step]:
+    """Open steps of a user's cases, oldest first; reads only cases with open processes (partial indexes)."""
+    q = (
+        db.query(models.Step)
+        .join(models.Process, models.Process.current_stepno == models.Step.stepno)
+        .join(models.Case, models.Case.caseno == models.Process.case_no)
+        .filter(models.Case.usrid == usrid, models.Case.open_process_count > 0)
+        .order_by(models.Step.stepno)
+        .offset(offset)
+    )
+    if limit is not None:
+        q = q.limit(limit)
+    return q.all()
+
+def claimant(usrid: str, worker: str | None = None) -> str:
+    """Claim owner: the user, optionally qualified by a worker id so workers sharing an account hold separate claims."""
+    return f"{usrid}/{worker}" if worker else usrid
+
+def _claim_is_live(step: models.Step, now: datetime.datetime) -> bool:
+    return step.claimed_by is not None and step.claim_expires_at is not None and step.claim_expires_at > now
+
+def claim_steps(db: Session, taskno: int, claimed_by: str, limit: int, lease_seconds: int,
+                max_attempts: int | None = None) -> list[models.Step]:
+    """
+    Atomically lease up to limit busy, unclaimed (or lease-expired) steps of a task to claimed_by.
+
+    Candidate rows are locked with FOR UPDATE SKIP LOCKED, so concurrent claimers take disjoint sets of steps
+    without waiting on each other; selection and assignment are a single UPDATE ... RETURNING.
+    With max_attempts, steps whose automated execution already failed that often are skipped.
+    """
+    busy_status_no = _get_status_no(db, "busy")
+    now = datetime.datetime.utcnow()
+    conditions = [
+        models.Step.taskno == taskno,
+        models.Step.status_no == busy_status_no,
+        or_(models.Step.claim_expires_at.is_(None), models.Step.claim_expires_at <= now),
+    ]
+    if max_attempts is not None:
+        conditions.append(models.Step.exec_attempts < max_attempts)
+    candidates = (
+        select(models.Step.stepno)
+        .where(*conditions)
+        .order_by(models.Step.stepno)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(models.Step)
+        .where(models.Step.stepno.in_(candidates.scalar_subquery()))
+        .values(claimed_by=claimed_by, claim_expires_at=now + datetime.timedelta(seconds=lease_seconds))
+        .returning(models.Step)
+        .execution_options(synchronize_session=False)
+    )
+    return sorted(db.scalars(stmt, execution_options={"populate_existing": True}).all(), key=lambda s: s.stepno)
+
+def _get_claimed_step(db: Session, step_id: int, claimed_by: str) -> models.Step:
+    db_step = db.query(models.Step).filter(models.Step.stepno == step_id).with_for_update().first()
+    require_found(db_step, "Step not found", 404)
+    if db_step.status_no != _get_status_no(db, "busy"):
+        raise HTTPException(status_code=409, detail="Step is not busy")
+    if db_step.claimed_by != claimed_by:
+        raise HTTPException(status_code=409, detail="Step is not claimed by you")
+    return db_step
+
+def record_execution_failure(db: Session, step_id: int, claimed_by: str, error: str, retry_after_seconds: int | None) -> int:
+    """
+    Count a failed automated run of a claimed step. With retry_after_seconds the claim is kept until then, so the
+    step is retried after that backoff; with None the claim is dropped and the step is left to a human.
+    Returns the attempts so far.
+    """
+    db_step = _get_claimed_step(db, step_id, claimed_by)
+    db_step.exec_attempts = (db_step.exec_attempts or 0) + 1
+    db_step.exec_error = error[:2000]
+    if retry_after_seconds is None:
+        db_step.claimed_by = None
+        db_step.claim_expires_at = None
+    else:
+        db_step.claim_expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=retry_after_seconds)
+    db.flush()
+    return db_step.exec_attempts
+
+def heartbeat_step(db: Session, step_id: int, claimed_by: str, lease_seconds: int) -> models.Step:
+    """Extend the caller's lease on a step. An expired lease can still be extended until another worker claims it."""
+    db_step = _get_claimed_step(db, step_id, claimed_by)
+    db_step.claim_expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=lease_seconds)
+    return save(db, db_step)
+
+def release_step(db: Session, step_id: int, claimed_by: str) -> models.Step:
+    """Give a claimed step back to the queue."""
+    db_step = _get_claimed_step(db, step_id, claimed_by)
+    db_step.claimed_by = None
+    db_step.claim_expires_at = None
+    return save(db, db_step)
+
 def close_step(db: Session, step_id: int, request: schemas.CloseStepRequest, usrid: str) -> models.Step:
+    # Serialize closes per process: lock the owning process row before reading the step. A concurrent close of
+    # the same step (or of another step in the same process) waits here and then sees the committed result;
+    # different processes do not contend.
+    proc = (
+        db.query(models.Process)
+        .filter(models.Process.processno == select(models.Step.processno).where(models.Step.stepno == step_id).scalar_subquery())
+        .with_for_update()
+        .first()
+    )
     db_step = db.query(models.Step).filter(models.Step.stepno == step_id).first()
     require_found(db_step, "Step not found", 404)
+    require_found(proc, "Process not found", 404)
 
     # Ensure current step is 'busy'
     busy_status_no = _get_status_no(db, "busy")
     if db_step.status_no != busy_status_no:
         raise HTTPException(status_code=400, detail="Step is not busy")
 
+    # A step leased to another user's worker can only be closed by that user until the lease expires
+    if _claim_is_live(db_step, datetime.datetime.utcnow()) and db_step.claimed_by.split("/", 1)[0] != usrid:
+        raise HTTPException(status_code=409, detail="Step is claimed by another worker")
+
+    # Record the submitted values first, in this transaction, so the rules below see them
+    written = process_data_dao.write_named_process_data(db, db_step.processno, request.rule_data, usrid)
+    if written:
+        events.publish(db, proc.case_no, "process_data_changed", processno=proc.processno,
+                       fields=[f"{dtype}.{fieldname}" for dtype, fieldname in written])
+
     # Get all rules for the current task
     task_rules = db.query(models.TaskRule).filter(models.TaskRule.taskno == db_step.taskno).all()
 
@@ -231,6 +395,7 @@ def close_step(db: Session, step_id: int, request: schemas.CloseStepRequest, usr
     default_rule = None
 
     # Evaluate non-default rules first (use module-level evaluator)
+    rules_started = time.perf_counter()
     for tr in task_rules:
         rule_text = (tr.rule or "").strip()
         if rule_text.lower() == "default":
@@ -239,20 +404,24 @@ def close_step(db: Session, step_id: int, request: schemas.CloseStepRequest, usr
         if evaluate_rule_expression(db, db_step.processno, rule_text):
             next_task_no = tr.next_task_no
             break
+    metrics.RULE_EVALUATION_DURATION.observe(time.perf_counter() - rules_started)
 
     completed_status_no = _get_status_no(db, "complete")
 
-    # Apply mutations and commit once (atomic)
+    # Apply mutations; the caller commits them together (atomic)
     result_step: models.Step
 
     # Close current step
     db_step.status_no = completed_status_no
     db_step.date_ended = datetime.datetime.utcnow()
+    open_steps = Counter({(db_step.taskno, busy_status_no): -1})
+    if next_task_no is not None:
+        open_steps[(next_task_no, busy_status_no)] += 1
+    counters.record(db, steps=open_steps)
 
     if next_task_no is None:
         # Complete the process as part of the same atomic commit
-        proc = db.query(models.Process).filter(models.Process.processno == db_step.processno).first()
-        require_found(proc, "Process not found", 404)
+        processes_dao.mark_process_closed(db, proc)
         proc.status_no = completed_status_no
         proc.date_ended = datetime.datetime.utcnow()
         result_step = db_step
@@ -263,11 +432,20 @@ def close_step(db: Session, step_id: int, request: schemas.CloseStepRequest, usr
             taskno=next_task_no,
             status_no=busy_status_no,
             usrid=usrid,
+            due_at=sla_due_at(next_task_no, db_step.date_ended),
         )
         db.add(new_step)
         db.flush()  # ensure PK assigned
+        proc.current_stepno = new_step.stepno
         result_step = new_step
 
-    db.commit()
-    db.refresh(result_step)
+    events.publish(
+        db, proc.case_no, "step_closed",
+        processno=proc.processno, stepno=db_step.stepno, taskno=db_step.taskno,
+        next_stepno=None if next_task_no is None else result_step.stepno, next_taskno=next_task_no,
+    )
+    if next_task_no is None:
+        events.publish(db, proc.case_no, "process_completed", processno=proc.processno)
+    db.flush()
+    metrics.STEP_TRANSITIONS.inc(taskno=db_step.taskno, outcome="complete" if next_task_no is None else "next")
     return result_step
@@ -1,11 +1,10 @@
 from sqlalchemy.orm import Session
 from workflow.db import models
 from workflow import schemas
-from workflow.doa.utils import save, require_found, ensure_task_rule_identity
+from workflow.doa.utils import save, require_found
 
 def create_task_rule(db: Session, task_rule: schemas.TaskRuleCreate, usrid: str) -> models.TaskRule:
-    # Ensure PK default exists to avoid NOT NULL violations if migrations were skipped
-    ensure_task_rule_identity(db)
+    # The PK default is checked once at startup (workflow.db.schema_check), not per insert
     return save(db, models.TaskRule(**task_rule.dict(), usrid=usrid))
 
 def update_task_rule(db: Session, taskruleno: int, payload: schemas.TaskRuleUpdate, usrid: str) -> models.TaskRule:
@@ -15,6 +14,5 @@ def update_task_rule(db: Session, taskruleno: int, payload: schemas.TaskRuleUpda
     for k, v in data.items():
         setattr(obj, k, v)
     obj.usrid = usrid
-    db.commit()
-    db.refresh(obj)
+    db.flush()
     return obj
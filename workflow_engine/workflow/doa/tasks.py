@@ -13,6 +13,5 @@ def update_task(db: Session, taskno: int, payload: schemas.TaskUpdate, usrid: st
     for k, v in data.items():
         setattr(obj, k, v)
     obj.usrid = usrid
-    db.commit()
-    db.refresh(obj)
+    db.flush()
     return obj
@@ -0,0 +1,128 @@
+"""
+Case change events over Postgres LISTEN/NOTIFY.
+
+Writers call publish() inside their transaction; Postgres delivers the notification to every worker only when the
+transaction commits, so subscribers never see a change that was rolled back. Each worker runs one listener thread
+with one dedicated connection (started on the first subscription) and fans notifications out to the asyncio queues
+of its SSE clients.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+CHANNEL = "workflow_events"
+# Events buffered per client before the oldest are dropped (a slow client must not hold memory indefinitely)
+QUEUE_SIZE = 100
+# How long the listener waits on the socket before re-checking whether it should stop
+POLL_SECONDS = 5.0
+RECONNECT_SECONDS = 2.0
+
+logger = logging.getLogger("app.events")
+
+
+def publish(db: Session, case_no: int, event_type: str, **data) -> None:
+    """Queue a change event for case_no; it is sent when db's transaction commits."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    payload = json.dumps({"type": event_type, "case_no": case_no, **data}, default=str)
+    db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+class _Subscription:
+    def __init__(self, case_no: int, loop: asyncio.AbstractEventLoop):
+        self.case_no = case_no
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def offer(self, event: dict) -> None:
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: dict[int, set[_Subscription]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def subscribe(self, case_no: int) -> _Subscription:
+        sub = _Subscription(case_no, asyncio.get_running_loop())
+        with self._lock:
+            self._subscriptions.setdefault(case_no, set()).add(sub)
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="workflow-events-listener", daemon=True)
+                self._thread.start()
+        return sub
+
+    def unsubscribe(self, sub: _Subscription) -> None:
+        with self._lock:
+            subs = self._subscriptions.get(sub.case_no)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscriptions[sub.case_no]
+
+    def stop(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=POLL_SECONDS + 1)
+        self._thread = None
+
+    def _dispatch(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        with self._lock:
+            subs = list(self._subscriptions.get(event.get("case_no"), ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+            except RuntimeError:
+                # Event loop already closed; the subscription is cleaned up by its request
+                pass
+
+    def _run(self) -> None:
+        from workflow.db.database import engine
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                # Dedicated DBAPI connection kept out of the request pool's hands for the listener's lifetime
+                conn = engine.raw_connection()
+                dbapi_conn = conn.driver_connection
+                dbapi_conn.rollback()
+                dbapi_conn.autocommit = True
+                cur = dbapi_conn.cursor()
+                cur.execute(f"LISTEN {CHANNEL}")
+                logger.info("Listening for workflow events")
+                while not self._stop.is_set():
+                    if select.select([dbapi_conn], [], [], POLL_SECONDS) == ([], [], []):
+                        continue
+                    dbapi_conn.poll()
+                    while dbapi_conn.notifies:
+                        self._dispatch(dbapi_conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Workflow event listener failed; reconnecting")
+                time.sleep(RECONNECT_SECONDS)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.invalidate()
+                    except Exception:
+                        pass
+
+
+BROKER = EventBroker()
@@ -0,0 +1,352 @@
+"""
+Automated task executor.
+
+A task whose reference names a registered handler ("name" or "name:arg") is run by the executor instead of a
+person. A dispatcher thread claims busy steps of automated tasks through the work queue (so steps are leased
+exactly as for external workers) and hands them to a pool. The handler gets a TaskContext and may return process
+data to record, as {"dtype.field": value}. The step is then closed through the normal close_step path, and a
+successor step of another automated task is picked up on the next dispatch without waiting for the poll.
+
+Failures are retried with exponential backoff by keeping the claim until the retry is due. After
+EXECUTOR_MAX_ATTEMPTS failures the claim is released and a step_execution_failed event is emitted, so a person
+can take over.
+
+Backpressure: the dispatcher only claims as many steps as there are free slots, i.e. EXECUTOR_MAX_WORKERS running
+plus EXECUTOR_QUEUE_SIZE waiting, and no more than a handler's own limit (EXECUTOR_LIMITS, or max_concurrency on
+register). With EXECUTOR_MODE=process, handlers run in a process pool; they and their context must then be
+picklable, and the modules in EXECUTOR_HANDLER_MODULES are imported in each child.
+
+    python -m workflow.executor      # run the executor outside the web app
+"""
+import importlib
+import json
+import logging
+import os
+import socket
+import subprocess
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from workflow import events, metrics, schemas
+from workflow.db import models
+from workflow.doa import steps as steps_dao
+
+EXECUTOR_ENABLED = os.getenv("EXECUTOR_ENABLED", "0").lower() in ("1", "true", "yes")
+EXECUTOR_MODE = os.getenv("EXECUTOR_MODE", "thread").lower()
+EXECUTOR_MAX_WORKERS = int(os.getenv("EXECUTOR_MAX_WORKERS", "4"))
+EXECUTOR_QUEUE_SIZE = int(os.getenv("EXECUTOR_QUEUE_SIZE", "16"))
+# Per-handler concurrency limits, e.g. {"command": 2}
+EXECUTOR_LIMITS: dict[str, int] = json.loads(os.getenv("EXECUTOR_LIMITS", "{}"))
+EXECUTOR_MAX_ATTEMPTS = int(os.getenv("EXECUTOR_MAX_ATTEMPTS", "3"))
+EXECUTOR_BACKOFF_SECONDS = float(os.getenv("EXECUTOR_BACKOFF_SECONDS", "5"))
+EXECUTOR_LEASE_SECONDS = int(os.getenv("EXECUTOR_LEASE_SECONDS", "300"))
+EXECUTOR_POLL_SECONDS = float(os.getenv("EXECUTOR_POLL_SECONDS", "2"))
+# Comma-separated modules that register extra handlers
+EXECUTOR_HANDLER_MODULES = [m.strip() for m in os.getenv("EXECUTOR_HANDLER_MODULES", "").split(",") if m.strip()]
+# Commands the 'command' handler may run, by name: {"notify": ["/usr/local/bin/notify", "--quiet"]}
+EXECUTOR_COMMANDS: dict[str, list[str]] = json.loads(os.getenv("EXECUTOR_COMMANDS", "{}"))
+EXECUTOR_COMMAND_TIMEOUT = float(os.getenv("EXECUTOR_COMMAND_TIMEOUT", "60"))
+# Recorded as usrid on steps and process data written by the executor
+EXECUTOR_USER = "executor"
+
+logger = logging.getLogger("app.executor")
+
+
+@dataclass(frozen=True)
+class TaskContext:
+    """What a handler knows about the step it runs for. Plain values only, so it can cross a process boundary."""
+    stepno: int
+    processno: int
+    case_no: int
+    taskno: int
+    arg: str
+    attempt: int
+    data: dict[str, str] = field(default_factory=dict)  # process data as {"dtype.field": value}
+
+
+@dataclass(frozen=True)
+class Handler:
+    name: str
+    func: Callable[[TaskContext], Optional[dict[str, Any]]]
+    max_concurrency: Optional[int] = None
+
+
+HANDLERS: dict[str, Handler] = {}
+
+
+def register(name: str, max_concurrency: Optional[int] = None):
+    """Register a handler for task references 'name' or 'name:<arg>'."""
+    def decorator(func: Callable[[TaskContext], Optional[dict[str, Any]]]):
+        HANDLERS[name] = Handler(name, func, max_concurrency)
+        return func
+    return decorator
+
+
+def parse_reference(reference: Optional[str]) -> tuple[Optional[str], str]:
+    """Split a task reference into (handler name, arg); the name is None if no such handler is registered."""
+    name, _, arg = (reference or "").strip().partition(":")
+    return (name if name in HANDLERS else None), arg.strip()
+
+
+def load_handler_modules(modules: list[str] = EXECUTOR_HANDLER_MODULES) -> None:
+    for module in modules:
+        importlib.import_module(module)
+
+
+@register("set_process_data")
+def set_process_data(ctx: TaskContext) -> dict[str, str]:
+    """arg: 'dtype.field=value;dtype.field=value'."""
+    values: dict[str, str] = {}
+    for assignment in filter(None, (a.strip() for a in ctx.arg.split(";"))):
+        key, sep, value = assignment.partition("=")
+        if not sep or "." not in key:
+            raise ValueError(f"Expected dtype.field=value, got {assignment!r}")
+        values[key.strip()] = value.strip()
+    return values
+
+
+@register("command")
+def run_command(ctx: TaskContext) -> dict[str, Any]:
+    """
+    arg: the name of a command in EXECUTOR_COMMANDS. It runs without a shell, gets the step in WORKFLOW_* variables
+    and the process data as JSON on stdin. A non-zero exit fails the run; a JSON object on stdout is recorded as
+    process data.
+    """
+    argv = EXECUTOR_COMMANDS.get(ctx.arg)
+    if not argv:
+        raise ValueError(f"Command {ctx.arg!r} is not in EXECUTOR_COMMANDS")
+    env = dict(os.environ, WORKFLOW_STEPNO=str(ctx.stepno), WORKFLOW_PROCESSNO=str(ctx.processno),
+               WORKFLOW_CASENO=str(ctx.case_no), WORKFLOW_TASKNO=str(ctx.taskno))
+    done = subprocess.run(argv, input=json.dumps(ctx.data), capture_output=True, text=True,
+                          timeout=EXECUTOR_COMMAND_TIMEOUT, env=env, check=False)
+    if done.returncode != 0:
+        raise RuntimeError(f"{ctx.arg} exited with {done.returncode}: {done.stderr.strip()[-500:]}")
+    out = done.stdout.strip()
+    if not out:
+        return {}
+    try:
+        values = json.loads(out)
+    except ValueError:
+        return {}
+    return values if isinstance(values, dict) else {}
+
+
+def _invoke(name: str, ctx: TaskContext) -> Optional[dict[str, Any]]:
+    # Module-level so a process pool can pickle it; the child looks the handler up in its own registry
+    return HANDLERS[name].func(ctx)
+
+
+def _init_child(modules: list[str]) -> None:
+    load_handler_modules(modules)
+
+
+def _load_context(db: Session, step: models.Step, arg: str) -> TaskContext:
+    case_no = db.query(models.Process.case_no).filter(models.Process.processno == step.processno).scalar()
+    rows = (
+        db.query(models.ProcessDataType.description, models.ProcessData.fieldname, models.ProcessData.value)
+        .join(models.ProcessData, models.ProcessData.process_data_type_no == models.ProcessDataType.process_data_type_no)
+        .filter(models.ProcessData.processno == step.processno)
+        .all()
+    )
+    return TaskContext(
+        stepno=step.stepno, processno=step.processno, case_no=case_no, taskno=step.taskno, arg=arg,
+        attempt=(step.exec_attempts or 0) + 1,
+        data={f"{dtype}.{fieldname}": value for dtype, fieldname, value in rows},
+    )
+
+
+class TaskExecutor:
+    """Dispatcher thread plus worker pool; see the module docstring."""
+
+    def __init__(
+        self,
+        mode: str = EXECUTOR_MODE,
+        max_workers: int = EXECUTOR_MAX_WORKERS,
+        queue_size: int = EXECUTOR_QUEUE_SIZE,
+        limits: Optional[dict[str, int]] = None,
+        poll_seconds: float = EXECUTOR_POLL_SECONDS,
+    ):
+        self.mode = mode
+        self.max_workers = max_workers
+        self.capacity = max_workers + queue_size
+        self.limits = dict(EXECUTOR_LIMITS if limits is None else limits)
+        self.poll_seconds = poll_seconds
+        self.claimed_by = steps_dao.claimant(EXECUTOR_USER, f"{socket.gethostname()}-{os.getpid()}")
+        self._in_flight: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._workers: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[Executor] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        load_handler_modules()
+        self._stop.clear()
+        self._workers = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="workflow-executor")
+        if self.mode == "process":
+            # Threads keep the DB work; only the handler call crosses into a child process
+            self._processes = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_child, initargs=(EXECUTOR_HANDLER_MODULES,))
+        self._thread = threading.Thread(target=self._run, name="workflow-executor-dispatch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 5)
+        self._thread = None
+        # Steps still queued keep their lease and are picked up again once it expires
+        if self._workers is not None:
+            self._workers.shutdown(wait=True, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=True, cancel_futures=True)
+        self._workers = self._processes = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _free_slots(self, name: str) -> int:
+        with self._lock:
+            free = self.capacity - sum(self._in_flight.values())
+            limit = self.limits.get(name, HANDLERS[name].max_concurrency)
+            if limit is not None:
+                free = min(free, limit - self._in_flight.get(name, 0))
+            return max(free, 0)
+
+    def _acquire(self, name: str, n: int) -> None:
+        with self._lock:
+            self._in_flight[name] = self._in_flight.get(name, 0) + n
+
+    def _release(self, name: str) -> None:
+        with self._lock:
+            self._in_flight[name] -= 1
+        # A slot opened up; claim more right away if work is waiting
+        self._wake.set()
+
+    def _run(self) -> None:
+        from workflow.db.database import SessionLocal
+
+        while not self._stop.is_set():
+            dispatched = 0
+            db = SessionLocal()
+            try:
+                dispatched = self.dispatch(db)
+            except Exception:
+                logger.exception("Executor dispatch failed")
+            finally:
+                db.close()
+            if not dispatched:
+                self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+
+    def dispatch(self, db: Session) -> int:
+        """Claim busy steps of automated tasks up to the free capacity and queue them; returns how many."""
+        tasks = db.query(models.Task.taskno, models.Task.reference).filter(models.Task.reference.isnot(None)).all()
+        dispatched = 0
+        for taskno, reference in tasks:
+            name, arg = parse_reference(reference)
+            if name is None:
+                continue
+            free = self._free_slots(name)
+            if free <= 0:
+                continue
+            claimed = steps_dao.claim_steps(db, taskno, self.claimed_by, free, EXECUTOR_LEASE_SECONDS,
+                                            max_attempts=EXECUTOR_MAX_ATTEMPTS)
+            contexts = [_load_context(db, step, arg) for step in claimed]
+            db.commit()
+            if not contexts:
+                continue
+            self._acquire(name, len(contexts))
+            for ctx in contexts:
+                self._workers.submit(self._execute, name, ctx)
+            dispatched += len(contexts)
+        return dispatched
+
+    def _execute(self, name: str, ctx: TaskContext) -> None:
+        from workflow.db.database import SessionLocal
+
+        try:
+            started = time.perf_counter()
+            try:
+                if self._processes is not None:
+                    values = self._processes.submit(_invoke, name, ctx).result()
+                else:
+                    values = _invoke(name, ctx)
+            except Exception as exc:
+                metrics.EXECUTOR_RUNS.inc(handler=name, outcome="error")
+                self._record_failure(name, ctx, f"{type(exc).__name__}: {exc}")
+                return
+            finally:
+                metrics.EXECUTOR_DURATION.observe(time.perf_counter() - started, handler=name)
+
+            db = SessionLocal()
+            try:
+                # Returned values are recorded as rule_data, so they are written and the step closed in one commit
+                steps_dao.close_step(db, ctx.stepno, schemas.CloseStepRequest(rule_data=values or {}), EXECUTOR_USER)
+                db.commit()
+                metrics.EXECUTOR_RUNS.inc(handler=name, outcome="ok")
+            except HTTPException as exc:
+                db.rollback()
+                if exc.status_code == 422:
+                    # The handler returned data that cannot be recorded
+                    metrics.EXECUTOR_RUNS.inc(handler=name, outcome="error")
+                    self._record_failure(name, ctx, str(exc.detail))
+                    return
+                # Closed or re-claimed by someone else meanwhile; nothing left to do for this step
+                metrics.EXECUTOR_RUNS.inc(handler=name, outcome="skipped")
+                logger.info("Executor close of step %s skipped: %s", ctx.stepno, exc.detail)
+            except Exception as exc:
+                db.rollback()
+                metrics.EXECUTOR_RUNS.inc(handler=name, outcome="error")
+                self._record_failure(name, ctx, f"{type(exc).__name__}: {exc}")
+            finally:
+                db.close()
+        finally:
+            self._release(name)
+
+    def _record_failure(self, name: str, ctx: TaskContext, error: str) -> None:
+        from workflow.db.database import SessionLocal
+
+        give_up = ctx.attempt >= EXECUTOR_MAX_ATTEMPTS
+        retry_after = None if give_up else int(EXECUTOR_BACKOFF_SECONDS * 2 ** (ctx.attempt - 1))
+        logger.warning("Handler %s failed on step %s (attempt %s/%s): %s",
+                       name, ctx.stepno, ctx.attempt, EXECUTOR_MAX_ATTEMPTS, error)
+        db = SessionLocal()
+        try:
+            steps_dao.record_execution_failure(db, ctx.stepno, self.claimed_by, error, retry_after)
+            if give_up:
+                events.publish(db, ctx.case_no, "step_execution_failed", processno=ctx.processno,
+                               stepno=ctx.stepno, taskno=ctx.taskno, error=error[:500])
+            db.commit()
+        except HTTPException as exc:
+            db.rollback()
+            logger.info("Failure of step %s not recorded: %s", ctx.stepno, exc.detail)
+        except Exception:
+            db.rollback()
+            logger.exception("Recording failure of step %s failed", ctx.stepno)
+        finally:
+            db.close()
+
+
+EXECUTOR = TaskExecutor()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    EXECUTOR.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        EXECUTOR.stop()
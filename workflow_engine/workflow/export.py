@@ -0,0 +1,188 @@
+"""
+Parquet export of workflow history for analytics, so analytical reads run against columnar files instead of the
+OLTP tables:
+
+    python -m workflow.maintenance export              # processes that ended since the last export
+    python -m workflow.maintenance export --full       # every process, open or ended
+
+Each run writes processes.parquet, steps.parquet and process_data.parquet into a new directory under EXPORT_DIR.
+process_data is pivoted to one row per process with a string column per '<datatype>.<field>'. Archived rows are
+included. Rows are read through server-side cursors, EXPORT_BATCH_ROWS at a time, and written as Arrow record
+batches, so memory stays flat however large the tables are. All three files come from one REPEATABLE READ
+snapshot, taken on a read replica when one is configured.
+
+Incremental runs export processes whose date_ended falls in (watermark, now - EXPORT_LAG_SECONDS] with all their
+steps and data, then advance the watermark stored in EXPORT_DIR/watermark. The lag leaves room for transactions
+that set date_ended but had not committed when the snapshot was taken.
+
+pyarrow is optional: install it (pip install pyarrow) on the hosts that export.
+"""
+import datetime
+import logging
+import os
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import select, union_all
+from sqlalchemy.engine import Connection, Engine
+
+from workflow.db import models
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", "exports")
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "50000"))
+EXPORT_LAG_SECONDS = int(os.getenv("EXPORT_LAG_SECONDS", "60"))
+
+WATERMARK_FILE = "watermark"
+
+logger = logging.getLogger("app.export")
+
+
+class ExportUnavailable(RuntimeError):
+    """pyarrow is not installed."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ExportUnavailable("Parquet export needs pyarrow; install it with `pip install pyarrow`") from None
+    return pyarrow, pyarrow.parquet
+
+
+def read_watermark(directory: str = EXPORT_DIR) -> Optional[datetime.datetime]:
+    try:
+        with open(os.path.join(directory, WATERMARK_FILE)) as f:
+            return datetime.datetime.fromisoformat(f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def _write_watermark(directory: str, until: datetime.datetime) -> None:
+    path = os.path.join(directory, WATERMARK_FILE)
+    with open(path + ".tmp", "w") as f:
+        f.write(until.isoformat())
+    os.replace(path + ".tmp", path)
+
+
+def _arrow_type(pa, column):
+    python_type = column.type.python_type
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is datetime.datetime:
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _history(model, archive_model, processnos=None):
+    """UNION ALL of a hot table and its archive, optionally limited to the given processno subquery."""
+    names = [c.name for c in model.__table__.columns]
+    parts = []
+    for table in (model.__table__, archive_model.__table__):
+        stmt = select(*(table.c[n] for n in names))
+        if processnos is not None:
+            stmt = stmt.where(table.c.processno.in_(processnos))
+        parts.append(stmt)
+    return union_all(*parts).subquery()
+
+
+def _stream(conn: Connection, stmt) -> Iterator[list]:
+    """Rows of stmt in lists of up to EXPORT_BATCH_ROWS, fetched through a server-side cursor."""
+    result = conn.execution_options(stream_results=True, yield_per=EXPORT_BATCH_ROWS).execute(stmt)
+    for rows in result.partitions():
+        yield rows
+
+
+def _write_table(pa, pq, path: str, schema, batches: Iterator[list[list[Any]]]) -> int:
+    """Write column-major batches to path (atomically, via a temporary file); returns the row count."""
+    count = 0
+    with pq.ParquetWriter(path + ".tmp", schema, compression="zstd") as writer:
+        for columns in batches:
+            batch = pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+            )
+            writer.write_batch(batch)
+            count += batch.num_rows
+    os.replace(path + ".tmp", path)
+    return count
+
+
+def _columns(rows: list, width: int) -> list[list[Any]]:
+    return [list(col) for col in zip(*rows)] if rows else [[] for _ in range(width)]
+
+
+def _export_rows(pa, pq, conn: Connection, path: str, subquery) -> int:
+    schema = pa.schema([pa.field(c.name, _arrow_type(pa, c)) for c in subquery.c])
+    return _write_table(pa, pq, path, schema, (_columns(rows, len(schema)) for rows in _stream(conn, select(subquery))))
+
+
+def _export_process_data(pa, pq, conn: Connection, path: str, data) -> int:
+    """One row per process: processno plus a string column per '<datatype>.<field>' seen in the export."""
+    key = (models.ProcessDataType.description + "." + data.c.fieldname).label("key")
+    keyed = (
+        select(data.c.processno, key, data.c.value)
+        .outerjoin(models.ProcessDataType, data.c.process_data_type_no == models.ProcessDataType.process_data_type_no)
+    ).subquery()
+    keys = sorted(k for k in conn.execute(select(keyed.c.key).distinct()).scalars() if k is not None)
+    schema = pa.schema([pa.field("processno", pa.int64())] + [pa.field(k, pa.string()) for k in keys])
+    position = {k: i + 1 for i, k in enumerate(keys)}
+
+    def pivoted() -> Iterator[list[list[Any]]]:
+        out: list[list[Any]] = []
+        current: Optional[list[Any]] = None
+        stmt = select(keyed).where(keyed.c.key.is_not(None)).order_by(keyed.c.processno)
+        for rows in _stream(conn, stmt):
+            for processno, k, value in rows:
+                if current is None or current[0] != processno:
+                    current = [processno] + [None] * len(keys)
+                    out.append(current)
+                current[position[k]] = value
+            # A process's rows may continue in the next batch, so keep the last one back
+            if len(out) > 1:
+                done, out = out[:-1], out[-1:]
+                yield _columns(done, len(schema))
+        if out:
+            yield _columns(out, len(schema))
+
+    return _write_table(pa, pq, path, schema, pivoted())
+
+
+def export_history(engine: Engine, directory: str = EXPORT_DIR, full: bool = False,
+                   since: Optional[datetime.datetime] = None,
+                   now: Optional[datetime.datetime] = None) -> dict[str, Any]:
+    """
+    Write one export and return its manifest: output directory, window and row counts per file. Incremental runs
+    (full=False) start at since, or at the stored watermark, and advance the watermark when they finish.
+    """
+    pa, pq = _pyarrow()
+    until = (now or datetime.datetime.utcnow()) - datetime.timedelta(seconds=EXPORT_LAG_SECONDS)
+    if not full and since is None:
+        since = read_watermark(directory)
+
+    processes = _history(models.Process, models.ArchivedProcess)
+    if not full:
+        window = select(processes).where(processes.c.date_ended <= until)
+        if since is not None:
+            window = window.where(processes.c.date_ended > since)
+        processes = window.subquery()
+    # A full export takes every step and data row; an incremental one those of the processes in the window
+    processnos = None if full else select(processes.c.processno)
+    steps = _history(models.Step, models.ArchivedStep, processnos)
+    data = _history(models.ProcessData, models.ArchivedProcessData, processnos)
+
+    out_dir = os.path.join(directory, ("full-" if full else "") + until.strftime("%Y%m%dT%H%M%S"))
+    os.makedirs(out_dir, exist_ok=True)
+    with engine.connect().execution_options(isolation_level="REPEATABLE READ", postgresql_readonly=True) as conn:
+        with conn.begin():
+            rows = {
+                "processes": _export_rows(pa, pq, conn, os.path.join(out_dir, "processes.parquet"), processes),
+                "steps": _export_rows(pa, pq, conn, os.path.join(out_dir, "steps.parquet"), steps),
+                "process_data": _export_process_data(pa, pq, conn, os.path.join(out_dir, "process_data.parquet"), data),
+            }
+    if not full:
+        _write_watermark(directory, until)
+    logger.info("Exported %s to %s", ", ".join(f"{k}={v}" for k, v in rows.items()), out_dir)
+    return {"directory": out_dir, "full": full, "since": since, "until": until, "rows": rows}
@@ -0,0 +1,169 @@
+"""
+Idempotency-Key support for mutating endpoints.
+
+The first request with a given (key, user) reserves a row in idempotency_keys before doing any work, runs the
+operation, then stores the response on that row. Retries are answered from the stored response, either from this
+worker's in-memory cache or with one primary-key lookup, and never run the operation again. A retry that arrives
+while the first request is still running gets 409. Reusing a key for a different request gets 422.
+"""
+import datetime
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from workflow.db import models
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+MAX_KEY_LENGTH = 255
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    method: str
+    path: str
+    fingerprint: str
+    status_code: int
+    body: str
+    expires_at: datetime.datetime
+
+
+class ResponseCache:
+    """Bounded LRU of completed responses keyed by (usrid, key)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: OrderedDict[tuple[str, str], StoredResponse] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, usrid: str, key: str, now: datetime.datetime) -> Optional[StoredResponse]:
+        with self._lock:
+            item = self._items.get((usrid, key))
+            if item is None:
+                return None
+            if item.expires_at <= now:
+                del self._items[(usrid, key)]
+                return None
+            self._items.move_to_end((usrid, key))
+            return item
+
+    def put(self, usrid: str, key: str, item: StoredResponse) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[(usrid, key)] = item
+            self._items.move_to_end((usrid, key))
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+
+CACHE = ResponseCache(IDEMPOTENCY_CACHE_SIZE)
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of the request's inputs, to detect a key being reused for a different request."""
+    encoded = json.dumps(jsonable_encoder(parts), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _replay(stored: StoredResponse, method: str, path: str, request_fingerprint: str) -> JSONResponse:
+    if (stored.method, stored.path, stored.fingerprint) != (method, path, request_fingerprint):
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    return JSONResponse(
+        content=json.loads(stored.body),
+        status_code=stored.status_code,
+        headers={REPLAY_HEADER: "true"},
+    )
+
+
+def run(
+    db: Session,
+    key: Optional[str],
+    usrid: str,
+    request: Request,
+    request_fingerprint: str,
+    operation: Callable[[], Any],
+    response_model: Any,
+) -> Any:
+    """
+    Run operation once per (key, usrid). Without a key the operation runs as usual. With a key the response
+    (response_model-encoded) is stored and replayed for retries until IDEMPOTENCY_TTL_SECONDS have passed.
+    """
+    if key is None:
+        result = operation()
+        db.commit()
+        return result
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+
+    method, path = request.method, request.url.path
+    now = datetime.datetime.utcnow()
+    cached = CACHE.get(usrid, key, now)
+    if cached is not None:
+        return _replay(cached, method, path, request_fingerprint)
+
+    table = models.IdempotencyKey.__table__
+    expires_at = now + datetime.timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+    values = dict(
+        key=key, usrid=usrid, method=method, path=path, fingerprint=request_fingerprint,
+        status_code=None, response_body=None, created_at=now, expires_at=expires_at,
+    )
+    # Reserve the key; an expired row left behind for the same key is taken over
+    stmt = insert(table).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.key, table.c.usrid],
+        set_={k: stmt.excluded[k] for k in values if k not in ("key", "usrid")},
+        where=table.c.expires_at <= now,
+    ).returning(table.c.key)
+    reserved = db.execute(stmt).first() is not None
+    db.commit()
+
+    if not reserved:
+        row = db.get(models.IdempotencyKey, (key, usrid))
+        if row is None or row.status_code is None:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress")
+        stored = StoredResponse(row.method, row.path, row.fingerprint, row.status_code, row.response_body, row.expires_at)
+        CACHE.put(usrid, key, stored)
+        return _replay(stored, method, path, request_fingerprint)
+
+    try:
+        result = operation()
+    except Exception:
+        # Nothing was stored: release the key so the client's retry runs the operation again
+        db.rollback()
+        db.query(models.IdempotencyKey).filter(
+            models.IdempotencyKey.key == key, models.IdempotencyKey.usrid == usrid
+        ).delete(synchronize_session=False)
+        db.commit()
+        raise
+
+    content = jsonable_encoder(response_model.model_validate(result, from_attributes=True))
+    body = json.dumps(content, separators=(",", ":"))
+    status_code = 200
+    # Committed together with the operation's own changes, so a stored response always matches committed work
+    db.query(models.IdempotencyKey).filter(
+        models.IdempotencyKey.key == key, models.IdempotencyKey.usrid == usrid
+    ).update({"status_code": status_code, "response_body": body}, synchronize_session=False)
+    db.commit()
+    CACHE.put(usrid, key, StoredResponse(method, path, request_fingerprint, status_code, body, expires_at))
+    return JSONResponse(content=content, status_code=status_code)
+
+
+def purge_expired(db: Session, now: Optional[datetime.datetime] = None) -> int:
+    """Delete expired keys; returns the number of rows removed."""
+    now = now or datetime.datetime.utcnow()
+    deleted = db.query(models.IdempotencyKey).filter(models.IdempotencyKey.expires_at <= now).delete(synchronize_session=False)
+    db.commit()
+    return deleted
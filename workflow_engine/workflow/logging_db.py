@@ -1,8 +1,8 @@
 import logging
 from typing import Optional
 from sqlalchemy.orm import Session
-from workflow.db.models import Base, LogEntry
-from sqlalchemy.exc import SQLAlchemyError
+from workflow.db.models import LogEntry
+from workflow.db.instrumentation import untracked
 
 class DBLogHandler(logging.Handler):
     """
@@ -35,28 +35,23 @@ class DBLogHandler(logging.Handler):
                 user_id=getattr(record, "user_id", None),
             )
             session: Optional[Session] = None
-            try:
-                session = self._session_factory()
-                session.add(entry)
-                session.commit()
-            finally:
-                if session is not None:
-                    session.close()
+            # Log writes are not part of the request's own SQL (and must not trigger slow-query logging)
+            with untracked():
+                try:
+                    session = self._session_factory()
+                    session.add(entry)
+                    session.commit()
+                finally:
+                    if session is not None:
+                        session.close()
         except Exception:
             # Never raise from logging; swallow errors quietly
             self.handleError(record)
 
-def setup_db_logging(session_factory, engine, level=logging.INFO) -> None:
+def setup_db_logging(session_factory, level=logging.INFO) -> None:
     """
-    Attach DBLogHandler to root logger and ensure the logs table exists.
+    Attach DBLogHandler to root logger. The logs table comes from migrations (or verify-schema --repair).
     """
-    # Ensure the logs table exists
-    try:
-        Base.metadata.create_all(bind=engine, tables=[LogEntry.__table__])
-    except SQLAlchemyError:
-        # If table creation fails, we still proceed to not break the app
-        pass
-
     root = logging.getLogger()
     root.setLevel(level)
 
@@ -0,0 +1,459 @@
+"""
+Database maintenance jobs, meant to be run from cron or a scheduler:
+
+    python -m workflow.maintenance logs            # partitions + retention + rollups
+    python -m workflow.maintenance logs-partitions --days-ahead 7
+    python -m workflow.maintenance logs-retention --retain-days 30
+    python -m workflow.maintenance logs-rollups
+    python -m workflow.maintenance idempotency-purge
+    python -m workflow.maintenance sla-escalate
+    python -m workflow.maintenance verify-schema --repair
+    python -m workflow.maintenance check-pointers --fix
+    python -m workflow.maintenance archive --older-than-days 90
+    python -m workflow.maintenance export [--full]
+    python -m workflow.maintenance analytics-refresh
+    python -m workflow.maintenance counters-reconcile
+"""
+import argparse
+import datetime
+import logging
+import os
+import re
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from workflow.db.models import Base
+
+logger = logging.getLogger("app.maintenance")
+
+LOG_PARTITION_DAYS_AHEAD = int(os.getenv("LOG_PARTITION_DAYS_AHEAD", "7"))
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "30"))
+LOG_ROLLUP_RETENTION_DAYS = int(os.getenv("LOG_ROLLUP_RETENTION_DAYS", "400"))
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
+_PARTITION_NAME = re.compile(r"^logs_p(\d{8})$")
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+def _partition_name(day: datetime.date) -> str:
+    return f"logs_p{day:%Y%m%d}"
+
+
+def log_partitions(conn: Connection) -> dict[datetime.date, str]:
+    """Daily partitions currently attached to logs, keyed by day (the default partition is not included)."""
+    names = conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'logs'::regclass"
+    )).scalars()
+    out: dict[datetime.date, str] = {}
+    for name in names:
+        m = _PARTITION_NAME.match(name)
+        if m:
+            out[datetime.datetime.strptime(m.group(1), "%Y%m%d").date()] = name
+    return out
+
+
+def ensure_log_partitions(conn: Connection, days_ahead: int = LOG_PARTITION_DAYS_AHEAD,
+                          today: Optional[datetime.date] = None) -> list[str]:
+    """
+    Create daily partitions from today to today + days_ahead, plus any day that has spilled into the default
+    partition (e.g. if this job did not run for a while). Returns the names of the partitions created.
+    """
+    today = today or _utcnow().date()
+    existing = log_partitions(conn)
+    wanted = {today + datetime.timedelta(days=i) for i in range(days_ahead + 1)}
+    spilled = conn.execute(text("SELECT DISTINCT CAST(created_at AS DATE) FROM logs_default")).scalars()
+    wanted.update(spilled)
+
+    created: list[str] = []
+    for day in sorted(wanted - existing.keys()):
+        name = _partition_name(day)
+        lo, hi = day.isoformat(), (day + datetime.timedelta(days=1)).isoformat()
+        # Build the partition detached, move its rows out of the default partition, then attach; attaching a
+        # range that still has rows in the default partition would fail
+        conn.execute(text(f"CREATE TABLE {name} (LIKE logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM logs_default WHERE created_at >= :lo AND created_at < :hi RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"lo": lo, "hi": hi},
+        )
+        conn.execute(text(f"ALTER TABLE logs ATTACH PARTITION {name} FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+        created.append(name)
+    return created
+
+
+def drop_expired_log_partitions(conn: Connection, retain_days: int = LOG_RETENTION_DAYS,
+                                today: Optional[datetime.date] = None) -> list[str]:
+    """Drop whole daily partitions older than retain_days; O(1) per partition, no row-by-row DELETE."""
+    today = today or _utcnow().date()
+    cutoff = today - datetime.timedelta(days=retain_days)
+    dropped: list[str] = []
+    for day, name in sorted(log_partitions(conn).items()):
+        if day < cutoff:
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    conn.execute(
+        text("DELETE FROM log_rollups_minute WHERE bucket < :cutoff"),
+        {"cutoff": today - datetime.timedelta(days=LOG_ROLLUP_RETENTION_DAYS)},
+    )
+    return dropped
+
+
+def refresh_log_rollups(conn: Connection, now: Optional[datetime.datetime] = None) -> int:
+    """
+    Aggregate request logs into log_rollups_minute, per minute and http_path.
+
+    Only complete minutes are rolled up. Each run restarts one minute before the newest rollup so rows written
+    late by other workers are picked up; buckets are upserted, so re-running is harmless. Returns rows written.
+    """
+    now = now or _utcnow()
+    end = now.replace(second=0, microsecond=0)
+    watermark = conn.execute(text("SELECT max(bucket) FROM log_rollups_minute")).scalar()
+    if watermark is not None:
+        start = watermark - datetime.timedelta(minutes=1)
+    else:
+        start = conn.execute(text("SELECT min(created_at) FROM logs")).scalar()
+        if start is None:
+            return 0
+    if start >= end:
+        return 0
+
+    # Request logs are the 'app' logger records written by the HTTP middleware; errors are logged at ERROR
+    result = conn.execute(
+        text(
+            """
+            INSERT INTO log_rollups_minute (bucket, http_path, request_count, error_count, p50_ms, p95_ms)
+            SELECT date_trunc('minute', created_at),
+                   http_path,
+                   count(*),
+                   count(*) FILTER (WHERE level IN ('ERROR', 'CRITICAL')),
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY duration_ms),
+                   percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms)
+            FROM logs
+            WHERE created_at >= :start AND created_at < :end
+              AND logger_name = 'app' AND http_path IS NOT NULL
+            GROUP BY 1, 2
+            ON CONFLICT (bucket, http_path) DO UPDATE SET
+                request_count = EXCLUDED.request_count,
+                error_count = EXCLUDED.error_count,
+                p50_ms = EXCLUDED.p50_ms,
+                p95_ms = EXCLUDED.p95_ms
+            """
+        ),
+        {"start": start, "end": end},
+    )
+    return result.rowcount
+
+
+# Pointers as they should be: a process's newest open step, a case's newest open process and open count
+_EXPECTED_PROCESS_POINTERS = """
+    SELECT p.processno,
+           CASE WHEN p.date_ended IS NULL THEN
+               (SELECT max(s.stepno) FROM steps s WHERE s.processno = p.processno AND s.date_ended IS NULL)
+           END AS expected
+    FROM processes p
+"""
+_EXPECTED_CASE_POINTERS = """
+    SELECT c.caseno,
+           (SELECT max(p.processno) FROM processes p WHERE p.case_no = c.caseno AND p.date_ended IS NULL) AS expected_processno,
+           (SELECT count(*) FROM processes p WHERE p.case_no = c.caseno AND p.date_ended IS NULL) AS expected_count
+    FROM cases c
+"""
+
+
+def check_current_pointers(conn: Connection, fix: bool = False) -> dict[str, int]:
+    """
+    Compare processes.current_stepno and cases.current_processno / open_process_count with what the steps and
+    processes tables imply. Returns mismatch counts; with fix=True the pointers are rewritten to match.
+    """
+    process_src = f"({_EXPECTED_PROCESS_POINTERS}) e"
+    process_cond = "e.processno = processes.processno AND processes.current_stepno IS DISTINCT FROM e.expected"
+    case_src = f"({_EXPECTED_CASE_POINTERS}) e"
+    case_cond = ("e.caseno = cases.caseno AND (cases.current_processno IS DISTINCT FROM e.expected_processno "
+                 "OR cases.open_process_count <> e.expected_count)")
+    if fix:
+        processes = conn.execute(text(
+            f"UPDATE processes SET current_stepno = e.expected FROM {process_src} WHERE {process_cond}"
+        )).rowcount
+        cases = conn.execute(text(
+            f"UPDATE cases SET current_processno = e.expected_processno, open_process_count = e.expected_count "
+            f"FROM {case_src} WHERE {case_cond}"
+        )).rowcount
+    else:
+        processes = conn.execute(text(f"SELECT count(*) FROM processes JOIN {process_src} ON {process_cond}")).scalar()
+        cases = conn.execute(text(f"SELECT count(*) FROM cases JOIN {case_src} ON {case_cond}")).scalar()
+    return {"processes": processes, "cases": cases}
+
+
+def _move_rows(conn: Connection, table: str, key: str, ids: list[int]) -> int:
+    """Move the rows of table whose key is in ids into <table>_archive, in one statement."""
+    columns = ", ".join(c.name for c in Base.metadata.tables[table].columns)
+    return conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {table} WHERE {key} = ANY(:ids) RETURNING {columns}) "
+            f"INSERT INTO {table}_archive ({columns}) SELECT {columns} FROM moved"
+        ),
+        {"ids": ids},
+    ).rowcount
+
+
+def archive_completed_processes(conn: Connection, older_than_days: int = ARCHIVE_AFTER_DAYS,
+                                batch_size: int = ARCHIVE_BATCH_SIZE,
+                                now: Optional[datetime.datetime] = None) -> dict[str, int]:
+    """
+    Move one batch of processes that ended more than older_than_days ago, with their steps and process data, into
+    the *_archive tables. Returns the rows moved per table; run batches (each in its own transaction) until no
+    processes are moved. Locked processes are skipped and picked up by a later batch.
+    """
+    cutoff = (now or _utcnow()) - datetime.timedelta(days=older_than_days)
+    ids = list(conn.execute(
+        text(
+            "SELECT processno FROM processes WHERE date_ended < :cutoff AND current_stepno IS NULL "
+            "ORDER BY processno LIMIT :limit FOR UPDATE SKIP LOCKED"
+        ),
+        {"cutoff": cutoff, "limit": batch_size},
+    ).scalars())
+    if not ids:
+        return {"processes": 0, "steps": 0, "process_data": 0}
+    # Children first: steps and process_data reference processes
+    moved = {
+        "process_data": _move_rows(conn, "process_data", "processno", ids),
+        "steps": _move_rows(conn, "steps", "processno", ids),
+    }
+    moved["processes"] = _move_rows(conn, "processes", "processno", ids)
+    return moved
+
+
+def _history_source(table: str, backfill: bool) -> str:
+    """FROM clause for a hot table; a backfill also reads its archive, which incremental runs never need."""
+    if not backfill:
+        return table
+    columns = ", ".join(c.name for c in Base.metadata.tables[table].columns)
+    return f"(SELECT {columns} FROM {table} UNION ALL SELECT {columns} FROM {table}_archive) AS {table}"
+
+
+def refresh_analytics(conn: Connection, now: Optional[datetime.datetime] = None,
+                      since: Optional[datetime.date] = None) -> dict[str, int]:
+    """
+    Refresh the analytics summaries: daily step durations per task and daily process throughput per type from
+    the newest summarized day onwards (that day is recomputed, since it was partial).
+    With since, or on the first run, days are rebuilt from since (or from the beginning), archive included.
+    Daily rows are upserted, so re-running is harmless. Returns rows written per table.
+    """
+    end = ((now or _utcnow()) + datetime.timedelta(days=1)).date()
+    backfill = since is not None
+    if since is None:
+        since = conn.execute(text(
+            "SELECT least((SELECT max(day) FROM analytics_step_daily), (SELECT max(day) FROM analytics_process_daily))"
+        )).scalar()
+        if since is None:
+            backfill = True
+            since = datetime.date.min
+    params = {"start": since, "end": end}
+    steps, processes = _history_source("steps", backfill), _history_source("processes", backfill)
+
+    written = {}
+    written["analytics_step_daily"] = conn.execute(text(f"""
+        INSERT INTO analytics_step_daily (day, taskno, completed, total_seconds, p50_seconds, p90_seconds, p95_seconds)
+        SELECT CAST(date_ended AS DATE), taskno, count(*), sum(seconds),
+               percentile_cont(0.5) WITHIN GROUP (ORDER BY seconds),
+               percentile_cont(0.9) WITHIN GROUP (ORDER BY seconds),
+               percentile_cont(0.95) WITHIN GROUP (ORDER BY seconds)
+        FROM (
+            SELECT date_ended, taskno, EXTRACT(EPOCH FROM date_ended - date_started) AS seconds
+            FROM {steps}
+            WHERE date_ended >= :start AND date_ended < :end AND taskno IS NOT NULL
+        ) s
+        GROUP BY 1, 2
+        ON CONFLICT (day, taskno) DO UPDATE SET
+            completed = EXCLUDED.completed,
+            total_seconds = EXCLUDED.total_seconds,
+            p50_seconds = EXCLUDED.p50_seconds,
+            p90_seconds = EXCLUDED.p90_seconds,
+            p95_seconds = EXCLUDED.p95_seconds
+    """), params).rowcount
+    written["analytics_process_daily"] = conn.execute(text(f"""
+        WITH started AS (
+            SELECT CAST(date_started AS DATE) AS day, process_type_no, count(*) AS n
+            FROM {processes}
+            WHERE date_started >= :start AND date_started < :end AND process_type_no IS NOT NULL
+            GROUP BY 1, 2
+        ), ended AS (
+            SELECT CAST(date_ended AS DATE) AS day, process_type_no, count(*) AS n,
+                   sum(EXTRACT(EPOCH FROM date_ended - date_started)) AS seconds
+            FROM {processes}
+            WHERE date_ended >= :start AND date_ended < :end AND process_type_no IS NOT NULL
+            GROUP BY 1, 2
+        )
+        INSERT INTO analytics_process_daily (day, process_type_no, started, completed, total_cycle_seconds)
+        SELECT COALESCE(s.day, e.day), COALESCE(s.process_type_no, e.process_type_no),
+               COALESCE(s.n, 0), COALESCE(e.n, 0), COALESCE(e.seconds, 0)
+        FROM started s FULL JOIN ended e ON e.day = s.day AND e.process_type_no = s.process_type_no
+        ON CONFLICT (day, process_type_no) DO UPDATE SET
+            started = EXCLUDED.started,
+            completed = EXCLUDED.completed,
+            total_cycle_seconds = EXCLUDED.total_cycle_seconds
+    """), params).rowcount
+
+    return written
+
+
+# Counter table, its key and count columns, and the open rows it counts (in the lock order transitions use)
+_COUNTERS = (
+    ("task_status_counters", "taskno, status_no", "steps", "steps"),
+    ("process_type_status_counters", "process_type_no, status_no", "processes", "processes"),
+)
+
+
+def reconcile_counters(conn: Connection) -> dict[str, int]:
+    """
+    Recount open steps and processes, rewrite the live counters to match with one row per key (folding the shards
+    together) and return the number of keys whose count had drifted, per table. Transitions wait on the table
+    locks until the transaction commits, so nothing is counted twice or missed.
+    """
+    drifted = {}
+    for table, keys, count, source in _COUNTERS:
+        conn.execute(text(f"LOCK TABLE {table} IN SHARE ROW EXCLUSIVE MODE"))
+        not_null = " AND ".join(f"{k} IS NOT NULL" for k in keys.split(", "))
+        expected = f"SELECT {keys}, count(*) AS n FROM {source} WHERE date_ended IS NULL AND {not_null} GROUP BY {keys}"
+        current = f"SELECT {keys}, sum({count}) AS n FROM {table} GROUP BY {keys}"
+        drifted[table] = conn.execute(text(
+            f"SELECT count(*) FROM ({expected}) e FULL JOIN ({current}) c USING ({keys}) "
+            f"WHERE COALESCE(e.n, 0) <> COALESCE(c.n, 0)"
+        )).scalar()
+        conn.execute(text(f"DELETE FROM {table}"))
+        conn.execute(text(f"INSERT INTO {table} ({keys}, shard, {count}) SELECT {keys}, 0, n FROM ({expected}) e"))
+    return drifted
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m workflow.maintenance", description="Workflow DB maintenance jobs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("logs", help="create upcoming log partitions, drop expired ones and refresh rollups")
+    p.add_argument("--days-ahead", type=int, default=LOG_PARTITION_DAYS_AHEAD)
+    p.add_argument("--retain-days", type=int, default=LOG_RETENTION_DAYS)
+    p = sub.add_parser("logs-partitions", help="create upcoming daily log partitions")
+    p.add_argument("--days-ahead", type=int, default=LOG_PARTITION_DAYS_AHEAD)
+    p = sub.add_parser("logs-retention", help="drop log partitions older than the retention window")
+    p.add_argument("--retain-days", type=int, default=LOG_RETENTION_DAYS)
+    sub.add_parser("logs-rollups", help="refresh per-minute request rollups")
+    sub.add_parser("idempotency-purge", help="delete expired idempotency keys")
+    p = sub.add_parser("sla-escalate", help="escalate every overdue step now (instead of or besides the in-app scheduler)")
+    p.add_argument("--batch-size", type=int, default=None)
+    p = sub.add_parser("check-pointers", help="compare current-step/open-process pointers with steps and processes")
+    p.add_argument("--fix", action="store_true", help="rewrite mismatching pointers")
+    p = sub.add_parser("archive", help="move processes that ended long ago, with their steps and data, to archive tables")
+    p.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    p.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    p.add_argument("--max-batches", type=int, default=None, help="stop after this many batches (default: until done)")
+    p = sub.add_parser("export", help="write Parquet files of processes, steps and pivoted process data")
+    p.add_argument("--full", action="store_true", help="every process, not just those ended since the watermark")
+    p.add_argument("--since", type=datetime.datetime.fromisoformat, default=None, help="override the stored watermark (UTC)")
+    p.add_argument("--dir", default=None, help="output directory (default EXPORT_DIR)")
+    p = sub.add_parser("analytics-refresh", help="refresh the analytics summaries behind /analytics")
+    p.add_argument("--since", type=datetime.date.fromisoformat, default=None,
+                   help="rebuild days from this date (YYYY-MM-DD), archive included")
+    p = sub.add_parser("counters-reconcile", help="recount the live open-work counters and fold their shards")
+    p = sub.add_parser("verify-schema", help="check tables and column defaults; exits 1 if problems remain")
+    p.add_argument("--repair", action="store_true", help="apply DDL to fix them (run before traffic arrives)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+    from workflow.db.database import engine
+
+    # Each job runs in its own transaction so a failure in one does not undo the others
+    if args.command in ("logs", "logs-partitions"):
+        with engine.begin() as conn:
+            created = ensure_log_partitions(conn, days_ahead=args.days_ahead)
+        logger.info("Created log partitions: %s", ", ".join(created) or "none")
+    if args.command in ("logs", "logs-retention"):
+        with engine.begin() as conn:
+            dropped = drop_expired_log_partitions(conn, retain_days=args.retain_days)
+        logger.info("Dropped log partitions: %s", ", ".join(dropped) or "none")
+    if args.command in ("logs", "logs-rollups"):
+        with engine.begin() as conn:
+            written = refresh_log_rollups(conn)
+        logger.info("Log rollup rows written: %s", written)
+    if args.command == "idempotency-purge":
+        from workflow import idempotency
+        from workflow.db.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            purged = idempotency.purge_expired(db)
+        finally:
+            db.close()
+        logger.info("Expired idempotency keys deleted: %s", purged)
+    if args.command == "sla-escalate":
+        from workflow import sla
+        from workflow.db.database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            escalated = sla.escalate_all_due(db, batch_size=args.batch_size or sla.SLA_BATCH_SIZE)
+        finally:
+            db.close()
+        logger.info("Overdue steps escalated: %s", escalated)
+    if args.command == "check-pointers":
+        with engine.begin() as conn:
+            mismatches = check_current_pointers(conn, fix=args.fix)
+        logger.info("Pointer mismatches %s: %s", "fixed" if args.fix else "found",
+                    ", ".join(f"{k}={v}" for k, v in mismatches.items()))
+        return 1 if any(mismatches.values()) and not args.fix else 0
+    if args.command == "archive":
+        totals = {"processes": 0, "steps": 0, "process_data": 0}
+        batches = 0
+        while args.max_batches is None or batches < args.max_batches:
+            # One transaction per batch keeps locks short and lets a failed run resume where it stopped
+            with engine.begin() as conn:
+                moved = archive_completed_processes(conn, older_than_days=args.older_than_days, batch_size=args.batch_size)
+            batches += 1
+            for table, count in moved.items():
+                totals[table] += count
+            if not moved["processes"]:
+                break
+        logger.info("Archived in %s batches: %s", batches, ", ".join(f"{k}={v}" for k, v in totals.items()))
+    if args.command == "export":
+        from workflow import export
+        from workflow.db.database import REPLICAS
+
+        try:
+            manifest = export.export_history(REPLICAS.pick() or engine, directory=args.dir or export.EXPORT_DIR,
+                                             full=args.full, since=args.since)
+        except export.ExportUnavailable as exc:
+            logger.error("%s", exc)
+            return 1
+        logger.info("Export written to %s: %s", manifest["directory"],
+                    ", ".join(f"{k}={v}" for k, v in manifest["rows"].items()))
+    if args.command == "analytics-refresh":
+        with engine.begin() as conn:
+            written = refresh_analytics(conn, since=args.since)
+        logger.info("Analytics rows written: %s", ", ".join(f"{k}={v}" for k, v in written.items()))
+    if args.command == "counters-reconcile":
+        with engine.begin() as conn:
+            drifted = reconcile_counters(conn)
+        logger.info("Counter keys corrected: %s", ", ".join(f"{k}={v}" for k, v in drifted.items()))
+    if args.command == "verify-schema":
+        from workflow.db import schema_check
+
+        with engine.begin() as conn:
+            problems = schema_check.repair(conn) if args.repair else schema_check.verify(conn)
+        for problem in problems:
+            logger.error("Schema problem: %s", problem)
+        logger.info("Schema %s", "has problems" if problems else "OK")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
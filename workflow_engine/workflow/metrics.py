@@ -0,0 +1,287 @@
+"""
+In-memory Prometheus-style metrics.
+
+Writers never take a lock: every thread updates its own shard (a plain dict) and a scrape sums the shards.
+With several worker processes, set METRICS_MULTIPROC_DIR to a directory shared by the workers; each worker
+periodically writes a snapshot there and /metrics merges all snapshots, so any worker can answer a scrape.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Callable, Iterable
+
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._shards_lock = threading.Lock()  # only taken the first time a thread touches this metric
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = {}
+            self._local.shard = shard
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _snapshots(self) -> list[dict]:
+        # dict.copy() is atomic under the GIL, so owners can keep writing while we read
+        return [s.copy() for s in list(self._shards)]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def collect(self) -> dict[tuple, float]:
+        out: dict[tuple, float] = {}
+        for snap in self._snapshots():
+            for key, value in snap.items():
+                out[key] = out.get(key, 0.0) + value
+        return out
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._set_values: dict[tuple, float] = {}
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        # Single assignment; the latest writer wins
+        self._set_values[self._key(labels)] = float(value)
+
+    def collect(self) -> dict[tuple, float]:
+        out = super().collect()
+        for key, value in self._set_values.copy().items():
+            out[key] = out.get(key, 0.0) + value
+        return out
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        entry = shard.get(key)
+        if entry is None:
+            # [per-bucket counts (+Inf last), sum, count]
+            entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            shard[key] = entry
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def collect(self) -> dict[tuple, list]:
+        out: dict[tuple, list] = {}
+        for snap in self._snapshots():
+            for key, (counts, total, n) in snap.items():
+                acc = out.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+                acc[0] = [a + b for a, b in zip(acc[0], counts)]
+                acc[1] += total
+                acc[2] += n
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._last_flush = 0.0
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, fn: Callable[[], None]) -> None:
+        """Callback run before each scrape, e.g. to sample pool gauges."""
+        self._collectors.append(fn)
+
+    # ---- snapshots (multi-worker) ----
+    def snapshot(self) -> dict:
+        data = {}
+        for name, metric in self._metrics.items():
+            samples = metric.collect()
+            data[name] = [[list(k), v] for k, v in samples.items()]
+        return {"pid": os.getpid(), "time": time.time(), "metrics": data}
+
+    def flush(self, force: bool = False) -> None:
+        """Write this worker's snapshot to METRICS_MULTIPROC_DIR (rate limited unless forced)."""
+        if not METRICS_MULTIPROC_DIR:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < METRICS_FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        try:
+            os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+            path = os.path.join(METRICS_MULTIPROC_DIR, f"{os.getpid()}.json")
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(self.snapshot(), fh)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def _merged(self) -> dict[str, dict[tuple, object]]:
+        merged: dict[str, dict[tuple, object]] = {name: m.collect() for name, m in self._metrics.items()}
+        if not METRICS_MULTIPROC_DIR or not os.path.isdir(METRICS_MULTIPROC_DIR):
+            return merged
+        own = os.getpid()
+        for fname in os.listdir(METRICS_MULTIPROC_DIR):
+            if not fname.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(METRICS_MULTIPROC_DIR, fname), encoding="utf-8") as fh:
+                    snap = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            pid = snap.get("pid")
+            if pid == own:
+                continue
+            alive = _pid_alive(pid)
+            for name, samples in snap.get("metrics", {}).items():
+                metric = self._metrics.get(name)
+                if metric is None or (metric.kind == "gauge" and not alive):
+                    # Counters/histograms of exited workers still count; their gauges do not
+                    continue
+                target = merged.setdefault(name, {})
+                for key, value in samples:
+                    key = tuple(key)
+                    if metric.kind == "histogram":
+                        acc = target.setdefault(key, [[0] * (len(metric.buckets) + 1), 0.0, 0])
+                        acc[0] = [a + b for a, b in zip(acc[0], value[0])]
+                        acc[1] += value[1]
+                        acc[2] += value[2]
+                    else:
+                        target[key] = target.get(key, 0.0) + value
+        return merged
+
+    # ---- exposition ----
+    def render(self) -> str:
+        for fn in self._collectors:
+            try:
+                fn()
+            except Exception:
+                pass
+        self.flush(force=True)
+        merged = self._merged()
+        lines: list[str] = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for key, value in sorted(merged.get(name, {}).items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.kind == "histogram":
+                    counts, total, n = value
+                    cumulative = 0
+                    for bound, c in zip(list(metric.buckets) + ["+Inf"], counts):
+                        cumulative += c
+                        le = bound if bound == "+Inf" else _fmt(bound)
+                        lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_fmt(total)}")
+                    lines.append(f"{name}_count{_labels(labels)} {n}")
+                else:
+                    lines.append(f"{name}{_labels(labels)} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid) -> bool:
+    if not isinstance(pid, int):
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(pairs: list[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+REGISTRY = Registry()
+
+# HTTP
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"))
+
+# Database
+DB_QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_queries_per_request", "SQL statements issued per HTTP request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)))
+DB_TIME_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_query_seconds_per_request", "Total SQL execution time per HTTP request", ("route",)))
+DB_POOL = REGISTRY.register(Gauge(
+    "db_pool_connections", "SQLAlchemy connection pool state", ("state",)))
+
+# Workflow
+RULE_EVALUATION_DURATION = REGISTRY.register(Histogram(
+    "workflow_rule_evaluation_seconds", "Time spent evaluating task rules in close_step",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)))
+CASES_CREATED = REGISTRY.register(Counter(
+    "workflow_cases_created_total", "Cases created", ("process_type_no",)))
+STEP_TRANSITIONS = REGISTRY.register(Counter(
+    "workflow_step_transitions_total", "Steps closed, by task and whether a next step or process completion followed",
+    ("taskno", "outcome")))
+SLA_ESCALATIONS = REGISTRY.register(Counter(
+    "workflow_sla_escalations_total", "Overdue steps escalated, by SLA action", ("action",)))
+EXECUTOR_RUNS = REGISTRY.register(Counter(
+    "workflow_executor_runs_total", "Automated handler runs, by handler and outcome (ok, error, skipped)",
+    ("handler", "outcome")))
+EXECUTOR_DURATION = REGISTRY.register(Histogram(
+    "workflow_executor_handler_seconds", "Time spent in automated task handlers", ("handler",)))
+
+
+def track_pool(engine) -> None:
+    """Sample pool gauges from the given engine at scrape time."""
+    def collect() -> None:
+        pool = engine.pool
+        for state, attr in (("size", "size"), ("checked_out", "checkedout"), ("checked_in", "checkedin"), ("overflow", "overflow")):
+            fn = getattr(pool, attr, None)
+            if callable(fn):
+                DB_POOL.set(fn(), state=state)
+    REGISTRY.add_collector(collect)
@@ -0,0 +1,32 @@
+"""
+Fast JSON path for large read-only lists.
+
+Returning ORM objects from a route makes FastAPI load full entities, validate every attribute through the orm_mode
+schema and then encode the result. List routes instead select Core row mappings and return rows_response(rows,
+schema), which copies the schema's fields out of each row and encodes the list with orjson in one call. The route
+keeps its response_model, so the OpenAPI schema is unchanged; the rows are trusted to match it (they come straight
+from the columns the schema mirrors), so nothing is validated on the way out.
+"""
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+@lru_cache(maxsize=None)
+def _fields(schema: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(schema.model_fields)
+
+
+def rows_response(rows: Iterable[Mapping[str, Any]], schema: type[BaseModel],
+                  headers: Optional[Mapping[str, str]] = None) -> ORJSONResponse:
+    """JSON array of rows, each reduced to schema's fields in declaration order."""
+    fields = _fields(schema)
+    return ORJSONResponse([{name: row[name] for name in fields} for row in rows], headers=headers)
@@ -1,2 +1,2 @@
 # Expose routers for easy import in main.py
-from . import cases, processes, tasks, process_definitions, process_types, process_data_types, task_rules, steps, statuses, process_data, auth  # noqa: F401
+from . import cases, processes, tasks, process_definitions, process_types, process_data_types, task_rules, steps, statuses, process_data, auth, metrics, logs, events  # noqa: F401
@@ -0,0 +1,51 @@
+import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from workflow import schemas
+from workflow.dependencies import get_read_db
+from workflow.doa import analytics as analytics_dao
+from workflow.auth import roles_required
+
+router = APIRouter(prefix="/analytics", tags=["analytics"], dependencies=[Depends(roles_required("admin"))])
+
+# Without an explicit range, report the last 30 days (including today)
+DEFAULT_DAYS = 30
+
+
+def _range(start: datetime.date | None, end: datetime.date | None) -> tuple[datetime.date, datetime.date]:
+    end = end or datetime.datetime.utcnow().date() + datetime.timedelta(days=1)
+    start = start or end - datetime.timedelta(days=DEFAULT_DAYS)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start, end
+
+
+@router.get("/counts", response_model=schemas.AnalyticsCounts)
+def read_counts(db: Session = Depends(get_read_db)):
+    """Open steps per task and status, open processes per process type and status."""
+    return analytics_dao.get_counts(db)
+
+
+@router.get("/step-durations", response_model=list[schemas.StepDurationDay])
+def read_step_durations(
+    start: datetime.date | None = Query(None, description="First day (UTC), inclusive; defaults to end - 30 days"),
+    end: datetime.date | None = Query(None, description="Last day (UTC), exclusive; defaults to tomorrow"),
+    taskno: int | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """Per day and task: steps closed and their duration average and percentiles, in seconds."""
+    start, end = _range(start, end)
+    return analytics_dao.list_step_durations(db, start, end, taskno=taskno)
+
+
+@router.get("/throughput", response_model=list[schemas.ThroughputDay])
+def read_throughput(
+    start: datetime.date | None = Query(None, description="First day (UTC), inclusive; defaults to end - 30 days"),
+    end: datetime.date | None = Query(None, description="Last day (UTC), exclusive; defaults to tomorrow"),
+    process_type_no: int | None = None,
+    db: Session = Depends(get_read_db),
+):
+    """Per day and process type: processes started and completed, average cycle time and 7-day completion average."""
+    start, end = _range(start, end)
+    return analytics_dao.list_throughput(db, start, end, process_type_no=process_type_no)
@@ -47,6 +47,7 @@ def register_user(req: RegisterRequest, db: Session = Depends(get_db), current_u
     # usrid is the logged-in username if present, otherwise "system"
     creator = current_user.username if current_user is not None else "system"
     created = users_dao.create_user(db, req.username, req.password, role, creator)
+    db.commit()
     return UserResponse(id=created.id, username=created.username, role=created.role)
 
 @router.get("/me", response_model=UserResponse)
@@ -1,27 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from sqlalchemy.orm import Session
-from workflow import schemas
-from workflow.dependencies import get_db
+from workflow import schemas, idempotency
+from workflow.dependencies import get_db, get_read_db
 from workflow.doa import cases as cases_dao
+from workflow.responses import rows_response
 from workflow.auth import get_current_user, roles_required, User
 
 router = APIRouter(tags=["cases"])
 
 @router.get("/cases", response_model=list[schemas.Case], dependencies=[Depends(roles_required("user", "admin"))])
-def list_cases(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_cases(
+    client_id: str | None = None,
+    client_type: str | None = None,
+    status: str | None = Query(None, description="Only cases with a process in this status, e.g. 'busy'"),
+    usrid: str | None = Query(None, description="Owner filter (admin only)"),
+    limit: int | None = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
     # Admin can see all cases, users only their own
-    if "admin" in user.roles:
-        return cases_dao.list_all_cases(db)
-    return cases_dao.list_cases_by_user(db, user.username)
+    filtered = any(v is not None for v in (client_id, client_type, status, usrid, limit)) or offset
+    if not filtered:
+        if "admin" in user.roles:
+            return rows_response(cases_dao.list_all_cases(db), schemas.Case)
+        return rows_response(cases_dao.list_cases_by_user(db, user.username), schemas.Case)
+    owner = usrid if "admin" in user.roles else user.username
+    items, total = cases_dao.search_cases(
+        db,
+        usrid=owner,
+        client_id=client_id,
+        client_type=client_type,
+        status=status,
+        limit=limit,
+        offset=offset,
+    )
+    return rows_response(items, schemas.Case, headers={"X-Total-Count": str(total)})
 
 @router.get("/cases/{case_id}", response_model=schemas.Case, dependencies=[Depends(roles_required("user", "admin"))])
-def read_case(case_id: int, db: Session = Depends(get_db)):
+def read_case(case_id: int, db: Session = Depends(get_read_db)):
     db_case = cases_dao.get_case(db, case_id)
     if db_case is None:
         raise HTTPException(status_code=404, detail="Case not found")
     return db_case
 
+@router.get("/cases/{case_no}/overview", response_model=schemas.CaseOverview, dependencies=[Depends(roles_required("user", "admin"))])
+def read_case_overview(case_no: int, db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
+    # Case, processes, current step and process data in one response
+    owner = None if "admin" in user.roles else user.username
+    return cases_dao.get_case_overview(db, case_no, usrid=owner)
+
 # User Case Creation with Process and Initial Step
 @router.post("/create-case/", response_model=schemas.Case, dependencies=[Depends(roles_required("user", "admin"))])
-def create_case_and_process(case: schemas.CaseCreate, process_type_no: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return cases_dao.create_case(db, case, process_type_no, user.username)
+def create_case_and_process(
+    case: schemas.CaseCreate,
+    process_type_no: int,
+    request: Request,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    return idempotency.run(
+        db, idempotency_key, user.username, request,
+        idempotency.fingerprint(case, process_type_no),
+        lambda: cases_dao.create_case(db, case, process_type_no, user.username),
+        schemas.Case,
+    )
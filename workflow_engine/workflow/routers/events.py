@@ -0,0 +1,60 @@
+import asyncio
+import json
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from workflow import events
+from workflow.dependencies import get_db
+from workflow.auth import get_stream_user, ownership, User
+
+router = APIRouter(tags=["events"])
+
+# Comment lines keep proxies from closing idle streams
+KEEPALIVE_SECONDS = 15.0
+
+
+@router.get("/events")
+async def stream_case_events(
+    case_no: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_stream_user),
+):
+    """
+    Server-sent events for one case: case_created, step_closed, process_completed and process_data_changed.
+    Browsers pass the token as ?access_token=..., since EventSource cannot set headers.
+    """
+    def case_visible() -> bool:
+        owner = ownership.case_owner(db, case_no)
+        found = owner is not None and ("admin" in user.roles or owner == user.username)
+        # Return the connection to the pool now rather than holding it for the life of the stream
+        db.close()
+        return found
+
+    if not await run_in_threadpool(case_visible):
+        raise HTTPException(status_code=404, detail="Case not found")
+
+    sub = events.BROKER.subscribe(case_no)
+
+    async def stream() -> AsyncIterator[str]:
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            events.BROKER.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
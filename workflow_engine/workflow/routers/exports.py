@@ -0,0 +1,29 @@
+import datetime
+import threading
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from workflow import export, schemas
+from workflow.auth import roles_required
+from workflow.db.database import REPLICAS, engine
+
+router = APIRouter(tags=["exports"])
+
+# One export at a time per process; concurrent incremental runs would race on the watermark
+_running = threading.Lock()
+
+
+@router.post("/exports", response_model=schemas.ExportManifest, dependencies=[Depends(roles_required("admin"))])
+def create_export(
+    full: bool = Query(False, description="Export every process instead of those ended since the watermark"),
+    since: datetime.datetime | None = Query(None, description="Override the stored watermark (UTC)"),
+):
+    """Write processes/steps/process_data Parquet files under EXPORT_DIR and return what was written."""
+    if not _running.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="An export is already running")
+    try:
+        return export.export_history(REPLICAS.pick() or engine, full=full, since=since)
+    except export.ExportUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    finally:
+        _running.release()
@@ -0,0 +1,63 @@
+import datetime
+import json
+from typing import Iterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from workflow import schemas
+from workflow.auth import roles_required
+from workflow.db.database import read_session
+from workflow.doa import logs as logs_dao
+
+router = APIRouter(tags=["logs"])
+
+# Without an explicit range, search the last day
+DEFAULT_WINDOW = datetime.timedelta(days=1)
+
+
+@router.get("/logs", dependencies=[Depends(roles_required("admin"))])
+def search_logs(
+    start: datetime.datetime | None = Query(None, description="Inclusive lower bound on created_at (UTC); defaults to end - 1 day"),
+    end: datetime.datetime | None = Query(None, description="Exclusive upper bound on created_at (UTC); defaults to now"),
+    level: list[str] | None = Query(None, description="One or more levels, e.g. level=ERROR&level=WARNING"),
+    http_path: str | None = None,
+    status_code: int | None = None,
+    user_id: str | None = None,
+    q: str | None = Query(None, min_length=3, description="Case-insensitive substring of the message"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(1000, ge=1, le=10000),
+):
+    """
+    Stream matching log entries as NDJSON, newest first. The last line is {"next_cursor": ...}
+    (null when there are no more rows).
+    """
+    end = end or datetime.datetime.utcnow()
+    start = start or end - DEFAULT_WINDOW
+    if cursor:
+        # Reject a malformed cursor before the response starts
+        logs_dao.decode_cursor(cursor)
+
+    def stream() -> Iterator[str]:
+        # The request's own session is closed once the endpoint returns, so rows are read with a dedicated one
+        db = read_session()
+        try:
+            rows = logs_dao.search_logs(
+                db, start, end,
+                level=level, http_path=http_path, status_code=status_code, user_id=user_id,
+                q=q, cursor=cursor, limit=limit,
+            )
+            sent = 0
+            last = None
+            for row in rows:
+                if sent == limit:
+                    yield json.dumps({"next_cursor": logs_dao.encode_cursor(last)}) + "\n"
+                    return
+                yield schemas.LogEntry.model_validate(row, from_attributes=True).model_dump_json() + "\n"
+                last = row
+                sent += 1
+            yield json.dumps({"next_cursor": None}) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,38 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from workflow.dependencies import get_db
+from workflow.dependencies import get_db, get_read_db
 from workflow import schemas
 from workflow.doa import process_data as process_data_dao
-from workflow.auth import roles_required, get_current_user, User
+from workflow.responses import rows_response
+from workflow.auth import roles_required, get_current_user, require_case_access, User
+from workflow.auth import ownership
 from workflow.db import models
 
 router = APIRouter(tags=["process_data"])
 
 @router.get("/process-data", response_model=list[schemas.ProcessData], dependencies=[Depends(roles_required("user", "admin"))])
-def list_process_data(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_process_data(
+    limit: int | None = Query(None, ge=1, le=5000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    if limit is None and not offset:
+        if "admin" in user.roles:
+            return rows_response(process_data_dao.list_all_process_data(db), schemas.ProcessData)
+        return rows_response(process_data_dao.list_process_data_for_user_cases(db, user.username), schemas.ProcessData)
     if "admin" in user.roles:
-        return process_data_dao.list_all_process_data(db)
-    return process_data_dao.list_process_data_for_user_cases(db, user.username)
+        items, total = process_data_dao.page_all_process_data(db, limit, offset)
+    else:
+        items, total = process_data_dao.page_process_data_for_user_cases(db, user.username, limit, offset)
+    return rows_response(items, schemas.ProcessData, headers={"X-Total-Count": str(total)})
 
-@router.get("/cases/{case_no}/process-data", response_model=list[schemas.ProcessData], dependencies=[Depends(roles_required("user", "admin"))])
-def list_process_data_for_case(case_no: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    if "admin" in user.roles:
-        return process_data_dao.list_process_data_for_case(db, case_no)
-    return process_data_dao.list_process_data_for_case_and_user(db, case_no, user.username)
+@router.get("/cases/{case_no}/process-data", response_model=list[schemas.ProcessData], dependencies=[Depends(roles_required("user", "admin")), Depends(require_case_access)])
+def list_process_data_for_case(case_no: int, db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
+    return rows_response(process_data_dao.list_process_data_for_case(db, case_no), schemas.ProcessData)
 
 @router.put("/process-data/{process_data_no}", response_model=schemas.ProcessData, dependencies=[Depends(roles_required("user", "admin"))])
 def update_process_data(process_data_no: int, payload: schemas.ProcessDataUpdate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
     # Authorize: non-admin users can only update data in their own cases
-    q = (
-        db.query(models.ProcessData)
-        .join(models.Process, models.ProcessData.processno == models.Process.processno)
-        .join(models.Case, models.Process.case_no == models.Case.caseno)
-        .filter(models.ProcessData.process_data_no == process_data_no)
-    )
-    if "admin" not in user.roles:
-        q = q.filter(models.Case.usrid == user.username)
-    pd = q.first()
-    if not pd:
+    processno = db.query(models.ProcessData.processno).filter(models.ProcessData.process_data_no == process_data_no).scalar()
+    if processno is None or not ownership.can_access_process(db, user, processno):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Process data not found")
-    return process_data_dao.update_process_data(db, process_data_no, payload, user.username)
+    result = process_data_dao.update_process_data(db, process_data_no, payload, user.username)
+    db.commit()
+    return result
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from workflow import schemas
-from workflow.dependencies import get_db
+from workflow.dependencies import get_db, get_read_db
 from workflow.doa import process_definitions as process_definitions_dao
 from workflow.auth import get_current_user, roles_required, User
 from workflow.db import models
@@ -9,11 +9,11 @@ from workflow.db import models
 router = APIRouter(tags=["process_definitions"])
 
 @router.get("/process-definitions", response_model=list[schemas.ProcessDefinition], dependencies=[Depends(roles_required("admin"))])
-def list_process_definitions(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_process_definitions(db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
     return db.query(models.ProcessDefinition).all()
 
 @router.get("/process-definitions/{process_definition_no}", response_model=schemas.ProcessDefinition, dependencies=[Depends(roles_required("admin"))])
-def get_process_definition(process_definition_no: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_process_definition(process_definition_no: int, db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
     obj = db.query(models.ProcessDefinition).filter(models.ProcessDefinition.process_definition_no == process_definition_no).first()
     if not obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Process definition not found")
@@ -21,8 +21,12 @@ def get_process_definition(process_definition_no: int, db: Session = Depends(get
 
 @router.post("/process-definitions/", response_model=schemas.ProcessDefinition, dependencies=[Depends(roles_required("admin"))])
 def create_process_definition(process_definition: schemas.ProcessDefinitionCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return process_definitions_dao.create_process_definition(db, process_definition, user.username)
+    result = process_definitions_dao.create_process_definition(db, process_definition, user.username)
+    db.commit()
+    return result
 
 @router.put("/process-definitions/{process_definition_no}", response_model=schemas.ProcessDefinition, dependencies=[Depends(roles_required("admin"))])
 def update_process_definition(process_definition_no: int, payload: schemas.ProcessDefinitionUpdate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return process_definitions_dao.update_process_definition(db, process_definition_no, payload, user.username)
+    result = process_definitions_dao.update_process_definition(db, process_definition_no, payload, user.username)
+    db.commit()
+    return result
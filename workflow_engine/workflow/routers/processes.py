@@ -1,25 +1,40 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from workflow import schemas
-from workflow.dependencies import get_db
+from workflow.dependencies import get_db, get_read_db
 from workflow.doa import processes as processes_dao
-from workflow.auth import get_current_user, roles_required, User
+from workflow.auth import get_current_user, require_process_access, roles_required, User
 
 router = APIRouter(tags=["processes"])
 
 @router.get("/processes", response_model=list[schemas.Process], dependencies=[Depends(roles_required("admin"))])
-def list_processes(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_processes(db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
     return processes_dao.list_all_processes(db)
 
 @router.post("/processes/", response_model=schemas.Process, dependencies=[Depends(roles_required("admin"))])
 def create_process(process: schemas.ProcessCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return processes_dao.create_process(db, process, user.username)
+    result = processes_dao.create_process(db, process, user.username)
+    db.commit()
+    return result
 
-@router.post("/processes/{process_no}/data/", response_model=schemas.ProcessData, dependencies=[Depends(roles_required("user", "admin"))])
+@router.post("/processes/{process_no}/data/", response_model=schemas.ProcessData, dependencies=[Depends(roles_required("user", "admin")), Depends(require_process_access)])
 def create_process_data_for_process(
     process_no: int,
     process_data: schemas.ProcessDataCreate,
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    return processes_dao.create_process_data_for_process(db, process_no, process_data, user.username)
+    result = processes_dao.create_process_data_for_process(db, process_no, process_data, user.username)
+    db.commit()
+    return result
+
+@router.put("/processes/{process_no}/data", response_model=list[schemas.ProcessData], dependencies=[Depends(roles_required("user", "admin")), Depends(require_process_access)])
+def upsert_process_data_for_process(
+    process_no: int,
+    items: list[schemas.ProcessDataCreate],
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    result = processes_dao.upsert_process_data_for_process(db, process_no, items, user.username)
+    db.commit()
+    return result
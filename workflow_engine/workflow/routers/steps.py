@@ -1,52 +1,72 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query, Request
 from sqlalchemy.orm import Session
-from workflow import schemas
-from workflow.dependencies import get_db
+from workflow import schemas, idempotency
+from workflow.dependencies import get_db, get_read_db
 from workflow.doa import steps as steps_dao
-from workflow.auth import get_current_user, roles_required, User
+from workflow.responses import rows_response
+from workflow.auth import get_current_user, require_case_access, roles_required, User
 
 router = APIRouter(tags=["steps"])
 
 @router.get("/steps", response_model=list[schemas.Step], dependencies=[Depends(roles_required("admin"))])
-def list_steps(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return steps_dao.list_all_steps(db)
+def list_steps(db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
+    return rows_response(steps_dao.list_all_steps(db), schemas.Step)
 
 @router.post("/steps/{step_id}/close", response_model=schemas.Step, dependencies=[Depends(roles_required("user", "admin"))])
-def close_step(step_id: int, request: schemas.CloseStepRequest, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return steps_dao.close_step(db, step_id, request, user.username)
+def close_step(
+    step_id: int,
+    request: schemas.CloseStepRequest,
+    http_request: Request,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    return idempotency.run(
+        db, idempotency_key, user.username, http_request,
+        idempotency.fingerprint(request),
+        lambda: steps_dao.close_step(db, step_id, request, user.username),
+        schemas.Step,
+    )
+
+@router.post("/steps/{step_id}/heartbeat", response_model=schemas.Step, dependencies=[Depends(roles_required("user", "admin"))])
+def heartbeat_step(
+    step_id: int,
+    lease_seconds: int = Query(300, ge=5, le=3600),
+    worker: str | None = Query(None, max_length=100),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    result = steps_dao.heartbeat_step(db, step_id, steps_dao.claimant(user.username, worker), lease_seconds)
+    db.commit()
+    return result
+
+@router.post("/steps/{step_id}/release", response_model=schemas.Step, dependencies=[Depends(roles_required("user", "admin"))])
+def release_step(step_id: int, worker: str | None = Query(None, max_length=100), db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+    result = steps_dao.release_step(db, step_id, steps_dao.claimant(user.username, worker))
+    db.commit()
+    return result
 
-@router.get("/cases/{case_no}/current-step", response_model=schemas.Step, dependencies=[Depends(roles_required("user", "admin"))])
-def get_current_step_for_case(case_no: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+@router.get("/cases/{case_no}/current-step", response_model=schemas.Step, dependencies=[Depends(roles_required("user", "admin")), Depends(require_case_access)])
+def get_current_step_for_case(case_no: int, db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
     from fastapi import HTTPException
-    from workflow.db import models
-    busy_status = db.query(models.Status).filter(models.Status.description.ilike("busy")).first()
-    if not busy_status:
-        raise HTTPException(status_code=500, detail="Required status 'busy' not configured")
-    busy_status_no = busy_status.statusno
-    step = (
-        db.query(models.Step)
-        .join(models.Process, models.Step.processno == models.Process.processno)
-        .filter(models.Process.case_no == case_no, models.Step.status_no == busy_status_no)
-        .order_by(models.Step.stepno.desc())
-        .first()
-    )
+    step = steps_dao.get_current_step_for_case(db, case_no)
     if not step:
         raise HTTPException(status_code=404, detail="No current step for this case")
     return step
 
-@router.get("/cases/{case_no}/steps", response_model=list[schemas.Step], dependencies=[Depends(roles_required("user", "admin"))])
-def list_steps_for_case(case_no: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    from workflow.db import models
-    q = (
-        db.query(models.Step)
-        .join(models.Process, models.Step.processno == models.Process.processno)
-        .filter(models.Process.case_no == case_no)
-        .order_by(models.Step.date_started.asc())
-    )
-    # Non-admin users can only see their own cases' steps
-    if "admin" not in user.roles:
-        q = (
-            q.join(models.Case, models.Process.case_no == models.Case.caseno)
-             .filter(models.Case.usrid == user.username)
-        )
-    return q.all()
+@router.get("/work-queue", response_model=list[schemas.Step], dependencies=[Depends(roles_required("user", "admin"))])
+def get_work_queue(
+    usrid: str | None = Query(None, description="Owner (admin only); defaults to the caller"),
+    limit: int | None = Query(None, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db),
+    user: User = Depends(get_current_user),
+):
+    # Open steps of the caller's cases (or of usrid's, for admins)
+    owner = usrid if usrid is not None and "admin" in user.roles else user.username
+    return steps_dao.list_work_queue(db, owner, limit=limit, offset=offset)
+
+@router.get("/cases/{case_no}/steps", response_model=list[schemas.Step], dependencies=[Depends(roles_required("user", "admin")), Depends(require_case_access)])
+def list_steps_for_case(case_no: int, db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
+    # Ownership is checked by require_case_access, so cases is not joined here
+    return rows_response(steps_dao.list_steps_for_case(db, case_no), schemas.Step)
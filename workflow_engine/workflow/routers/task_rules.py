@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from workflow import schemas
-from workflow.dependencies import get_db
+from workflow.dependencies import get_db, get_read_db
 from workflow.doa import task_rules as task_rules_dao
 from workflow.auth import get_current_user, roles_required, User
 from workflow.db import models
@@ -9,11 +9,11 @@ from workflow.db import models
 router = APIRouter(tags=["task_rules"])
 
 @router.get("/task-rules", response_model=list[schemas.TaskRule], dependencies=[Depends(roles_required("admin"))])
-def list_task_rules(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_task_rules(db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
     return db.query(models.TaskRule).all()
 
 @router.get("/task-rules/{taskruleno}", response_model=schemas.TaskRule, dependencies=[Depends(roles_required("admin"))])
-def get_task_rule(taskruleno: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_task_rule(taskruleno: int, db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
     obj = db.query(models.TaskRule).filter(models.TaskRule.taskruleno == taskruleno).first()
     if not obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task rule not found")
@@ -21,8 +21,12 @@ def get_task_rule(taskruleno: int, db: Session = Depends(get_db), user: User = D
 
 @router.post("/task-rules/", response_model=schemas.TaskRule, dependencies=[Depends(roles_required("admin"))])
 def create_task_rule(task_rule: schemas.TaskRuleCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return task_rules_dao.create_task_rule(db, task_rule, user.username)
+    result = task_rules_dao.create_task_rule(db, task_rule, user.username)
+    db.commit()
+    return result
 
 @router.put("/task-rules/{taskruleno}", response_model=schemas.TaskRule, dependencies=[Depends(roles_required("admin"))])
 def update_task_rule(taskruleno: int, payload: schemas.TaskRuleUpdate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return task_rules_dao.update_task_rule(db, taskruleno, payload, user.username)
+    result = task_rules_dao.update_task_rule(db, taskruleno, payload, user.username)
+    db.commit()
+    return result
@@ -1,19 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from workflow import schemas
-from workflow.dependencies import get_db
+from workflow.dependencies import get_db, get_read_db
 from workflow.doa import tasks as tasks_dao
+from workflow.doa import steps as steps_dao
 from workflow.auth import get_current_user, roles_required, User
 from workflow.db import models
 
 router = APIRouter(tags=["tasks"])
 
 @router.get("/tasks", response_model=list[schemas.Task], dependencies=[Depends(roles_required("admin"))])
-def list_tasks(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def list_tasks(db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
     return db.query(models.Task).all()
 
 @router.get("/tasks/{taskno}", response_model=schemas.Task, dependencies=[Depends(roles_required("admin"))])
-def get_task(taskno: int, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def get_task(taskno: int, db: Session = Depends(get_read_db), user: User = Depends(get_current_user)):
     obj = db.query(models.Task).filter(models.Task.taskno == taskno).first()
     if not obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
@@ -21,8 +22,26 @@ def get_task(taskno: int, db: Session = Depends(get_db), user: User = Depends(ge
 
 @router.post("/tasks/", response_model=schemas.Task, dependencies=[Depends(roles_required("admin"))])
 def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return tasks_dao.create_task(db, task, user.username)
+    result = tasks_dao.create_task(db, task, user.username)
+    db.commit()
+    return result
 
 @router.put("/tasks/{taskno}", response_model=schemas.Task, dependencies=[Depends(roles_required("admin"))])
 def update_task(taskno: int, payload: schemas.TaskUpdate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-    return tasks_dao.update_task(db, taskno, payload, user.username)
+    result = tasks_dao.update_task(db, taskno, payload, user.username)
+    db.commit()
+    return result
+
+@router.post("/tasks/{taskno}/claim", response_model=list[schemas.Step], dependencies=[Depends(roles_required("user", "admin"))])
+def claim_steps(
+    taskno: int,
+    limit: int = Query(1, ge=1, le=100),
+    lease_seconds: int = Query(300, ge=5, le=3600),
+    worker: str | None = Query(None, max_length=100, description="Worker id, for several workers sharing one account"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    # Up to `limit` busy steps leased to the caller; an empty list means the queue is drained
+    result = steps_dao.claim_steps(db, taskno, steps_dao.claimant(user.username, worker), limit, lease_seconds)
+    db.commit()
+    return result
@@ -12,10 +12,39 @@ class Case(BaseModel):
     date_created: datetime.datetime
     tmstamp: datetime.datetime
     usrid: str
+    current_processno: int | None = None
+    open_process_count: int = 0
 
     class Config:
         orm_mode = True
 
+class StepSummary(BaseModel):
+    stepno: int
+    taskno: int | None = None
+    task: str | None = None
+    status: str | None = None
+    date_started: datetime.datetime | None = None
+
+class ProcessSummary(BaseModel):
+    processno: int
+    process_type_no: int | None = None
+    process_type: str | None = None
+    status_no: int | None = None
+    status: str | None = None
+    date_started: datetime.datetime | None = None
+    date_ended: datetime.datetime | None = None
+    current_step: StepSummary | None = None
+    # '<process data type>.<fieldname>' -> value
+    data: dict[str, str | None] = {}
+
+class CaseOverview(BaseModel):
+    caseno: int
+    client_id: str | None = None
+    client_type: str | None = None
+    usrid: str | None = None
+    date_created: datetime.datetime | None = None
+    processes: list[ProcessSummary] = []
+
 class ProcessBase(BaseModel):
     case_no: int
     status_no: int
@@ -28,6 +57,7 @@ class Process(ProcessBase):
     processno: int
     date_started: datetime.datetime
     date_ended: datetime.datetime | None = None
+    current_stepno: int | None = None
     tmstamp: datetime.datetime
     usrid: str
 
@@ -61,6 +91,9 @@ class TaskBase(BaseModel):
     process_definition_no: int
     description: str
     reference: str | None = None
+    sla_seconds: int | None = None
+    # 'event', 'close' or 'status:<status description>'
+    sla_action: str | None = None
 
 class TaskCreate(TaskBase):
     pass
@@ -69,6 +102,8 @@ class TaskUpdate(BaseModel):
     process_definition_no: int | None = None
     description: str | None = None
     reference: str | None = None
+    sla_seconds: int | None = None
+    sla_action: str | None = None
 
 class Task(TaskBase):
     taskno: int
@@ -168,12 +203,19 @@ class Step(StepBase):
     date_ended: datetime.datetime | None = None
     tmstamp: datetime.datetime
     usrid: str
+    claimed_by: str | None = None
+    claim_expires_at: datetime.datetime | None = None
+    due_at: datetime.datetime | None = None
+    escalated_at: datetime.datetime | None = None
+    exec_attempts: int = 0
+    exec_error: str | None = None
 
     class Config:
         orm_mode = True
 
 class CloseStepRequest(BaseModel):
-    rule_data: dict
+    # Process data to record before the rules run: {"type.field": value} or {"type": {"field": value}}
+    rule_data: dict = {}
 
 class ProcessDataBase(BaseModel):
     process_data_type_no: int
@@ -210,3 +252,71 @@ class UserOut(BaseModel):
 
     class Config:
         orm_mode = True
+
+# Log search (admin)
+class LogEntry(BaseModel):
+    id: int
+    created_at: datetime.datetime
+    level: str
+    logger_name: str
+    message: str
+    pathname: str | None = None
+    lineno: int | None = None
+    func: str | None = None
+    http_method: str | None = None
+    http_path: str | None = None
+    status_code: int | None = None
+    duration_ms: int | None = None
+    user_agent: str | None = None
+    client_ip: str | None = None
+    user_id: str | None = None
+
+    class Config:
+        orm_mode = True
+
+# Parquet export (admin)
+class ExportManifest(BaseModel):
+    directory: str
+    full: bool
+    since: datetime.datetime | None = None
+    until: datetime.datetime
+    rows: dict[str, int]
+
+# Analytics (admin); counts come from the live counters, day series from the summary tables refreshed by
+# `maintenance analytics-refresh`
+class TaskStatusCount(BaseModel):
+    taskno: int
+    task: str | None = None
+    status_no: int
+    status: str | None = None
+    steps: int
+
+class ProcessTypeStatusCount(BaseModel):
+    process_type_no: int
+    process_type: str | None = None
+    status_no: int
+    status: str | None = None
+    processes: int
+
+class AnalyticsCounts(BaseModel):
+    tasks: list[TaskStatusCount] = []
+    process_types: list[ProcessTypeStatusCount] = []
+
+class StepDurationDay(BaseModel):
+    day: datetime.date
+    taskno: int
+    task: str | None = None
+    completed: int
+    avg_seconds: float | None = None
+    p50_seconds: float | None = None
+    p90_seconds: float | None = None
+    p95_seconds: float | None = None
+
+class ThroughputDay(BaseModel):
+    day: datetime.date
+    process_type_no: int
+    process_type: str | None = None
+    started: int
+    completed: int
+    avg_cycle_seconds: float | None = None
+    completed_7d_avg: float
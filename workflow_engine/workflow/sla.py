@@ -0,0 +1,158 @@
+"""
+SLA timers for busy steps.
+
+A step's due_at is set when it is created, from its task's sla_seconds. Overdue steps are found through a partial
+index on pending timers and escalated in batches. Each batch is locked with FOR UPDATE SKIP LOCKED, so the cost of
+a pass depends on the batch size, not on how many timers are pending, and several pollers never escalate the same
+step twice. Task.sla_action decides what happens:
+
+    event                   emit a step_escalated event only
+    status:<description>    move the step to that status (e.g. 'status:overdue')
+    close                   close the step as if a user had, following the task's rules
+
+Every escalation also emits a step_escalated event for the case.
+"""
+import datetime
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from workflow import events, metrics, schemas
+from workflow.db import models
+from workflow.doa import counters, steps as steps_dao
+
+SLA_SCHEDULER_ENABLED = os.getenv("SLA_SCHEDULER_ENABLED", "0").lower() in ("1", "true", "yes")
+SLA_POLL_SECONDS = float(os.getenv("SLA_POLL_SECONDS", "5"))
+SLA_BATCH_SIZE = int(os.getenv("SLA_BATCH_SIZE", "500"))
+# Recorded as usrid on steps closed by the 'close' action
+SLA_USER = "sla"
+
+logger = logging.getLogger("app.sla")
+
+
+def _parse_action(action: Optional[str]) -> tuple[str, Optional[str]]:
+    value = (action or "event").strip()
+    if value.lower().startswith("status:"):
+        return "status", value.split(":", 1)[1].strip()
+    if value.lower() in ("event", "close"):
+        return value.lower(), None
+    logger.warning("Unknown SLA action %r; emitting event only", action)
+    return "event", None
+
+
+def escalate_due_steps(db: Session, now: Optional[datetime.datetime] = None, batch_size: int = SLA_BATCH_SIZE) -> int:
+    """Escalate up to batch_size overdue steps; returns how many were escalated."""
+    now = now or datetime.datetime.utcnow()
+    due = db.execute(
+        select(models.Step.stepno, models.Step.processno, models.Step.taskno, models.Step.status_no, models.Process.case_no,
+               models.Task.sla_action)
+        .join(models.Task, models.Task.taskno == models.Step.taskno)
+        .join(models.Process, models.Process.processno == models.Step.processno)
+        .where(models.Step.due_at <= now, models.Step.escalated_at.is_(None), models.Step.date_ended.is_(None))
+        .order_by(models.Step.due_at)
+        .limit(batch_size)
+        .with_for_update(of=models.Step, skip_locked=True)
+    ).all()
+    if not due:
+        db.rollback()
+        return 0
+
+    by_status: dict[str, list] = defaultdict(list)
+    to_close: list[int] = []
+    for row in due:
+        kind, arg = _parse_action(row.sla_action)
+        if kind == "status":
+            by_status[arg].append(row)
+        elif kind == "close":
+            to_close.append(row.stepno)
+        metrics.SLA_ESCALATIONS.inc(action=kind)
+        events.publish(db, row.case_no, "step_escalated", processno=row.processno, stepno=row.stepno,
+                       taskno=row.taskno, action=row.sla_action or "event")
+
+    stepnos = [row.stepno for row in due]
+    db.execute(
+        update(models.Step).where(models.Step.stepno.in_(stepnos)).values(escalated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    open_steps: Counter = Counter()
+    for description, rows in by_status.items():
+        status = db.query(models.Status).filter(models.Status.description.ilike(description)).first()
+        if status is None:
+            logger.warning("SLA status %r is not configured; %d steps only marked escalated", description, len(rows))
+            continue
+        db.execute(
+            update(models.Step).where(models.Step.stepno.in_([row.stepno for row in rows])).values(status_no=status.statusno)
+            .execution_options(synchronize_session=False)
+        )
+        for row in rows:
+            open_steps[(row.taskno, row.status_no)] -= 1
+            open_steps[(row.taskno, status.statusno)] += 1
+    counters.record(db, steps=open_steps)
+    db.commit()
+
+    # Auto-close runs the normal close path (locks, rules, successor, events) one step at a time
+    for stepno in to_close:
+        try:
+            steps_dao.close_step(db, stepno, schemas.CloseStepRequest(rule_data={}), SLA_USER)
+            db.commit()
+        except HTTPException as exc:
+            db.rollback()
+            logger.warning("SLA auto-close of step %s skipped: %s", stepno, exc.detail)
+    return len(due)
+
+
+def escalate_all_due(db: Session, now: Optional[datetime.datetime] = None, batch_size: int = SLA_BATCH_SIZE) -> int:
+    """Run batches until no overdue step is left; returns the total escalated."""
+    total = 0
+    while True:
+        n = escalate_due_steps(db, now=now, batch_size=batch_size)
+        total += n
+        if n < batch_size:
+            return total
+
+
+class SlaScheduler:
+    """Background poller; runs a batch every SLA_POLL_SECONDS, back to back while batches come back full."""
+
+    def __init__(self, poll_seconds: float = SLA_POLL_SECONDS, batch_size: int = SLA_BATCH_SIZE):
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="workflow-sla-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 5)
+        self._thread = None
+
+    def _run(self) -> None:
+        from workflow.db.database import SessionLocal
+
+        while not self._stop.is_set():
+            n = 0
+            db = SessionLocal()
+            try:
+                n = escalate_due_steps(db, batch_size=self.batch_size)
+            except Exception:
+                logger.exception("SLA escalation pass failed")
+            finally:
+                db.close()
+            if n < self.batch_size:
+                self._stop.wait(self.poll_seconds)
+
+
+SCHEDULER = SlaScheduler()